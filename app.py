@@ -3,14 +3,40 @@ import platform
 import sys
 import os
 import logging
+import json
+from configparser import ConfigParser
 
 current_dir = os.path.dirname(os.path.abspath(__file__))
 if current_dir not in sys.path:
     sys.path.append(current_dir)
 
 from common.logging_config import setup_logging
+from common import profiling
 
 logger = setup_logging()
+profiling.configure()
+
+def forward_control_command(args):
+    from common.control_server import send_control_command, DEFAULT_CONTROL_PORT
+
+    config = ConfigParser()
+    config.read('config.ini')
+    port = config.getint('Settings', 'control_port', fallback=DEFAULT_CONTROL_PORT)
+    token = config.get('Settings', 'control_token', fallback='', raw=True)
+
+    command = args[0]
+    params = {}
+    if command == 'mark' and len(args) > 1:
+        params['label'] = ' '.join(args[1:])
+
+    try:
+        result = send_control_command(command, params, token=token, port=port)
+    except OSError as e:
+        print(f"Mini Screen Recorder is not running or the control API is disabled: {e}")
+        return 1
+
+    print(json.dumps(result, indent=2))
+    return 0 if result.get('ok', True) else 1
 
 def main():
     logger.info(f"Starting Mini Screen Recorder on {platform.system()} platform.")
@@ -31,6 +57,10 @@ def main():
     root.mainloop()
 
 if __name__ == "__main__":
+    from common.control_server import CONTROL_COMMANDS
+    if len(sys.argv) > 1 and sys.argv[1] in CONTROL_COMMANDS:
+        sys.exit(forward_control_command(sys.argv[1:]))
+
     try:
         main()
     except Exception as e:
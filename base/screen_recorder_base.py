@@ -2,6 +2,8 @@ import abc
 import logging
 import os
 import datetime
+import json
+import shutil
 import subprocess
 import sys
 import threading
@@ -14,14 +16,42 @@ import cv2
 from PIL import Image, ImageTk
 
 from common.area_selector import AreaSelector
+from common.window_selector import WindowSelector
+from common.window_list import list_windows, pick_window, read_window
+from common.cursor_follower import CursorFollower, FOLLOW_FILTER, FOLLOW_STATS_PERIOD, parse_viewport_size
 from common.themes import set_dark_theme, set_light_theme, set_dark_blue_theme, set_light_green_theme, set_purple_theme, set_starry_night_theme
 from common.translation_manager import TranslationManager
-from common.logging_config import setup_logging
-from configparser import ConfigParser
+from common.logging_config import setup_logging, get_dropped_log_records
+from common.control_server import ControlServer, DEFAULT_CONTROL_HOST, new_control_token
+from common.cpu_budget import CpuBudget
+from common.process_controls import EncoderProcessControls
+from common.ffmpeg_command import (build_audio_codec_args, build_audio_filter, build_audio_graph, build_concat_args,
+                                   build_crop_filter, build_input_options, build_meter_output_args, build_scale_filter,
+                                   build_tee_output, build_video_codec_args, compute_output_size, live_format_for,
+                                   parse_audio_sources, parse_bitrate, write_concat_list, AUDIO_BITRATES,
+                                   AUDIO_ONLY_FORMATS, AUDIO_CODECS, FRAME_RATES, MKV_ONLY_CODECS, OUTPUT_FORMATS,
+                                   SCALERS, VIDEO_BITRATES, VIDEO_CODECS, available_codecs, parse_encoders)
+from common.calibration import Calibration
+from common.disk_monitor import OutputDiskProfile, DiskSpaceMonitor, AUDIO_BYTES_PER_SECOND
+from common.recording_session import RecordingSession
+from common.staging_mover import StagingMover
+from common.process_stats import ProcessSampler
+from common.resource_sampler import ResourceSampler
+from common.audio_meter import AudioLevelMeter, METER_FLOOR_DB, METER_SAMPLE_RATE
+from common.encoder_watchdog import EncoderWatchdog, HEALTHY_SECONDS, RESTART_BACKOFF_SECONDS
+from common.settings import ConfigWriter, Settings, new_config_parser, write_config_file, RECORD_MODES
+from common import profiling
 from screeninfo import get_monitors
 
+TELEMETRY_INTERVAL_MS = 250
+METER_INTERVAL_MS = 100
+OUTPUT_SCALES = ["native", "2160p", "1440p", "1080p", "720p", "75%", "50%"]
+RECORD_MODE_KEYS = {"both": "mode_video_audio", "video": "mode_video_only", "audio": "mode_audio_only"}
+AAC_AUDIO_BITRATE = "128k"
+
 class ScreenRecorderBase(abc.ABC):
     def __init__(self, root):
+        init_start = time.perf_counter()
         self.root = root
         if not hasattr(self.__class__, '_logger_initialized'):
             self.logger = setup_logging()
@@ -35,12 +65,14 @@ class ScreenRecorderBase(abc.ABC):
         
         self.root.geometry("900x600")
 
-        self.config = ConfigParser()
+        self.config = new_config_parser()
         self.config_file = 'config.ini'
+        self.config_writer = ConfigWriter(self.config_file)
         self.load_config()
+        profiling.configure(self.settings['profiling'])
 
-        self.translation_manager = TranslationManager(self.config.get('Settings', 'language', fallback='en-US'))
-        self.set_theme(self.config.get('Settings', 'theme', fallback='dark'))
+        self.translation_manager = TranslationManager(self.settings['language'])
+        self.set_theme(self.settings['theme'])
 
         self.set_icon()
         
@@ -50,25 +82,56 @@ class ScreenRecorderBase(abc.ABC):
             return
 
         self.audio_devices = self.get_audio_devices()
-        if len(self.audio_devices) == 0:
-            messagebox.showerror("Error", "No audio devices.")
-            return
+        if len(self.audio_devices) == 0 and self.record_mode != 'video':
+            # Screen-only recording does not need an audio device, so start in that mode instead of refusing.
+            self.logger.warning("No audio devices found, recording video only")
+            self.record_mode = 'video'
+
+        encoders = self.get_encoders()
+        self.video_codecs = available_codecs(VIDEO_CODECS, encoders)
+        self.audio_codecs = available_codecs(AUDIO_CODECS, encoders)
+        self.audio_codec = self.settings.choose('audio_codec', self.audio_codecs)
 
         self.init_ui()
 
         self.platform_initialize()
 
         self.create_output_folder()
-        self.recording_process = None
         self.running = False
         self.elapsed_time = 0
         self.record_area = None
+        self.record_window = None
         self.area_selector = AreaSelector(root)
+        self.window_selector = WindowSelector(root, self.t)
+        self.update_expected_speed()
         self.preview_window = None
         self.preview_running = False
 
-        self.current_video_part = 0
-        self.video_parts = []
+        self.sessions = {}
+        self.encoder_controls = EncoderProcessControls.from_config(self.config, self.encoder_profile)
+        self.cpu_budget = CpuBudget(self.cpu_threads or self.encoder_controls.available_cpus() or 0)
+
+        self.paused = False
+        self.markers = []
+        self.recording_started_at = None
+        self.paused_at = None
+        self.paused_total = 0.0
+
+        self.staging_mover = None
+        self.start_staging_mover()
+
+        self.disk_profile = None
+        self.disk_monitor = None
+        self.watchdog = None
+        self.measure_output_disk()
+
+        self.control_server = None
+        self.control_messages = None
+        if self.control_api_enabled:
+            self.start_control_server()
+
+        if profiling.is_enabled():
+            profiling.record("startup", time.perf_counter() - init_start)
 
     def platform_initialize(self):
         pass
@@ -107,41 +170,98 @@ class ScreenRecorderBase(abc.ABC):
         self.current_theme = theme
         
     def save_config(self, event=None):
-        self.config['Settings'] = {
+        self.settings.update({
             'language': self.translation_manager.language,
             'theme': self.theme_combo.get().lower(),
-            'monitor': self.monitor_combo.current(),
-            'fps': self.fps_combo.current(),
-            'bitrate': self.bitrate_combo.current(),
-            'codec': self.codec_combo.current(),
-            'format': self.format_combo.current(),
-            'audio': self.audio_combo.current(),
-            'output_folder': self.output_folder
-        }
-        with open(self.config_file, 'w') as configfile:
-            self.config.write(configfile)
-        
+            'monitor': self.get_monitor_key(self.monitors[self.monitor_combo.current()]),
+            'fps': self.fps_combo.get(),
+            'bitrate': self.bitrate_combo.get(),
+            'codec': self.codec_combo.get(),
+            'format': self.format_combo.get(),
+            'audio_device': self.audio_combo.get() or self.settings['audio_device'],
+            'output_folder': self.output_folder,
+            'audio_codec': self.audio_codec_combo.get(),
+            'audio_bitrate': self.audio_bitrate_combo.get(),
+            'follow_cursor': self.follow_cursor_var.get(),
+            'output_scale': self.output_scale_combo.get(),
+            'scaler': self.scaler_combo.get(),
+            'record_mode': self.get_record_mode(),
+        })
+        self.config['Settings'] = self.settings.to_section()
+        self.config_writer.save(self.config)
+
     def load_config(self):
         if os.path.exists(self.config_file):
             self.config.read(self.config_file)
-        else:
-            self.config['Settings'] = {
-                'language': 'en-US',
-                'theme': 'dark',
-                'monitor': 0,
-                'fps': 1,
-                'bitrate': 0,
-                'codec': 0,
-                'format': 0,
-                'audio': 0,
-                'output_folder': os.path.join(os.getcwd(), "OutputFiles")
-            }
-            with open(self.config_file, 'w') as configfile:
-                self.config.write(configfile)
-        
-        self.output_folder = self.config.get('Settings', 'output_folder', 
-                                        fallback=os.path.join(os.getcwd(), "OutputFiles"))
+        self.settings = Settings.from_config(self.config)
+        if not self.settings['control_token']:
+            # Created once per install; "python app.py <command>" reads it back from config.ini.
+            self.settings.update({'control_token': new_control_token()})
+            self.config['Settings'] = self.settings.to_section()
+            write_config_file(self.config_file, {'Settings': dict(self.config['Settings'])})
+
+        settings = self.settings
+        self.output_folder = settings['output_folder'] or os.path.join(os.getcwd(), "OutputFiles")
+        self.control_api_enabled = settings['control_api']
+        self.control_port = settings['control_port']
+        self.control_token = settings['control_token']
+        self.cpu_threads = settings['cpu_threads']
+        self.encoder_profile = settings['encoder_profile']
+        self.disk_warn_minutes = settings['disk_warn_minutes']
+        self.watchdog_stall_seconds = settings['watchdog_stall_seconds']
+        self.disk_reserve_mb = settings['disk_reserve_mb']
+        self.low_space_action = settings['low_space_action']
+        self.staging_folder = settings['staging_folder']
+        self.sampler_interval = settings['sampler_interval']
+        self.thread_queue_size = settings['thread_queue_size']
+        self.wallclock_timestamps = settings['wallclock_timestamps']
+        self.audio_async = settings['audio_async']
+        self.audio_meter = settings['audio_meter']
+        self.audio_thread_queue_size = settings['audio_thread_queue_size']
+        self.audio_codec = settings['audio_codec']
+        self.audio_bitrate = settings['audio_bitrate']
+        self.audio_sample_rate = settings['audio_sample_rate']
+        self.audio_channels = settings['audio_channels']
+        self.extra_audio_sources = parse_audio_sources(settings['extra_audio_sources'])
+        self.audio_tracks = settings['audio_tracks']
+        self.follow_cursor = settings['follow_cursor']
+        self.follow_cursor_size = settings['follow_cursor_size']
+        try:
+            parse_viewport_size(self.follow_cursor_size)
+        except ValueError:
+            self.logger.warning(f"Invalid follow_cursor_size '{self.follow_cursor_size}', using 1280x720")
+            self.follow_cursor_size = '1280x720'
+        self.follow_cursor_smoothing = settings['follow_cursor_smoothing']
+        self.output_scale = settings['output_scale']
+        try:
+            compute_output_size(1920, 1080, self.output_scale)
+        except ValueError:
+            self.logger.warning(f"Invalid output_scale '{self.output_scale}', using native")
+            self.output_scale = 'native'
+        self.scaler = settings['scaler']
+        self.calibration_file = settings['calibration_file']
+        self.calibration = Calibration.load(self.calibration_file)
+        self.proxy_mode = settings['proxy_mode']
+        self.proxy_size = settings['proxy_size']
+        self.proxy_bitrate = settings['proxy_bitrate']
+        self.live_output = settings['live_output'].strip()
+        self.live_format = settings['live_format'].strip()
+        self.record_mode = settings['record_mode']
+
+    def get_monitor_key(self, monitor):
+        return f"{monitor.width}x{monitor.height}+{monitor.x}+{monitor.y}"
+
+    def get_saved_monitor_index(self):
+        keys = [self.get_monitor_key(monitor) for monitor in self.monitors]
+        saved = self.settings['monitor']
+        return keys.index(saved) if saved in keys else 0
+
+    def get_saved_audio_index(self):
+        if not self.settings['audio_device'] and self.settings.legacy_audio_index is not None:
+            return min(self.settings.legacy_audio_index, len(self.audio_devices) - 1)
+        return self.audio_devices.index(self.settings.choose('audio_device', self.audio_devices))
                 
+    @profiling.timed("change_language")
     def change_language(self, event=None):
         selected_language = self.language_combo.get()
         language_map = {
@@ -183,22 +303,35 @@ class ScreenRecorderBase(abc.ABC):
         
         self.language_label.configure(text=self.t("Language") + ":")
         self.theme_label.configure(text=self.t("theme") + ":")
+        self.record_mode_label.configure(text=self.t("record_mode") + ":")
+        mode_index = self.record_mode_combo.current()
+        self.record_mode_combo.configure(values=self.get_record_mode_names())
+        self.record_mode_combo.current(mode_index)
         self.fps_label.configure(text=self.t("framerate") + ":")
         self.bitrate_label.configure(text=self.t("bitrate") + ":")
         self.codec_label.configure(text=self.t("video_codec") + ":")
         self.format_label.configure(text=self.t("output_format") + ":")
         self.audio_label.configure(text=self.t("audio_device") + ":")
         self.volume_label.configure(text=self.t("volume") + ":")
+        self.audio_codec_label.configure(text=self.t("audio_codec") + ":")
         self.output_settings_frame.configure(text=self.t("output_settings"))
+        self.advanced_settings_frame.configure(text=self.t("advanced_settings"))
         self.output_folder_label.configure(text=self.t("output_folder") + ":")
         
         self.toggle_btn.configure(text=self.t("start_recording") if not self.running else self.t("stop_recording"))
         self.preview_btn.configure(text=self.t("start_preview") if not self.preview_running else self.t("stop_preview"))
         self.select_area_btn.configure(text=self.t("select_recording_area"))
+        self.select_window_btn.configure(text=self.t("select_window"))
+        self.follow_cursor_check.configure(text=self.t("follow_cursor"))
+        self.output_scale_label.configure(text=self.t("output_size") + ":")
+        self.update_expected_speed()
         self.open_folder_btn.configure(text=self.t("open_output_folder"))
         self.info_btn.configure(text=self.t("about"))
         
-        self.status_label.configure(text=self.t("status_recording") if self.running else self.t("status_ready"))
+        if self.running and self.paused:
+            self.status_label.configure(text=self.t("status_paused"))
+        else:
+            self.status_label.configure(text=self.t("status_recording") if self.running else self.t("status_ready"))
 
     def init_ui(self):
         self.main_frame = ttk.Frame(self.root)
@@ -223,38 +356,58 @@ class ScreenRecorderBase(abc.ABC):
         self.theme_label.grid(row=0, column=2, padx=10, pady=5, sticky="e")
         self.theme_combo = ttk.Combobox(self.top_panel, values=["Dark", "Light", "Dark Blue", "Light Green", "Purple", "Starry Night"], width=25)
         self.theme_combo.grid(row=0, column=3, padx=10, pady=5, sticky="w")
-        current_theme = self.config.get('Settings', 'theme', fallback='dark')
+        current_theme = self.settings['theme']
         theme_index = {"dark": 0, "light": 1, "dark blue": 2, "light green": 3, "purple": 4, "starry night": 5}.get(current_theme, 0)
         self.theme_combo.current(theme_index)
         self.theme_combo.config(state="readonly")
         self.theme_combo.bind("<<ComboboxSelected>>", self.change_theme)
 
+        self.record_mode_label = ttk.Label(self.top_panel, text=self.t("record_mode") + ":")
+        self.record_mode_label.grid(row=0, column=4, padx=10, pady=5, sticky="e")
+        self.record_mode_combo = ttk.Combobox(self.top_panel, values=self.get_record_mode_names(), width=18)
+        self.record_mode_combo.grid(row=0, column=5, padx=10, pady=5, sticky="w")
+        self.record_mode_combo.current(RECORD_MODES.index(self.record_mode))
+        self.record_mode_combo.config(state="readonly")
+        self.record_mode_combo.bind("<<ComboboxSelected>>", self.on_record_mode_change)
+
         self.content_frame = ttk.Frame(self.main_frame)
         self.content_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
         
         self.left_panel = ttk.Frame(self.content_frame, width=400)
         self.left_panel.pack(side=tk.LEFT, fill=tk.BOTH, expand=False, padx=5, pady=5)
         self.left_panel.pack_propagate(False)
+
+        # The settings are taller than the panel at the minimum window size, so they scroll.
+        self.settings_canvas = tk.Canvas(self.left_panel, highlightthickness=0, borderwidth=0)
+        self.settings_scrollbar = ttk.Scrollbar(self.left_panel, orient=tk.VERTICAL, command=self.settings_canvas.yview)
+        self.settings_canvas.configure(yscrollcommand=self.settings_scrollbar.set)
+        self.settings_canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.settings_panel = ttk.Frame(self.settings_canvas)
+        self.settings_window = self.settings_canvas.create_window((0, 0), window=self.settings_panel, anchor="nw")
+        self.settings_panel.bind("<Configure>", self.update_settings_scroll)
+        self.settings_canvas.bind("<Configure>", self.update_settings_scroll)
+        for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            self.root.bind_all(sequence, self.on_settings_wheel, add="+")
         
-        self.monitor_frame = ttk.LabelFrame(self.left_panel, text=self.t("monitor"))
+        self.monitor_frame = ttk.LabelFrame(self.settings_panel, text=self.t("monitor"))
         self.monitor_frame.pack(fill=tk.X, padx=10, pady=5)
         
         self.monitor_combo = ttk.Combobox(self.monitor_frame, values=[f"Monitor {i+1}: ({monitor.width}x{monitor.height})" for i, monitor in enumerate(self.monitors)], width=45)
         self.monitor_combo.pack(padx=10, pady=10, fill=tk.X)
-        self.monitor_combo.current(0)
+        self.monitor_combo.current(self.get_saved_monitor_index())
         self.monitor_combo.config(state="readonly")
         self.monitor_combo.bind("<<ComboboxSelected>>", self.on_monitor_change)
 
-        self.video_settings_frame = ttk.LabelFrame(self.left_panel, text=self.t("video_settings"))
+        self.video_settings_frame = ttk.LabelFrame(self.settings_panel, text=self.t("video_settings"))
         self.video_settings_frame.pack(fill=tk.X, padx=10, pady=5)
 
         self.fps_frame = ttk.Frame(self.video_settings_frame)
         self.fps_frame.pack(fill=tk.X, padx=10, pady=5)
         self.fps_label = ttk.Label(self.fps_frame, text=self.t("framerate") + ":")
         self.fps_label.pack(side=tk.LEFT, padx=5)
-        self.fps_combo = ttk.Combobox(self.fps_frame, values=["30", "60"], width=10)
+        self.fps_combo = ttk.Combobox(self.fps_frame, values=list(FRAME_RATES), width=10)
         self.fps_combo.pack(side=tk.LEFT, padx=5, fill=tk.X, expand=True)
-        self.fps_combo.current(self.config.getint('Settings', 'fps'))
+        self.fps_combo.set(self.settings.choose('fps', FRAME_RATES))
         self.fps_combo.config(state="readonly")
         self.fps_combo.bind("<<ComboboxSelected>>", self.save_config)
         
@@ -262,9 +415,9 @@ class ScreenRecorderBase(abc.ABC):
         self.bitrate_frame.pack(fill=tk.X, padx=10, pady=5)
         self.bitrate_label = ttk.Label(self.bitrate_frame, text=self.t("bitrate") + ":")
         self.bitrate_label.pack(side=tk.LEFT, padx=5)
-        self.bitrate_combo = ttk.Combobox(self.bitrate_frame, values=["1000k", "2000k", "4000k", "6000k", "8000k", "10000k", "15000k", "20000k"], width=10)
+        self.bitrate_combo = ttk.Combobox(self.bitrate_frame, values=list(VIDEO_BITRATES), width=10)
         self.bitrate_combo.pack(side=tk.LEFT, padx=5, fill=tk.X, expand=True)
-        self.bitrate_combo.current(self.config.getint('Settings', 'bitrate'))
+        self.bitrate_combo.set(self.settings['bitrate'])
         self.bitrate_combo.config(state="readonly")
         self.bitrate_combo.bind("<<ComboboxSelected>>", self.save_config)
 
@@ -272,23 +425,23 @@ class ScreenRecorderBase(abc.ABC):
         self.codec_frame.pack(fill=tk.X, padx=10, pady=5)
         self.codec_label = ttk.Label(self.codec_frame, text=self.t("video_codec") + ":")
         self.codec_label.pack(side=tk.LEFT, padx=5)
-        self.codec_combo = ttk.Combobox(self.codec_frame, values=["libx264", "libx265"], width=10)
+        self.codec_combo = ttk.Combobox(self.codec_frame, values=self.video_codecs, width=10)
         self.codec_combo.pack(side=tk.LEFT, padx=5, fill=tk.X, expand=True)
-        self.codec_combo.current(self.config.getint('Settings', 'codec'))
+        self.codec_combo.set(self.settings.choose('codec', self.video_codecs))
         self.codec_combo.config(state="readonly")
-        self.codec_combo.bind("<<ComboboxSelected>>", self.save_config)
+        self.codec_combo.bind("<<ComboboxSelected>>", self.on_encoding_change)
 
         self.format_frame = ttk.Frame(self.video_settings_frame)
         self.format_frame.pack(fill=tk.X, padx=10, pady=5)
         self.format_label = ttk.Label(self.format_frame, text=self.t("output_format") + ":")
         self.format_label.pack(side=tk.LEFT, padx=5)
-        self.format_combo = ttk.Combobox(self.format_frame, values=["mkv", "mp4"], width=10)
+        self.format_combo = ttk.Combobox(self.format_frame, values=list(OUTPUT_FORMATS), width=10)
         self.format_combo.pack(side=tk.LEFT, padx=5, fill=tk.X, expand=True)
-        self.format_combo.current(self.config.getint('Settings', 'format'))
+        self.format_combo.set(self.settings.choose('format', OUTPUT_FORMATS))
         self.format_combo.config(state="readonly")
-        self.format_combo.bind("<<ComboboxSelected>>", self.save_config)
+        self.format_combo.bind("<<ComboboxSelected>>", self.on_encoding_change)
 
-        self.audio_settings_frame = ttk.LabelFrame(self.left_panel, text=self.t("audio_settings"))
+        self.audio_settings_frame = ttk.LabelFrame(self.settings_panel, text=self.t("audio_settings"))
         self.audio_settings_frame.pack(fill=tk.X, padx=10, pady=5)
         
         self.audio_label = ttk.Label(self.audio_settings_frame, text=self.t("audio_device") + ":")
@@ -296,7 +449,8 @@ class ScreenRecorderBase(abc.ABC):
         
         self.audio_combo = ttk.Combobox(self.audio_settings_frame, values=self.audio_devices, width=45)
         self.audio_combo.pack(padx=10, pady=(0,10), fill=tk.X)
-        self.audio_combo.current(self.config.getint('Settings', 'audio'))
+        if self.audio_devices:
+            self.audio_combo.current(self.get_saved_audio_index())
         self.audio_combo.config(state="readonly")
         self.audio_combo.bind("<<ComboboxSelected>>", self.save_config)
         
@@ -308,7 +462,17 @@ class ScreenRecorderBase(abc.ABC):
         self.volume_scale.set(100)
         self.volume_scale.pack(side=tk.LEFT, padx=5, fill=tk.X, expand=True)
 
-        self.output_settings_frame = ttk.LabelFrame(self.left_panel, text=self.t("output_settings"))
+        self.level_frame = ttk.Frame(self.audio_settings_frame)
+        self.level_frame.pack(fill=tk.X, padx=10, pady=(0, 10))
+        self.level_label = ttk.Label(self.level_frame, text=self.t("audio_level") + ":")
+        self.level_label.pack(side=tk.LEFT, padx=5)
+        self.level_bar = ttk.Progressbar(self.level_frame, orient=tk.HORIZONTAL, mode='determinate',
+                                         maximum=-METER_FLOOR_DB)
+        self.level_bar.pack(side=tk.LEFT, padx=5, fill=tk.X, expand=True)
+        self.level_peak_label = ttk.Label(self.level_frame, text="", width=8, font=("Arial", 9))
+        self.level_peak_label.pack(side=tk.LEFT, padx=5)
+
+        self.output_settings_frame = ttk.LabelFrame(self.settings_panel, text=self.t("output_settings"))
         self.output_settings_frame.pack(fill=tk.X, padx=10, pady=5)
         
         self.output_folder_frame = ttk.Frame(self.output_settings_frame)
@@ -327,6 +491,48 @@ class ScreenRecorderBase(abc.ABC):
                                         command=self.browse_output_folder)
         self.browse_folder_btn.pack(side=tk.LEFT, padx=5)
         
+        self.advanced_settings_frame = ttk.LabelFrame(self.settings_panel, text=self.t("advanced_settings"))
+        self.advanced_settings_frame.pack(fill=tk.X, padx=10, pady=5)
+
+        self.output_scale_frame = ttk.Frame(self.advanced_settings_frame)
+        self.output_scale_frame.pack(fill=tk.X, padx=10, pady=5)
+        self.output_scale_label = ttk.Label(self.output_scale_frame, text=self.t("output_size") + ":")
+        self.output_scale_label.pack(side=tk.LEFT, padx=5)
+        self.output_scale_combo = ttk.Combobox(self.output_scale_frame, values=OUTPUT_SCALES, width=8)
+        self.output_scale_combo.pack(side=tk.LEFT, padx=5, fill=tk.X, expand=True)
+        self.output_scale_combo.set(self.output_scale)
+        self.output_scale_combo.bind("<<ComboboxSelected>>", self.on_encoding_change)
+        self.output_scale_combo.bind("<Return>", self.on_encoding_change)
+        self.output_scale_combo.bind("<FocusOut>", self.on_encoding_change)
+        self.scaler_combo = ttk.Combobox(self.output_scale_frame, values=list(SCALERS), width=12)
+        self.scaler_combo.pack(side=tk.LEFT, padx=5, fill=tk.X, expand=True)
+        self.scaler_combo.set(self.scaler)
+        self.scaler_combo.config(state="readonly")
+        self.scaler_combo.bind("<<ComboboxSelected>>", self.on_encoding_change)
+
+        self.expected_speed_label = ttk.Label(self.advanced_settings_frame, text="", font=("Arial", 9))
+        self.expected_speed_label.pack(anchor=tk.W, padx=15)
+
+        self.follow_cursor_var = tk.BooleanVar(value=self.follow_cursor)
+        self.follow_cursor_check = ttk.Checkbutton(self.advanced_settings_frame, text=self.t("follow_cursor"),
+                                                   variable=self.follow_cursor_var, command=self.save_config)
+        self.follow_cursor_check.pack(anchor=tk.W, padx=15, pady=5)
+
+        self.audio_codec_frame = ttk.Frame(self.advanced_settings_frame)
+        self.audio_codec_frame.pack(fill=tk.X, padx=10, pady=(0, 10))
+        self.audio_codec_label = ttk.Label(self.audio_codec_frame, text=self.t("audio_codec") + ":")
+        self.audio_codec_label.pack(side=tk.LEFT, padx=5)
+        self.audio_codec_combo = ttk.Combobox(self.audio_codec_frame, values=self.audio_codecs, width=10)
+        self.audio_codec_combo.pack(side=tk.LEFT, padx=5, fill=tk.X, expand=True)
+        self.audio_codec_combo.set(self.audio_codec)
+        self.audio_codec_combo.config(state="readonly")
+        self.audio_codec_combo.bind("<<ComboboxSelected>>", self.on_encoding_change)
+        self.audio_bitrate_combo = ttk.Combobox(self.audio_codec_frame, values=list(AUDIO_BITRATES), width=6)
+        self.audio_bitrate_combo.pack(side=tk.LEFT, padx=5)
+        self.audio_bitrate_combo.set(self.audio_bitrate)
+        self.audio_bitrate_combo.config(state="readonly")
+        self.audio_bitrate_combo.bind("<<ComboboxSelected>>", self.save_config)
+
         self.right_panel = ttk.Frame(self.content_frame)
         self.right_panel.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True, padx=5, pady=5)
         
@@ -362,6 +568,9 @@ class ScreenRecorderBase(abc.ABC):
 
         self.select_area_btn_frame = ttk.Frame(self.main_buttons_frame, width=160, height=35)
         self.select_area_btn_frame.pack(side=tk.LEFT, padx=5, pady=5)
+
+        self.select_window_btn_frame = ttk.Frame(self.main_buttons_frame, width=160, height=35)
+        self.select_window_btn_frame.pack(side=tk.LEFT, padx=5, pady=5)
         
 
         self.toggle_btn = ttk.Button(self.toggle_btn_frame, text=self.t("start_recording"), 
@@ -376,6 +585,10 @@ class ScreenRecorderBase(abc.ABC):
                                         command=self.select_area)
         self.select_area_btn.pack(fill=tk.BOTH, expand=True)
 
+        self.select_window_btn = ttk.Button(self.select_window_btn_frame, text=self.t("select_window"),
+                                          command=self.select_window)
+        self.select_window_btn.pack(fill=tk.BOTH, expand=True)
+
         self.extra_buttons_frame = ttk.Frame(self.controls_frame)
         self.extra_buttons_frame.pack(fill=tk.X, padx=5, pady=5)
 
@@ -401,6 +614,10 @@ class ScreenRecorderBase(abc.ABC):
         self.timer_label = ttk.Label(self.bottom_panel, text="00:00:00")
         self.timer_label.pack(side=tk.LEFT, padx=20, pady=5)
         self.timer_label.config(font=("Arial", 12, "bold"))
+
+        self.telemetry_label = ttk.Label(self.bottom_panel, text="")
+        self.telemetry_label.pack(side=tk.LEFT, padx=10, pady=5)
+        self.telemetry_label.config(font=("Arial", 9))
         
         self.status_label = ttk.Label(self.bottom_panel, text=self.t("status_ready"))
         self.status_label.pack(side=tk.RIGHT, padx=20, pady=5)
@@ -413,6 +630,29 @@ class ScreenRecorderBase(abc.ABC):
         
         self.root.minsize(950, 600)
     
+    def update_settings_scroll(self, event=None):
+        canvas = self.settings_canvas
+        height = self.settings_panel.winfo_reqheight()
+        canvas.itemconfigure(self.settings_window, width=canvas.winfo_width())
+        canvas.configure(scrollregion=(0, 0, canvas.winfo_width(), height))
+        if height > canvas.winfo_height():
+            if not self.settings_scrollbar.winfo_ismapped():
+                self.settings_scrollbar.pack(side=tk.RIGHT, fill=tk.Y, before=canvas)
+        elif self.settings_scrollbar.winfo_ismapped():
+            self.settings_scrollbar.pack_forget()
+            canvas.yview_moveto(0)
+
+    def on_settings_wheel(self, event):
+        try:
+            widget = self.root.winfo_containing(event.x_root, event.y_root)
+        except KeyError:
+            # The drop-down list of a combobox is a Tk widget that Tkinter has no wrapper for.
+            return
+        if widget is None or not str(widget).startswith(str(self.settings_canvas)) or \
+                not self.settings_scrollbar.winfo_ismapped():
+            return
+        self.settings_canvas.yview_scroll(-1 if event.num == 4 or event.delta > 0 else 1, "units")
+
     @abc.abstractmethod
     def get_audio_devices(self):
         pass
@@ -434,12 +674,20 @@ class ScreenRecorderBase(abc.ABC):
         with mss.mss() as sct:
             while self.preview_running:
                 try:
+                    frame_start = time.perf_counter()
                     if self.monitor_combo and self.monitor_combo.winfo_exists():
                         monitor_index = self.monitor_combo.current()
                     else:
                         break
                     
-                    if monitor_index < len(sct.monitors) - 1:
+                    if self.record_window:
+                        monitor = {
+                            "left": self.record_window['x'],
+                            "top": self.record_window['y'],
+                            "width": self.record_window['width'],
+                            "height": self.record_window['height']
+                        }
+                    elif monitor_index < len(sct.monitors) - 1:
                         monitor = sct.monitors[monitor_index + 1]
                         
                         if self.record_area:
@@ -486,6 +734,8 @@ class ScreenRecorderBase(abc.ABC):
                     if self.preview_label and self.preview_label.winfo_exists():
                         self.root.after(0, self._update_preview_label, tk_image)
 
+                    if profiling.is_enabled():
+                        profiling.record("preview_frame", time.perf_counter() - frame_start)
                     time.sleep(0.03)
                 except tk.TclError:
                     break
@@ -508,11 +758,14 @@ class ScreenRecorderBase(abc.ABC):
     def on_closing(self):
         self.close_preview()
         if self.running:
-            if messagebox.askokcancel(self.t("warning"), self.t("warning_quit")):
-                self.stop_recording()
-                self.root.destroy()
-        else:
-            self.root.destroy()
+            if not messagebox.askokcancel(self.t("warning"), self.t("warning_quit")):
+                return
+            self.stop_recording()
+        self.stop_all_sessions()
+        self.stop_control_server()
+        self.stop_staging_mover()
+        self.config_writer.flush()
+        self.root.destroy()
 
     def browse_output_folder(self):
         from tkinter import filedialog
@@ -527,41 +780,71 @@ class ScreenRecorderBase(abc.ABC):
             self.output_folder_var.set(new_folder)
             self.save_config()
             self.create_output_folder()
+            self.measure_output_disk()
             
     def on_monitor_change(self, event=None):
-        if self.running:
+        if self.running and not self.paused:
             self.stop_current_recording()
             self.start_new_recording()
         self.save_config()
+        self.update_expected_speed()
+
+    def on_encoding_change(self, event=None):
+        try:
+            compute_output_size(1920, 1080, self.output_scale_combo.get())
+        except ValueError:
+            self.output_scale_combo.set("native")
+        self.sync_output_format()
+        self.save_config()
+        self.update_expected_speed()
+
+    def get_record_mode(self):
+        return RECORD_MODES[self.record_mode_combo.current()]
+
+    def get_record_mode_names(self):
+        return [self.t(RECORD_MODE_KEYS[mode]) for mode in RECORD_MODES]
+
+    def on_record_mode_change(self, event=None):
+        if self.get_record_mode() != 'video' and not self.audio_devices:
+            messagebox.showerror(self.t("error"), self.t("error_no_audio_devices"))
+            self.record_mode_combo.current(RECORD_MODES.index('video'))
+        self.save_config()
+
+    def sync_output_format(self):
+        for codec in (self.codec_combo.get(), self.audio_codec_combo.get()):
+            if codec in MKV_ONLY_CODECS and self.format_combo.get() != "mkv":
+                self.logger.info(f"{codec} cannot be stored in {self.format_combo.get()}, switching to mkv")
+                self.format_combo.set("mkv")
+
+    def update_expected_speed(self):
+        monitor = self.monitors[self.monitor_combo.current()]
+        width, height = monitor.width, monitor.height
+        if self.record_window:
+            width, height = self.record_window['width'], self.record_window['height']
+        elif self.record_area:
+            x1, y1, x2, y2 = self.record_area
+            width, height = x2 - x1, y2 - y1
+        width, height = max(2, width - width % 2), max(2, height - height % 2)
+
+        try:
+            output_size = compute_output_size(width, height, self.output_scale_combo.get())
+        except ValueError:
+            output_size = None
+        scaler = self.scaler_combo.get() if output_size else None
+        speed, measured = self.calibration.expected_speed(self.codec_combo.get(), *(output_size or (width, height)), scaler)
+        if speed is None:
+            self.expected_speed_label.config(text="")
+            return
+        key = "expected_speed" if measured else "expected_speed_estimated"
+        self.expected_speed_label.config(text=self.t(key).format(speed=f"{speed:.2f}"))
         
     def start_new_recording(self):
-        self.create_new_video_file()
         self.start_recording(continue_timer=True)
         
-    def create_new_video_file(self):
-        video_name = f"Video_part{self.current_video_part}.{datetime.datetime.now().strftime('%m-%d-%Y.%H.%M.%S')}.mkv"
-        self.video_path = os.path.join(self.output_folder, video_name)
-        
     def stop_current_recording(self):
-        if self.recording_process:
-            try:
-                self.recording_process.stdin.write('q')
-                self.recording_process.stdin.flush()
-            except (BrokenPipeError, OSError):
-                pass
-            try:
-                self.recording_process.wait(timeout=5)
-            except subprocess.TimeoutExpired:
-                self.recording_process.terminate()
-                try:
-                    self.recording_process.wait(timeout=2)
-                except subprocess.TimeoutExpired:
-                    self.recording_process.kill()
-
-            if os.path.exists(self.video_path) and os.path.getsize(self.video_path) > 0:
-                self.video_parts.append(self.video_path)
-            self.current_video_part += 1
-            self.recording_process = None
+        session = self.sessions.get('main')
+        if session:
+            session.stop_part()
             
     def toggle_recording(self):
         if not self.running:
@@ -570,6 +853,188 @@ class ScreenRecorderBase(abc.ABC):
         else:
             self.stop_recording()
             self.toggle_btn.config(text=self.t("start_recording"))
+
+    def pause_recording(self):
+        if not self.running or self.paused:
+            return False
+        self.stop_current_recording()
+        self.paused = True
+        self.paused_at = time.monotonic()
+        self.status_label.config(text=self.t("status_paused"))
+        self.logger.info("RECORDING PAUSED")
+        return True
+
+    def resume_recording(self):
+        if not self.running or not self.paused:
+            return False
+        self.paused = False
+        if self.paused_at is not None:
+            self.paused_total += time.monotonic() - self.paused_at
+            self.paused_at = None
+        self.start_new_recording()
+        self.logger.info("RECORDING RESUMED")
+        return True
+
+    def get_recording_elapsed(self):
+        session = self.sessions.get('main')
+        if session and (session.is_active or session.completed_duration):
+            return session.recorded_duration()
+        if self.recording_started_at is None:
+            return 0.0
+        now = self.paused_at if self.paused_at is not None else time.monotonic()
+        return max(0.0, now - self.recording_started_at - self.paused_total)
+
+    def add_marker(self, label=None):
+        if not self.running:
+            return None
+        marker = {
+            'index': len(self.markers) + 1,
+            'label': label or f"Marker {len(self.markers) + 1}",
+            'time': round(self.get_recording_elapsed(), 3),
+            'wallclock': datetime.datetime.now().isoformat(timespec='milliseconds')
+        }
+        self.markers.append(marker)
+        self.logger.info(f"MARKER ADDED: {marker['label']} at {marker['time']}s")
+        return marker
+
+    def save_markers(self, output_file):
+        if not self.markers:
+            return None
+        markers_file = os.path.splitext(output_file)[0] + ".markers.json"
+        try:
+            with open(markers_file, 'w', encoding='utf-8') as f:
+                json.dump({'video': os.path.basename(output_file), 'markers': self.markers}, f, indent=2)
+        except OSError as e:
+            self.logger.error(f"Error saving markers: {e}")
+            markers_file = None
+        self.markers = []
+        return markers_file
+
+    def start_control_server(self):
+        self.control_server = ControlServer(self.handle_control_command, self.control_token, DEFAULT_CONTROL_HOST,
+                                            self.control_port)
+        try:
+            self.control_server.start()
+            self.logger.info(f"Control API listening on {DEFAULT_CONTROL_HOST}:{self.control_server.port}")
+        except OSError as e:
+            self.logger.error(f"Could not start control API on port {self.control_port}: {e}")
+            self.control_server = None
+
+    def stop_control_server(self):
+        if self.control_server:
+            self.control_server.stop()
+            self.control_server = None
+
+    def notify(self, show, title, message):
+        # Dialogs would block the UI thread until someone clicks them; a control API command
+        # gets the message in its reply instead.
+        if self.control_messages is not None:
+            self.control_messages.append(message)
+            return
+        show(title, message)
+
+    def get_status(self):
+        main_session = self.sessions.get('main')
+        if not self.running:
+            state = "idle"
+        elif self.paused:
+            state = "paused"
+        else:
+            state = "recording"
+        return {
+            'ok': True,
+            'state': state,
+            'elapsed': round(self.get_recording_elapsed(), 3) if self.running else 0.0,
+            'video_path': main_session.video_path if main_session and main_session.is_active else None,
+            'video_parts': len(main_session.video_parts) if main_session else 0,
+            'markers': len(self.markers),
+            'progress': main_session.progress.snapshot() if main_session and main_session.is_active else {},
+            'cpu_threads': self.cpu_budget.total_threads,
+            'dropped_log_records': get_dropped_log_records(),
+            'pending_moves': self.staging_mover.pending_count() if self.staging_mover else 0,
+            'sessions': [session.get_status() for session in self.sessions.values()]
+        }
+
+    def handle_control_command(self, command, params):
+        # Everything runs on the UI thread, which owns the sessions; the HTTP thread only waits.
+        handlers = {
+            'status': lambda params: self.get_status(),
+            'start': self._control_start,
+            'stop': self._control_stop,
+            'pause': self._control_pause,
+            'resume': self._control_resume,
+            'mark': self._control_mark
+        }
+        result = {}
+        done = threading.Event()
+
+        def run():
+            self.control_messages = []
+            try:
+                result.update(handlers[command](params))
+                if self.control_messages:
+                    result['messages'] = self.control_messages
+            except Exception as e:
+                self.logger.error(f"Control command '{command}' failed: {e}")
+                result.update({'ok': False, 'error': str(e)})
+            finally:
+                self.control_messages = None
+                done.set()
+
+        self.root.after(0, run)
+        if not done.wait(timeout=float(params.get('timeout', 30))):
+            return {'ok': False, 'error': f"timed out waiting for '{command}'"}
+        return result
+
+    def _control_start(self, params):
+        if params.get('session', 'main') != 'main':
+            return self._control_start_session(params)
+        if self.running:
+            return {'ok': False, 'error': 'already recording'}
+        self.toggle_recording()
+        if not self.running:
+            return {'ok': False, 'error': '; '.join(self.control_messages) or 'could not start recording'}
+        return self.get_status()
+
+    def _control_start_session(self, params):
+        record_area = params.get('area')
+        if isinstance(record_area, str):
+            record_area = tuple(int(value) for value in record_area.split(','))
+        session = self.start_extra_session(
+            params['session'],
+            int(params.get('monitor', self.monitor_combo.current())),
+            tuple(record_area) if record_area else None,
+            str(params.get('audio', False)).lower() in ('1', 'true', 'yes'),
+            {'id': str(params['window'])} if params.get('window') else None
+        )
+        return {'ok': True, 'session': session.get_status()}
+
+    def _control_stop(self, params):
+        if params.get('session', 'main') != 'main':
+            output_file = self.stop_session(params['session'])
+            if output_file is None and params['session'] not in self.sessions:
+                return {'ok': False, 'error': f"unknown session: {params['session']}"}
+            return {'ok': True, 'output_file': output_file}
+        if not self.running:
+            return {'ok': False, 'error': 'not recording'}
+        self.toggle_recording()
+        return {'ok': True, 'output_file': getattr(self, 'last_output_file', None)}
+
+    def _control_pause(self, params):
+        if not self.pause_recording():
+            return {'ok': False, 'error': 'not recording or already paused'}
+        return self.get_status()
+
+    def _control_resume(self, params):
+        if not self.resume_recording():
+            return {'ok': False, 'error': 'not paused'}
+        return self.get_status()
+
+    def _control_mark(self, params):
+        marker = self.add_marker(params.get('label'))
+        if marker is None:
+            return {'ok': False, 'error': 'not recording'}
+        return {'ok': True, 'marker': marker}
             
     def create_output_folder(self):
         if not hasattr(self, 'output_folder') or not self.output_folder:
@@ -587,7 +1052,27 @@ class ScreenRecorderBase(abc.ABC):
     def set_record_area(self, record_area):
         self.record_area = record_area
         if self.record_area:
+            self.record_window = None
             self.preview_record_area()
+        self.update_expected_speed()
+
+    def get_windows(self):
+        try:
+            return list_windows()
+        except Exception as e:
+            self.logger.error(f"Error listing windows: {e}")
+            return []
+
+    def select_window(self):
+        self.window_selector.select_window(self.get_windows(), pick_window, self.set_record_window)
+
+    def set_record_window(self, window):
+        if not window:
+            return
+        self.record_window = window
+        self.record_area = None
+        self.update_expected_speed()
+        self.logger.info(f"Recording window {window['id']} '{window['title']}' ({window['width']}x{window['height']})")
             
     def preview_record_area(self):
         x1, y1, x2, y2 = self.record_area
@@ -607,23 +1092,724 @@ class ScreenRecorderBase(abc.ABC):
         pass
         
     @abc.abstractmethod
-    def start_recording(self, continue_timer=False):
+    def get_video_input_args(self, fps, x, y, width, height):
         pass
-        
-    def update_status_label_error_recording(self, text):
-        self.status_label.after(0, lambda: self.status_label.config(text=text))
-        
+
     @abc.abstractmethod
-    def stop_recording(self):
+    def get_window_input_args(self, window, fps, width, height):
         pass
-        
+
     @abc.abstractmethod
-    def read_ffmpeg_output(self):
+    def get_audio_input_args(self, audio_device):
         pass
+
+    def get_popen_kwargs(self):
+        return {}
+
+    def get_encoders(self):
+        # A saved codec this ffmpeg build lacks would only fail when recording starts; check it up front.
+        ffmpeg_path = self.get_ffmpeg_path()
+        if not ffmpeg_path:
+            return set()
+        try:
+            result = subprocess.run([ffmpeg_path, '-hide_banner', '-encoders'], capture_output=True, text=True,
+                                    **self.get_popen_kwargs())
+        except OSError as e:
+            self.logger.error(f"Could not list FFmpeg encoders: {e}")
+            return set()
+        return parse_encoders(result.stdout)
+
+    def get_recording_settings(self):
+        self.sync_output_format()
+        return {
+            'fps': int(self.fps_combo.get()),
+            'bitrate': self.bitrate_combo.get(),
+            'codec': self.codec_combo.get(),
+            'format': self.format_combo.get(),
+            'audio_device': self.audio_combo.get(),
+            'volume': self.volume_scale.get(),
+            'audio_codec': self.audio_codec_combo.get(),
+            'audio_bitrate': self.audio_bitrate_combo.get(),
+            'output_scale': self.output_scale_combo.get(),
+            'scaler': self.scaler_combo.get()
+        }
+
+    def get_capture_geometry(self, session):
+        if session.window:
+            return self.get_window_geometry(session)
+
+        monitor = self.monitors[session.monitor_index]
+
+        if session.record_area:
+            x1, y1, x2, y2 = session.record_area
+            width = x2 - x1
+            height = y2 - y1
+
+            if width <= 0 or height <= 0:
+                raise ValueError("error_invalid_area")
+
+            width -= width % 2
+            height -= height % 2
+            if width <= 0 or height <= 0:
+                raise ValueError("error_adjusted_area")
+        else:
+            x1 = y1 = 0
+            width = monitor.width
+            height = monitor.height
+
+        return x1 + monitor.x, y1 + monitor.y, width, height
+
+    def get_window_geometry(self, session):
+        # The window may have moved or been resized since it was picked.
+        window = read_window(session.window['id'])
+        if not window:
+            raise ValueError("error_window_not_found")
+        session.window = window
+
+        width = window['width'] - window['width'] % 2
+        height = window['height'] - window['height'] % 2
+        if width <= 0 or height <= 0:
+            raise ValueError("error_adjusted_area")
+        return window['x'], window['y'], width, height
+
+    def build_ffmpeg_args(self, session):
+        if not session.include_video:
+            return self.build_audio_only_ffmpeg_args(session)
+
+        settings = session.settings
+        x, y, width, height = session.geometry
+
+        ffmpeg_args = [self.get_ffmpeg_path()]
+        if session.viewport:
+            ffmpeg_args.extend(["-stats_period", str(FOLLOW_STATS_PERIOD)])
+        ffmpeg_args.extend(build_input_options(self.thread_queue_size, self.wallclock_timestamps))
+        if session.window:
+            ffmpeg_args.extend(self.get_window_input_args(session.window, settings['fps'], width, height))
+        else:
+            ffmpeg_args.extend(self.get_video_input_args(settings['fps'], x, y, width, height))
+        audio_inputs = self.add_audio_inputs(session, ffmpeg_args) if session.include_audio else []
+        video_filters = []
+        if session.viewport:
+            video_filters.append(build_crop_filter(FOLLOW_FILTER, *session.viewport))
+        if session.output_size:
+            video_filters.append(build_scale_filter(*session.output_size, settings['scaler']))
+
+        if session.proxy_path:
+            return self.build_proxy_ffmpeg_args(session, ffmpeg_args, video_filters, audio_inputs)
+
+        ffmpeg_args.extend(self.get_audio_stream_args(session, audio_inputs))
+        ffmpeg_args.extend([
+            "-threads", str(session.threads),
+            "-pix_fmt", "yuv420p",
+            "-loglevel", "info",
+            "-hide_banner"
+        ])
+        if video_filters:
+            ffmpeg_args.extend(["-filter:v", ",".join(video_filters)])
+        ffmpeg_args.extend(self.get_master_output_args(session))
+        if session.meter:
+            ffmpeg_args.extend(build_meter_output_args("[ameter]", METER_SAMPLE_RATE))
+        return ffmpeg_args
+
+    def build_audio_only_ffmpeg_args(self, session):
+        ffmpeg_args = [self.get_ffmpeg_path()]
+        audio_inputs = self.add_audio_inputs(session, ffmpeg_args)
+        ffmpeg_args.extend(self.get_audio_stream_args(session, audio_inputs))
+        ffmpeg_args.extend(["-loglevel", "info", "-hide_banner"])
+        ffmpeg_args.extend(self.get_master_output_args(session))
+        if session.meter:
+            ffmpeg_args.extend(build_meter_output_args("[ameter]", METER_SAMPLE_RATE))
+        return ffmpeg_args
+
+    def get_audio_sources(self, session):
+        sources = [(session.settings['audio_device'], round(session.settings['volume']))]
+        if session.name == 'main':
+            sources.extend(source for source in self.extra_audio_sources if source[0] != sources[0][0])
+        return sources
+
+    def add_audio_inputs(self, session, ffmpeg_args):
+        # All sources are inputs of the same ffmpeg process; returns (input index, filter chain) pairs.
+        first_index = 1 if session.include_video else 0
+        input_options = build_input_options(self.audio_thread_queue_size, self.wallclock_timestamps)
+        audio_inputs = []
+        session.audio_inputs = {}
+        for offset, (device, volume) in enumerate(self.get_audio_sources(session)):
+            ffmpeg_args.extend(input_options)
+            ffmpeg_args.extend(self.get_audio_input_args(device))
+            audio_inputs.append((first_index + offset, build_audio_filter(volume / 100, self.audio_async)))
+            session.audio_inputs[first_index + offset] = device
+        return audio_inputs
+
+    def get_audio_stream_args(self, session, audio_inputs):
+        args = []
+        if len(audio_inputs) > 1 or session.meter:
+            graph, labels = build_audio_graph(audio_inputs, self.audio_tracks, ["ameter"] if session.meter else [])
+            args.extend(["-filter_complex", ";".join(graph)])
+        else:
+            labels = [f"{index}:a" for index, _ in audio_inputs]
+            if audio_inputs and audio_inputs[0][1]:
+                args.extend(["-filter:a", audio_inputs[0][1]])
+        if len(audio_inputs) > 1 or session.meter or self.is_live_session(session):
+            if session.include_video:
+                args.extend(["-map", "0:v"])
+            for label in labels:
+                args.extend(["-map", label])
+        return args
+
+    def is_live_session(self, session):
+        return bool(self.live_output) and session.name == 'main'
+
+    def get_master_output_args(self, session):
+        settings = session.settings
+        output_args = []
+        if session.include_video:
+            output_args.extend(build_video_codec_args(settings['codec'], settings['bitrate'], session.threads,
+                                                      self.encoder_controls.slices))
+        if session.include_audio:
+            output_args.extend(build_audio_codec_args(settings['audio_codec'], settings['audio_bitrate'],
+                                                      self.audio_sample_rate, self.audio_channels))
+        disk_profile = self.disk_profile if self.disk_profile and \
+            self.disk_profile.folder == self.get_recording_folder() else None
+        live = self.is_live_session(session)
+        if disk_profile:
+            output_args.extend(disk_profile.muxer_args(settings['format'], tee=live))
+        if live:
+            # The tee muxer writes the same encoded packets to the file and the network target.
+            # Headers must be global so both muxers get them.
+            output_args.extend(["-flags", "+global_header", "-f", "tee",
+                                build_tee_output(session.video_path, settings['format'],
+                                                 self.live_output, self.live_format,
+                                                 disk_profile.muxer_options(settings['format']) if disk_profile else None)])
+        else:
+            output_args.append(session.video_path)
+        return output_args
+
+    def build_proxy_ffmpeg_args(self, session, ffmpeg_args, video_filters, audio_inputs):
+        # One process feeds both outputs: the capture is decoded and filtered once and split
+        # into the master and proxy encoders. -benchmark_all reports each encoder's cost.
+        video_chain = ",".join(video_filters) or "null"
+        if self.proxy_mode == 'video':
+            graph = [f"[0:v]{video_chain},split=2[vmain][vp]",
+                     f"[vp]{build_scale_filter(*session.proxy_size, 'fast_bilinear')}[vproxy]"]
+        else:
+            graph = [f"[0:v]{video_chain}[vmain]"]
+        audio_labels = []
+        if audio_inputs:
+            branches = ["aproxy", "ameter"] if session.meter else ["aproxy"]
+            audio_graph, audio_labels = build_audio_graph(audio_inputs, self.audio_tracks, branches)
+            graph.extend(audio_graph)
+
+        ffmpeg_args.extend([
+            "-filter_complex", ";".join(graph),
+            "-loglevel", "info",
+            "-hide_banner",
+            "-benchmark_all"
+        ])
+
+        ffmpeg_args.extend(["-map", "[vmain]"])
+        for label in audio_labels:
+            ffmpeg_args.extend(["-map", label])
+        ffmpeg_args.extend(["-threads", str(session.threads), "-pix_fmt", "yuv420p"])
+        ffmpeg_args.extend(self.get_master_output_args(session))
+
+        if self.proxy_mode == 'video':
+            ffmpeg_args.extend(["-map", "[vproxy]"])
+            if audio_inputs:
+                ffmpeg_args.extend(["-map", "[aproxy]"])
+            ffmpeg_args.extend(["-pix_fmt", "yuv420p"])
+            ffmpeg_args.extend(build_video_codec_args("libx264", self.proxy_bitrate, session.threads,
+                                                      preset="ultrafast"))
+        else:
+            ffmpeg_args.extend(["-map", "[aproxy]"])
+        if audio_inputs:
+            ffmpeg_args.extend(["-c:a", "aac", "-b:a", AAC_AUDIO_BITRATE])
+        ffmpeg_args.append(session.proxy_path)
+        if session.meter:
+            ffmpeg_args.extend(build_meter_output_args("[ameter]", METER_SAMPLE_RATE))
+        return ffmpeg_args
+
+    @profiling.timed("launch_session")
+    def launch_session(self, session):
+        if session.include_video:
+            self.prepare_video_capture(session)
+        else:
+            session.settings['format'] = AUDIO_ONLY_FORMATS[session.settings['audio_codec']]
+
+        others = [s for s in self.sessions.values() if s is not session and s.is_active]
+        allocation = self.cpu_budget.allocate({s.name: s.weight for s in others + [session]})
+        session.threads = self.encoder_controls.threads or allocation[session.name]
+
+        self.spawn_session(session)
+        self.sessions[session.name] = session
+        self.start_disk_monitor()
+        self.start_watchdog()
+        self.start_resource_sampler(session)
+        if session.follower:
+            session.follower.start()
+
+        if self.encoder_controls.threads:
+            return
+
+        for other in others:
+            if other.threads == 0 or allocation[other.name] < other.threads:
+                self.logger.info(f"Rebalancing session '{other.name}' from {other.threads or 'auto'} to {allocation[other.name]} threads")
+                other.stop_part()
+                other.threads = allocation[other.name]
+                self.spawn_session(other)
+
+    def prepare_video_capture(self, session):
+        session.geometry = self.get_capture_geometry(session)
+        if session.follow_cursor and not session.window:
+            if session.follower is None:
+                session.follower = CursorFollower(self.root, session, self.follow_cursor_smoothing)
+            session.follower.place(*parse_viewport_size(self.follow_cursor_size))
+        encoded_size = session.viewport[:2] if session.viewport else session.geometry[2:]
+        session.output_size = compute_output_size(*encoded_size, session.settings['output_scale'])
+        try:
+            session.proxy_size = (compute_output_size(*(session.output_size or encoded_size), self.proxy_size)
+                                  or session.output_size or encoded_size)
+        except ValueError:
+            self.logger.warning(f"Invalid proxy_size '{self.proxy_size}', using the recorded size for the proxy")
+            session.proxy_size = session.output_size or encoded_size
+
+    @profiling.timed("spawn_session")
+    def spawn_session(self, session):
+        suffix = "" if session.name == "main" else f".{session.name}"
+        prefix = "Video" if session.include_video else "Audio"
+        video_name = f"{prefix}{suffix}.{datetime.datetime.now().strftime('%m-%d-%Y.%H.%M.%S')}.{session.settings['format']}"
+        session.video_path = os.path.join(self.get_recording_folder(), video_name)
+        base_path = os.path.splitext(session.video_path)[0]
+        if not session.include_video:
+            session.proxy_path = None
+        elif self.proxy_mode == 'video':
+            session.proxy_path = f"{base_path}.proxy.{session.settings['format']}"
+        elif self.proxy_mode == 'audio' and session.include_audio:
+            session.proxy_path = f"{base_path}.proxy.m4a"
+        else:
+            session.proxy_path = None
+        if session.meter is None and self.audio_meter and session.include_audio and session.name == 'main':
+            session.meter = AudioLevelMeter()
+
+        ffmpeg_args = self.build_ffmpeg_args(session)
+        if self.is_live_session(session):
+            self.logger.info(f"Streaming session '{session.name}' to {self.live_output} "
+                             f"({live_format_for(self.live_output, self.live_format)})")
+        self.logger.info(f"Starting session '{session.name}' with {session.threads or 'auto'} encoder threads")
+        session.start(self.encoder_controls.wrap_command(ffmpeg_args),
+                      self.encoder_controls.update_popen_kwargs(self.get_popen_kwargs()))
+        self.encoder_controls.apply_after_spawn(session.process.pid, session.name)
+        self.logger.info(f"Encoder limits for session '{session.name}': "
+                         f"{self.encoder_controls.describe_effective(session.process.pid, session.threads)}")
+
+    @profiling.timed("start_recording")
+    def start_recording(self, continue_timer=False):
+        session = self.sessions.get('main') if continue_timer else None
+        if session is None:
+            mode = self.get_record_mode()
+            if mode != 'video' and not self.audio_devices:
+                self.notify(messagebox.showerror, self.t("error"), self.t("error_no_audio_devices"))
+                self.toggle_widgets(False)
+                return
+            session = RecordingSession('main', include_audio=mode != 'video', include_video=mode != 'audio')
+        session.monitor_index = self.monitor_combo.current()
+        session.record_area = self.record_area
+        session.window = self.record_window
+        session.follow_cursor = self.follow_cursor_var.get()
+        session.settings = self.get_recording_settings()
+
+        if not continue_timer and not self.check_free_space(session):
+            self.notify(messagebox.showerror, self.t("error"), self.t("error_disk_full"))
+            self.update_status_label_error_recording(self.t("error_recording"))
+            self.toggle_widgets(False)
+            return
+
+        try:
+            self.launch_session(session)
+        except ValueError as e:
+            self.notify(messagebox.showerror, self.t("error"), self.t(str(e)))
+            self.update_status_label_error_recording(self.t("error_recording"))
+            self.stop_recording()
+            self.stop_timer()
+            self.toggle_widgets(False)
+            return
+        except FileNotFoundError as e:
+            self.notify(messagebox.showerror, "Error", f"FFmpeg not found.")
+            self.update_status_label_error_recording(self.t("error_recording"))
+            self.logger.error(f"FFmpeg not found: {e}")
+            self.stop_recording()
+            self.stop_timer()
+            self.toggle_widgets(False)
+            return
+        except Exception as e:
+            self.notify(messagebox.showerror, "Error", f"An error has occurred.")
+            self.update_status_label_error_recording(self.t("error_recording"))
+            self.logger.error(f"Error starting recording: {e}")
+            self.stop_recording()
+            self.stop_timer()
+            self.toggle_widgets(False)
+            return
+
+        self.toggle_widgets(recording=True)
+        self.status_label.config(text=self.t("status_recording"))
+
+        if not continue_timer:
+            self.start_timer()
+
+    def start_extra_session(self, name, monitor_index, record_area=None, include_audio=False, window=None):
+        if name == 'main' or (name in self.sessions and self.sessions[name].is_active):
+            raise ValueError(f"session '{name}' is already recording")
+        if not 0 <= monitor_index < len(self.monitors):
+            raise ValueError(f"invalid monitor index: {monitor_index}")
+
+        if include_audio and not self.audio_devices:
+            raise ValueError("no audio devices")
+        session = RecordingSession(name, monitor_index, record_area, include_audio)
+        session.window = window
+        session.settings = self.get_recording_settings()
+        self.launch_session(session)
+        return session
+
+    @profiling.timed("stop_session")
+    def stop_session(self, name):
+        session = self.sessions.pop(name, None)
+        if session is None:
+            return None
+        if session.follower:
+            session.follower.stop()
+        session.stop_part()
+        self.stop_resource_sampler(session)
+        if not self.sessions:
+            self.stop_disk_monitor()
+            self.stop_watchdog()
+        return self.concat_video_parts(session)
+
+    @profiling.timed("stop_recording")
+    def stop_recording(self):
+        session = self.sessions.pop('main', None)
+        if not self.sessions:
+            self.stop_disk_monitor()
+            self.stop_watchdog()
+        if session:
+            if session.follower:
+                session.follower.stop()
+            session.stop_part()
+            self.stop_resource_sampler(session)
+            self.concat_video_parts(session)
         
-    @abc.abstractmethod
-    def concat_video_parts(self):
-        pass
+        self.toggle_widgets(recording=False)
+        self.stop_timer()
+        self.status_label.config(text=self.t("status_ready"))
+        
+        self.record_area = None
+        self.record_window = None
+        self.running = False
+
+    def stop_all_sessions(self):
+        for name in list(self.sessions):
+            if name != 'main':
+                self.stop_session(name)
+        self.encoder_controls.cleanup()
+        
+    def get_recording_folder(self):
+        return self.staging_folder or self.output_folder
+
+    def start_staging_mover(self):
+        if not self.staging_folder:
+            return
+        try:
+            os.makedirs(self.staging_folder, exist_ok=True)
+        except OSError as e:
+            self.logger.error(f"Staging folder {self.staging_folder} is not usable, writing directly to the output folder: {e}")
+            self.staging_folder = ''
+            return
+        self.staging_mover = StagingMover(self.staging_folder)
+        self.staging_mover.start()
+        self.logger.info(f"Recording through staging folder {self.staging_folder}")
+
+    def stop_staging_mover(self):
+        if not self.staging_mover:
+            return
+        if not self.staging_mover.wait(timeout=5):
+            self.logger.warning(f"{self.staging_mover.pending_count()} staged files are still waiting to be moved; "
+                                f"they will be moved the next time the app starts")
+        self.staging_mover.stop()
+
+    def finish_output_file(self, output_file, *extra_files):
+        if not self.staging_mover:
+            return output_file
+        for path in (output_file,) + extra_files:
+            if path:
+                self.staging_mover.enqueue(path, self.output_folder)
+        return self.staging_mover.destination_for(output_file, self.output_folder)
+
+    def start_resource_sampler(self, session):
+        if session.sampler or self.sampler_interval <= 0:
+            return
+        metrics_path = os.path.splitext(session.video_path)[0] + ".metrics.jsonl"
+        try:
+            session.sampler = ResourceSampler(session, metrics_path, self.sampler_interval)
+            session.sampler.start()
+        except OSError as e:
+            self.logger.error(f"Could not start resource sampler: {e}")
+            session.sampler = None
+
+    def stop_resource_sampler(self, session):
+        if not session.sampler:
+            return
+        session.sampler.stop()
+        self.logger.info(f"Session '{session.name}' summary: {session.sampler.format_summary()}")
+
+    def rename_metrics_file(self, session, output_file):
+        if not session.sampler or not os.path.exists(session.sampler.path):
+            return None
+        metrics_file = os.path.splitext(output_file)[0] + ".metrics.jsonl"
+        try:
+            os.replace(session.sampler.path, metrics_file)
+        except OSError as e:
+            self.logger.error(f"Error renaming metrics file: {e}")
+            return None
+        return metrics_file
+
+    def measure_output_disk(self):
+        folder = self.get_recording_folder()
+
+        def measure():
+            try:
+                profile = OutputDiskProfile.load_or_measure(folder)
+            except OSError as e:
+                self.logger.error(f"Error measuring write speed of {folder}: {e}")
+                return
+            self.disk_profile = profile
+            self.logger.info(f"Recording folder: {profile.describe()}")
+
+        threading.Thread(target=measure, daemon=True).start()
+
+    def get_session_bytes_per_second(self, session):
+        configured = parse_bitrate(session.settings['bitrate']) * 1000 / 8 if session.include_video else 0
+        if session.include_audio:
+            configured += AUDIO_BYTES_PER_SECOND
+        progress = session.progress.snapshot()
+        observed = 0
+        if progress.get('size_bytes') and progress.get('out_time'):
+            observed = progress['size_bytes'] / progress['out_time']
+        return max(configured, observed)
+
+    def get_output_bytes_per_second(self):
+        return sum(self.get_session_bytes_per_second(session)
+                   for session in list(self.sessions.values()) if session.is_active)
+
+    def check_free_space(self, session):
+        try:
+            free_space = shutil.disk_usage(self.get_recording_folder()).free
+        except OSError:
+            return True
+
+        bytes_per_second = self.get_session_bytes_per_second(session) + self.get_output_bytes_per_second()
+        seconds_left = free_space / bytes_per_second
+        if self.disk_profile and self.disk_profile.write_mbps and \
+                self.disk_profile.write_mbps * 1024 * 1024 < bytes_per_second * 2:
+            self.logger.warning(f"Output folder writes at {self.disk_profile.write_mbps:.1f} MB/s, "
+                                f"which is close to the recording rate of {bytes_per_second / 1024 / 1024:.1f} MB/s")
+        return seconds_left >= 60
+
+    def start_disk_monitor(self):
+        if self.disk_monitor:
+            return
+        self.disk_monitor = DiskSpaceMonitor(
+            self.get_recording_folder(),
+            self.get_output_bytes_per_second,
+            lambda seconds_left: self.root.after(0, self.on_low_disk_space, seconds_left),
+            lambda seconds_left: self.root.after(0, self.on_disk_almost_full, seconds_left),
+            warn_seconds=self.disk_warn_minutes * 60,
+            reserve_mb=self.disk_reserve_mb
+        )
+        self.disk_monitor.start()
+
+    def stop_disk_monitor(self):
+        if self.disk_monitor:
+            self.disk_monitor.stop()
+            self.disk_monitor = None
+
+    def start_watchdog(self):
+        if self.watchdog or self.watchdog_stall_seconds <= 0:
+            return
+        self.watchdog = EncoderWatchdog(
+            lambda: list(self.sessions.values()),
+            lambda session, process, reason, stalled_since: self.root.after(
+                0, self.on_encoder_failure, session, process, reason, stalled_since),
+            stall_seconds=self.watchdog_stall_seconds
+        )
+        self.watchdog.start()
+
+    def stop_watchdog(self):
+        if self.watchdog:
+            self.watchdog.stop()
+            self.watchdog = None
+
+    def on_encoder_failure(self, session, process, reason, stalled_since):
+        # The part may have been stopped on purpose (pause, stop, rebalancing) since the watchdog fired.
+        if session.process is not process or self.sessions.get(session.name) is not session:
+            return
+        if session.name == 'main' and (not self.running or self.paused):
+            return
+        if session.started_at is not None and time.monotonic() - session.started_at > HEALTHY_SECONDS:
+            session.restart_attempts = 0
+
+        self.logger.error(f"Session '{session.name}': {reason}; closing part {session.current_video_part + 1}")
+        # A stalled ffmpeg rarely reacts to "q"; do not hold the UI thread for the usual 7s.
+        session.stop_part(timeout=0.5, kill_timeout=0.5)
+        if session.restart_attempts >= len(RESTART_BACKOFF_SECONDS):
+            self.logger.error(f"Session '{session.name}' failed {session.restart_attempts + 1} times in a row, "
+                              f"stopping it")
+            if session.name == 'main':
+                self.toggle_recording()
+                messagebox.showerror(self.t("error"), self.t("error_encoder_failed"))
+            else:
+                self.stop_session(session.name)
+            return
+
+        session.open_gap(stalled_since, reason)
+        delay = RESTART_BACKOFF_SECONDS[session.restart_attempts]
+        session.restart_attempts += 1
+        session.restarts += 1
+        self.logger.warning(f"Restarting session '{session.name}' in {delay}s (attempt {session.restart_attempts})")
+        if session.name == 'main':
+            self.status_label.config(text=self.t("warning_encoder_restart"))
+        self.root.after(int(delay * 1000), self.restart_session, session)
+
+    def restart_session(self, session):
+        if self.sessions.get(session.name) is not session or session.is_active:
+            return
+        if session.name == 'main':
+            if self.running and not self.paused:
+                self.start_new_recording()
+            return
+        try:
+            self.launch_session(session)
+        except Exception as e:
+            self.logger.error(f"Could not restart session '{session.name}': {e}")
+            self.stop_session(session.name)
+
+    def on_low_disk_space(self, seconds_left):
+        self.status_label.config(text=self.t("warning_low_disk_space").format(minutes=int(seconds_left // 60)))
+
+    def on_disk_almost_full(self, seconds_left):
+        # Give ffmpeg room to write the trailer of the parts we are about to close.
+        if self.disk_monitor:
+            self.disk_monitor.release_reserve()
+
+        if self.low_space_action != 'pause':
+            self.status_label.config(text=self.t("warning_disk_full"))
+            return
+
+        if self.running and not self.paused:
+            self.pause_recording()
+        for session in self.sessions.values():
+            if session.name != 'main' and session.is_active:
+                session.stop_part()
+        self.status_label.config(text=self.t("warning_disk_full"))
+        messagebox.showwarning(self.t("warning"), self.t("warning_disk_full_paused"))
+
+    def update_status_label_error_recording(self, text):
+        self.status_label.after(0, lambda: self.status_label.config(text=text))
+
+    @profiling.timed("concat_video_parts")
+    def concat_video_parts(self, session):
+        if len(session.video_parts) == 0:
+            return None
+
+        suffix = "" if session.name == "main" else f"_{session.name}"
+        concat_file = os.path.join(self.get_recording_folder(), f"concat_list{suffix}.txt")
+        prefix = "Video" if session.include_video else "Audio"
+        output_file = os.path.join(self.get_recording_folder(), f"{prefix}{suffix}_{datetime.datetime.now().strftime('%m-%d-%Y.%H.%M.%S')}.{session.settings['format']}")
+
+        parts_size = sum(os.path.getsize(video) for video in session.video_parts + session.proxy_parts
+                         if os.path.exists(video))
+        free_space = shutil.disk_usage(self.get_recording_folder()).free
+        if free_space < parts_size + 50 * 1024 * 1024:
+            self.logger.error(f"Not enough free space to merge {len(session.video_parts)} parts "
+                              f"({parts_size} bytes needed, {free_space} free); keeping the parts")
+            folder = self.keep_video_parts(session)
+            self.notify(messagebox.showwarning, self.t("warning"),
+                        self.t("warning_concat_no_space").format(folder=folder))
+            session.video_parts = []
+            session.proxy_parts = []
+            session.current_video_part = 0
+            return None
+
+        write_concat_list(concat_file, session.video_parts)
+        concat_command = build_concat_args(self.get_ffmpeg_path(), concat_file, output_file)
+
+        try:
+            self.logger.info(f"Executing command: {' '.join(concat_command)}")
+            result = subprocess.run(concat_command, check=True, capture_output=True, text=True, **self.get_popen_kwargs())
+            self.logger.debug(f"FFmpeg output: {result.stderr}")
+
+            os.remove(concat_file)
+            for video in session.video_parts:
+                if os.path.exists(video):
+                    os.remove(video)
+
+            markers_file = self.save_markers(output_file) if session.name == 'main' else None
+            metrics_file = self.rename_metrics_file(session, output_file)
+            proxy_file = self.concat_proxy_parts(session, output_file)
+            output_file = self.finish_output_file(output_file, markers_file, metrics_file, proxy_file)
+            if session.name == 'main':
+                self.last_output_file = output_file
+
+        except subprocess.CalledProcessError as e:
+            error_message = e.stderr if e.stderr else str(e)
+            for leftover in (concat_file, output_file):
+                if os.path.exists(leftover):
+                    os.remove(leftover)
+            folder = self.keep_video_parts(session)
+            self.logger.error(f"The {len(session.video_parts)} unmerged parts were kept in {folder}")
+            self.notify(messagebox.showerror, self.t("error"),
+                        self.t("error_concat_video").format(error=error_message) + "\n" +
+                        self.t("error_concat_parts_kept").format(folder=folder))
+            self.logger.error(f"ERROR MERGING VIDEO: {error_message}")
+            self.update_status_label_error_recording(self.t("error_recording"))
+            output_file = None
+
+        session.video_parts = []
+        session.proxy_parts = []
+        session.current_video_part = 0
+        return output_file
+
+    def keep_video_parts(self, session):
+        # Parts that could not be merged must not stay behind in the staging folder: move them to the
+        # output folder like a finished recording. Returns the folder the user will find them in.
+        if not self.staging_mover:
+            return self.get_recording_folder()
+        for part in session.video_parts + session.proxy_parts:
+            if os.path.exists(part):
+                self.staging_mover.enqueue(part, self.output_folder)
+        return self.output_folder
+
+    def concat_proxy_parts(self, session, output_file):
+        if not session.proxy_parts:
+            return None
+        extension = os.path.splitext(session.proxy_parts[0])[1]
+        proxy_file = os.path.splitext(output_file)[0] + ".proxy" + extension
+        concat_file = os.path.splitext(output_file)[0] + ".proxy_list.txt"
+
+        write_concat_list(concat_file, session.proxy_parts)
+        concat_command = build_concat_args(self.get_ffmpeg_path(), concat_file, proxy_file)
+        try:
+            self.logger.info(f"Executing command: {' '.join(concat_command)}")
+            subprocess.run(concat_command, check=True, capture_output=True, text=True, **self.get_popen_kwargs())
+        except subprocess.CalledProcessError as e:
+            # The master recording is what matters; keep the proxy parts around instead of failing.
+            self.logger.error(f"ERROR MERGING PROXY: {e.stderr if e.stderr else e}")
+            return None
+        finally:
+            if os.path.exists(concat_file):
+                os.remove(concat_file)
+
+        for proxy in session.proxy_parts:
+            if os.path.exists(proxy):
+                os.remove(proxy)
+        return proxy_file
         
     def toggle_widgets(self, recording):
         state = "disabled" if recording else "normal"
@@ -635,11 +1821,18 @@ class ScreenRecorderBase(abc.ABC):
         self.format_combo.config(state=readonly_state)
         self.audio_combo.config(state=readonly_state)
         self.language_combo.config(state=readonly_state)
+        self.record_mode_combo.config(state=readonly_state)
         self.theme_combo.config(state=readonly_state)
         self.output_folder_entry.config(state=readonly_state)
 
         self.volume_scale.config(state=state)
+        self.audio_codec_combo.config(state=readonly_state)
+        self.audio_bitrate_combo.config(state=readonly_state)
         self.select_area_btn.config(state=state)
+        self.select_window_btn.config(state=state)
+        self.follow_cursor_check.config(state=state)
+        self.output_scale_combo.config(state=state)
+        self.scaler_combo.config(state=readonly_state)
         self.open_folder_btn.config(state=state)
         self.info_btn.config(state=state)
         self.browse_folder_btn.config(state=state)
@@ -662,22 +1855,87 @@ class ScreenRecorderBase(abc.ABC):
         
     def start_timer(self):
         self.running = True
+        self.paused = False
         self.elapsed_time = 0
+        self.recording_started_at = time.monotonic()
+        self.paused_at = None
+        self.paused_total = 0.0
+        self.markers = []
+        self.telemetry_sampler = None
         self.update_timer()
+        self.update_audio_level()
         
     def stop_timer(self):
         self.running = False
+        self.paused = False
+        self.paused_at = None
         if self.current_theme == "light":
             self.timer_label.config(text="00:00:00", foreground="black")
         else:
             self.timer_label.config(text="00:00:00", foreground="white")
+        self.telemetry_label.config(text="")
+        self.telemetry_sampler = None
+        self.level_bar.config(value=0)
+        self.level_peak_label.config(text="")
             
     def update_timer(self):
         if self.running:
-            self.elapsed_time += 1
-            elapsed_time_str = time.strftime("%H:%M:%S", time.gmtime(self.elapsed_time))
-            self.timer_label.config(text=elapsed_time_str, foreground="red")
-            self.root.after(1000, self.update_timer)
+            with profiling.span("timer_tick"):
+                session = self.sessions.get('main')
+                if session:
+                    self.elapsed_time = int(session.recorded_duration())
+                elapsed_time_str = time.strftime("%H:%M:%S", time.gmtime(self.elapsed_time))
+                self.timer_label.config(text=elapsed_time_str, foreground="red")
+                with profiling.span("telemetry"):
+                    self.update_telemetry(session)
+            self.root.after(TELEMETRY_INTERVAL_MS, self.update_timer)
+
+    def update_audio_level(self):
+        if not self.running:
+            return
+        session = self.sessions.get('main')
+        if session and session.meter and session.is_active:
+            rms_db, peak_db = session.meter.levels()
+            self.level_bar.config(value=rms_db - METER_FLOOR_DB)
+            self.level_peak_label.config(text=f"{peak_db:.0f} dB" if peak_db > METER_FLOOR_DB else "")
+        else:
+            self.level_bar.config(value=0)
+            self.level_peak_label.config(text="")
+        self.root.after(METER_INTERVAL_MS, self.update_audio_level)
+
+    def update_telemetry(self, session):
+        if not session or not session.is_active:
+            self.telemetry_label.config(text="")
+            return
+
+        if not self.telemetry_sampler or self.telemetry_sampler.pid != session.process.pid:
+            self.telemetry_sampler = ProcessSampler(session.process.pid)
+        stats = self.telemetry_sampler.sample() or {}
+        progress = session.progress.snapshot()
+
+        parts = []
+        if progress.get('fps') is not None:
+            parts.append(f"{progress['fps']:.1f} fps")
+        if progress.get('speed') is not None:
+            parts.append(f"{progress['speed']:.2f}x")
+        parts.append(f"drop {progress.get('drop') or 0} / dup {progress.get('dup') or 0}")
+        if progress.get('bitrate_kbps') is not None:
+            parts.append(f"{progress['bitrate_kbps']:.0f} kbps")
+
+        recorded_size = session.recorded_size()
+        recorded_duration = session.recorded_duration()
+        if recorded_size and recorded_duration > 0:
+            per_hour = recorded_size / recorded_duration * 3600
+            parts.append(f"{recorded_size / 1024 ** 2:.0f} MB (~{per_hour / 1024 ** 3:.1f} GB/h)")
+
+        if 'cpu_percent' in stats:
+            parts.append(f"CPU {stats['cpu_percent']:.0f}%")
+        if 'rss_bytes' in stats:
+            parts.append(f"RSS {stats['rss_bytes'] / 1024 ** 2:.0f} MB")
+        if 'write_rate' in stats:
+            parts.append(f"disk {stats['write_rate'] / 1024 ** 2:.1f} MB/s")
+
+        self.telemetry_label.config(text=" | ".join(parts))
             
     def show_info(self):
         info_window = tk.Toplevel(self.root)
@@ -0,0 +1,264 @@
+import argparse
+import array
+import datetime
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from harness import Xvfb, stop_process, describe_machine, summarize, check_thresholds, write_results
+from common.ffmpeg_command import (build_audio_filter, build_input_options, build_video_codec_args,
+                                   build_x11grab_args)
+from common.recording_session import RecordingSession
+
+SAMPLE_RATE = 48000
+ONSET_WINDOW = SAMPLE_RATE // 1000
+ONSET_LEVEL = 4000
+BRIGHT_LEVEL = 128
+STATS_PERIOD = 0.05
+
+class NullSink:
+    def __init__(self, name='msr_sync_test'):
+        self.name = name
+        self.module_id = None
+
+    @property
+    def monitor(self):
+        return f"{self.name}.monitor"
+
+    def __enter__(self):
+        if subprocess.run(['pactl', 'info'], capture_output=True).returncode != 0:
+            subprocess.run(['pulseaudio', '--start', '--exit-idle-time=-1'], check=True)
+        result = subprocess.run(['pactl', 'load-module', 'module-null-sink', f'sink_name={self.name}',
+                                 f'rate={SAMPLE_RATE}', 'channels=1'],
+                                capture_output=True, text=True, check=True)
+        self.module_id = result.stdout.strip()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        if self.module_id:
+            subprocess.run(['pactl', 'unload-module', self.module_id], capture_output=True)
+            self.module_id = None
+
+class ProgressTimeline:
+    def __init__(self, session):
+        self.session = session
+        self.points = []
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+
+    def run(self):
+        last = None
+        while not self.stop_event.wait(0.01):
+            out_time = self.session.progress.snapshot().get('out_time')
+            if out_time is not None and out_time != last:
+                self.points.append((time.time(), out_time))
+                last = out_time
+
+    def encoded_at(self, relative_time):
+        for wall_time, out_time in self.points:
+            if out_time >= relative_time:
+                return wall_time
+        return None
+
+def probe(ffprobe, path, *args):
+    result = subprocess.run([ffprobe, '-v', 'error', '-of', 'json', *args, path],
+                            capture_output=True, text=True, check=True)
+    return json.loads(result.stdout)
+
+def video_flashes(ffmpeg, ffprobe, path):
+    frames = probe(ffprobe, path, '-select_streams', 'v:0', '-show_entries', 'frame=best_effort_timestamp_time')['frames']
+    times = [float(frame['best_effort_timestamp_time']) for frame in frames]
+    luma = subprocess.run([ffmpeg, '-v', 'error', '-i', path, '-map', '0:v:0', '-fps_mode', 'passthrough',
+                           '-vf', 'scale=8:8,format=gray', '-f', 'rawvideo', '-'],
+                          capture_output=True, check=True).stdout
+
+    flashes = []
+    was_bright = False
+    for index, timestamp in enumerate(times):
+        frame = luma[index * 64:(index + 1) * 64]
+        bright = len(frame) == 64 and sum(frame) / 64 > BRIGHT_LEVEL
+        if bright and not was_bright:
+            flashes.append(timestamp)
+        was_bright = bright
+    return flashes
+
+def audio_onsets(ffmpeg, ffprobe, path, min_gap):
+    streams = probe(ffprobe, path, '-select_streams', 'a:0', '-show_entries', 'stream=start_time')['streams']
+    start_time = float(streams[0]['start_time'])
+    pcm = subprocess.run([ffmpeg, '-v', 'error', '-i', path, '-map', '0:a:0', '-ac', '1', '-ar', str(SAMPLE_RATE),
+                          '-f', 's16le', '-'], capture_output=True, check=True).stdout
+    samples = array.array('h')
+    samples.frombytes(pcm[:len(pcm) - len(pcm) % 2])
+    if sys.byteorder == 'big':
+        samples.byteswap()
+
+    onsets = []
+    last_onset = None
+    for offset in range(0, len(samples) - ONSET_WINDOW, ONSET_WINDOW):
+        window = samples[offset:offset + ONSET_WINDOW]
+        if max(window) > ONSET_LEVEL or -min(window) > ONSET_LEVEL:
+            timestamp = start_time + offset / SAMPLE_RATE
+            if last_onset is None or timestamp - last_onset > min_gap:
+                onsets.append(timestamp)
+            last_onset = timestamp
+    return onsets
+
+def nearest(values, target, limit):
+    best = min(values, key=lambda value: abs(value - target), default=None)
+    if best is None or abs(best - target) > limit:
+        return None
+    return best
+
+def linear_slope(points):
+    if len(points) < 2:
+        return None
+    mean_x = sum(x for x, _ in points) / len(points)
+    mean_y = sum(y for _, y in points) / len(points)
+    denominator = sum((x - mean_x) ** 2 for x, _ in points)
+    if not denominator:
+        return None
+    return sum((x - mean_x) * (y - mean_y) for x, y in points) / denominator
+
+class SyncTest:
+    def __init__(self, args, workdir):
+        self.args = args
+        self.workdir = workdir
+        self.video_path = os.path.join(workdir, f"sync.{args.format}")
+        self.flash_log = os.path.join(workdir, "flashes.jsonl")
+
+    def recorder_args(self, sink):
+        args = self.args
+        input_options = build_input_options(args.thread_queue_size, args.wallclock_timestamps)
+        audio_input_options = build_input_options(args.audio_thread_queue_size, args.wallclock_timestamps)
+        audio_filter = build_audio_filter(1.0, args.audio_async)
+        # -copyts keeps the wall-clock timestamps of x11grab/pulse so frames can be matched to the flash log.
+        return ([args.ffmpeg, "-y", "-stats_period", str(STATS_PERIOD)]
+                + input_options + build_x11grab_args(os.environ['DISPLAY'], args.fps, 0, 0, *args.size)
+                + audio_input_options + ["-f", "pulse", "-i", sink.monitor]
+                + (["-filter:a", audio_filter] if audio_filter else [])
+                + ["-threads", "0", "-pix_fmt", "yuv420p", "-loglevel", "info", "-hide_banner", "-copyts"]
+                + build_video_codec_args(args.codec, args.bitrate)
+                + [self.video_path])
+
+    def record(self):
+        with NullSink() as sink:
+            pattern = subprocess.Popen([sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'flash_pattern.py'),
+                                        '--sink', sink.name, '--period', str(self.args.period), '--log', self.flash_log])
+            session = RecordingSession('sync')
+            session.video_path = self.video_path
+            timeline = ProgressTimeline(session)
+            try:
+                time.sleep(1.0)
+                session.start(self.recorder_args(sink))
+                timeline.thread.start()
+                deadline = time.monotonic() + self.args.duration
+                while time.monotonic() < deadline and session.process.poll() is None:
+                    time.sleep(0.5)
+            finally:
+                session.stop_part()
+                timeline.stop_event.set()
+                stop_process(pattern)
+        return timeline
+
+    def analyze(self, timeline):
+        args = self.args
+        flashes = video_flashes(args.ffmpeg, args.ffprobe, self.video_path)
+        onsets = audio_onsets(args.ffmpeg, args.ffprobe, self.video_path, args.period / 2)
+        with open(self.flash_log, encoding='utf-8') as f:
+            flash_times = [json.loads(line)['time'] for line in f if line.strip()]
+        start_time = float(probe(args.ffprobe, self.video_path, '-show_entries', 'format=start_time')['format']['start_time'])
+
+        series = []
+        capture_latencies = []
+        encode_latencies = []
+        for video_time in flashes:
+            audio_time = nearest(onsets, video_time, args.period / 2)
+            if audio_time is not None:
+                series.append((round(video_time - start_time, 3), round((audio_time - video_time) * 1000, 1)))
+
+            # x11grab stamps frames with the wall clock, so the flash log can be matched directly.
+            flashed_at = nearest(flash_times, video_time, args.period / 2)
+            if flashed_at is None:
+                continue
+            capture_latencies.append((video_time - flashed_at) * 1000)
+            encoded_at = timeline.encoded_at(video_time - start_time)
+            if encoded_at is not None:
+                encode_latencies.append((encoded_at - flashed_at) * 1000)
+
+        offsets = [offset for _, offset in series]
+        slope = linear_slope([(t / 60, offset) for t, offset in series])
+        metrics = {
+            'flashes_logged': len(flash_times),
+            'flashes_found': len(flashes),
+            'tones_found': len(onsets),
+            'pairs': len(series),
+            'av_offset_ms_first': offsets[0] if offsets else None,
+            'av_offset_ms_last': offsets[-1] if offsets else None,
+            'av_offset_ms_min': min(offsets) if offsets else None,
+            'av_offset_ms_max': max(offsets) if offsets else None,
+            'av_offset_abs_ms_max': max(abs(offset) for offset in offsets) if offsets else None,
+            'av_drift_ms_per_min': round(slope, 2) if slope is not None else None,
+        }
+        metrics.update(summarize(offsets, 'av_offset_ms'))
+        metrics.update(summarize(capture_latencies, 'screen_to_capture_ms'))
+        metrics.update(summarize(encode_latencies, 'screen_to_encoded_ms'))
+        return metrics, series
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure A/V offset, drift and capture latency on Xvfb with a null PulseAudio sink.")
+    parser.add_argument('--duration', type=float, default=300, help="Recording length in seconds")
+    parser.add_argument('--period', type=float, default=2.0, help="Seconds between flash/tone pairs")
+    parser.add_argument('--size', type=lambda v: tuple(int(x) for x in v.lower().split('x')), default=(1280, 720))
+    parser.add_argument('--fps', type=int, default=30)
+    parser.add_argument('--codec', default='libx264')
+    parser.add_argument('--bitrate', default='4000k')
+    parser.add_argument('--format', default='mkv', choices=['mkv', 'mp4'])
+    parser.add_argument('--thread-queue-size', type=int, default=0, help="Same as the thread_queue_size setting")
+    parser.add_argument('--audio-thread-queue-size', type=int, default=1024,
+                        help="Same as the audio_thread_queue_size setting")
+    parser.add_argument('--wallclock-timestamps', action='store_true', help="Same as the wallclock_timestamps setting")
+    parser.add_argument('--audio-async', type=int, default=0, help="Same as the audio_async setting")
+    parser.add_argument('--ffmpeg', default='ffmpeg')
+    parser.add_argument('--ffprobe', default='ffprobe')
+    parser.add_argument('--max-offset-ms', type=float, default=100)
+    parser.add_argument('--max-drift-ms-per-min', type=float, default=5)
+    parser.add_argument('--keep', help="Directory to keep the recording and flash log in")
+    parser.add_argument('--output', default='-', help="JSON results file, '-' for stdout")
+    args = parser.parse_args()
+
+    workdir = args.keep or tempfile.mkdtemp(prefix='msr-sync-')
+    os.makedirs(workdir, exist_ok=True)
+    test = SyncTest(args, workdir)
+    try:
+        with Xvfb(width=args.size[0], height=args.size[1]):
+            timeline = test.record()
+        metrics, series = test.analyze(timeline)
+    finally:
+        if not args.keep:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    failures = check_thresholds(metrics, {'av_offset_abs_ms_max': {'max': args.max_offset_ms}})
+    if metrics['av_drift_ms_per_min'] is not None and abs(metrics['av_drift_ms_per_min']) > args.max_drift_ms_per_min:
+        failures.append(f"av_drift_ms_per_min = {metrics['av_drift_ms_per_min']} exceeds ±{args.max_drift_ms_per_min}")
+    if not series:
+        failures.append("no flash/tone pairs were found in the recording")
+
+    write_results(args.output, {
+        'timestamp': datetime.datetime.now().isoformat(timespec='seconds'),
+        'machine': describe_machine(args.ffmpeg),
+        'settings': {key: value for key, value in vars(args).items() if key not in ('output', 'keep')},
+        'metrics': metrics,
+        'offsets': series,
+        'regressions': failures,
+    })
+    for failure in failures:
+        print(f"REGRESSION: {failure}", file=sys.stderr, flush=True)
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,102 @@
+import argparse
+import json
+import math
+import struct
+import subprocess
+import threading
+import time
+import tkinter as tk
+
+SAMPLE_RATE = 48000
+CHUNK_SECONDS = 0.005
+TONE_FREQUENCY = 1000
+
+class FlashPattern:
+    def __init__(self, root, sink, period, flash_seconds, log_path, latency_ms):
+        self.root = root
+        self.period = period
+        self.flash_seconds = flash_seconds
+        self.log = open(log_path, 'w', encoding='utf-8')
+        self.flash_count = 0
+        self.tone_samples_left = 0
+        self.lock = threading.Lock()
+        self.running = True
+
+        width, height = root.winfo_screenwidth(), root.winfo_screenheight()
+        root.overrideredirect(True)
+        root.geometry(f"{width}x{height}+0+0")
+        self.canvas = tk.Canvas(root, width=width, height=height, bg='black', highlightthickness=0)
+        self.canvas.pack()
+
+        self.player = subprocess.Popen(
+            ['pacat', '--playback', '--raw', '--format=s16le', f'--rate={SAMPLE_RATE}', '--channels=1',
+             f'--latency-msec={latency_ms}', f'--device={sink}'],
+            stdin=subprocess.PIPE)
+        self.audio_thread = threading.Thread(target=self.write_audio, daemon=True)
+        self.audio_thread.start()
+
+    def write_audio(self):
+        chunk = int(SAMPLE_RATE * CHUNK_SECONDS)
+        silence = bytes(chunk * 2)
+        phase = 0
+        # pacat blocks once its buffer is full, so this loop runs at the playback clock.
+        while self.running:
+            with self.lock:
+                tone = min(chunk, self.tone_samples_left)
+                self.tone_samples_left -= tone
+            if tone:
+                samples = [int(16000 * math.sin(2 * math.pi * TONE_FREQUENCY * (phase + i) / SAMPLE_RATE))
+                           for i in range(tone)]
+                phase += tone
+                data = struct.pack(f'<{tone}h', *samples) + bytes((chunk - tone) * 2)
+            else:
+                data = silence
+            try:
+                self.player.stdin.write(data)
+                self.player.stdin.flush()
+            except (BrokenPipeError, OSError):
+                break
+
+    def flash(self):
+        if not self.running:
+            return
+        self.canvas.configure(bg='white')
+        self.root.update_idletasks()
+        flashed_at = time.time()
+        with self.lock:
+            self.tone_samples_left = int(SAMPLE_RATE * self.flash_seconds)
+        self.flash_count += 1
+        self.log.write(json.dumps({'flash': self.flash_count, 'time': flashed_at}) + "\n")
+        self.log.flush()
+
+        self.root.after(int(self.flash_seconds * 1000), lambda: self.canvas.configure(bg='black'))
+        self.root.after(int(self.period * 1000), self.flash)
+
+    def stop(self):
+        self.running = False
+        self.log.close()
+        try:
+            self.player.stdin.close()
+        except OSError:
+            pass
+        self.player.terminate()
+
+def main():
+    parser = argparse.ArgumentParser(description="Full-screen flashes with a matching tone, for A/V sync measurements.")
+    parser.add_argument('--sink', required=True, help="PulseAudio sink that receives the tone")
+    parser.add_argument('--period', type=float, default=2.0, help="Seconds between flashes")
+    parser.add_argument('--flash', type=float, default=0.1, help="Flash and tone length in seconds")
+    parser.add_argument('--latency-ms', type=int, default=10, help="Requested playback latency")
+    parser.add_argument('--log', required=True, help="JSON lines file receiving the wall-clock time of every flash")
+    args = parser.parse_args()
+
+    root = tk.Tk()
+    pattern = FlashPattern(root, args.sink, args.period, args.flash, args.log, args.latency_ms)
+    root.after(int(args.period * 1000), pattern.flash)
+    try:
+        root.mainloop()
+    finally:
+        pattern.stop()
+
+if __name__ == "__main__":
+    main()
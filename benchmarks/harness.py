@@ -0,0 +1,156 @@
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import time
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCHMARK_DIR)
+if REPO_DIR not in sys.path:
+    sys.path.insert(0, REPO_DIR)
+
+from common.ffmpeg_command import parse_encoders
+from common.resource_sampler import percentile
+
+# Metrics are compared by name suffix; everything else is informational.
+HIGHER_IS_BETTER = ('speed', 'speed_p50', 'speed_min', 'fps', 'mb_per_s')
+LOWER_IS_BETTER = ('_ms', '_ms_p50', '_ms_p95', 'seconds', 'cpu_percent', 'drops')
+
+class Xvfb:
+    def __init__(self, display=None, width=1920, height=1080, depth=24):
+        self.display = display
+        self.width = width
+        self.height = height
+        self.depth = depth
+        self.process = None
+        self.previous_display = None
+
+    def find_free_display(self):
+        for number in range(99, 200):
+            if not os.path.exists(f"/tmp/.X11-unix/X{number}") and not os.path.exists(f"/tmp/.X{number}-lock"):
+                return f":{number}"
+        raise RuntimeError("No free X display number found")
+
+    def __enter__(self):
+        if shutil.which('Xvfb') is None:
+            raise RuntimeError("Xvfb is not installed")
+        self.display = self.display or self.find_free_display()
+        self.process = subprocess.Popen(
+            ['Xvfb', self.display, '-screen', '0', f"{self.width}x{self.height}x{self.depth}", '-nolisten', 'tcp'],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+        socket_path = f"/tmp/.X11-unix/X{self.display.lstrip(':')}"
+        deadline = time.monotonic() + 10
+        while not os.path.exists(socket_path):
+            if self.process.poll() is not None or time.monotonic() > deadline:
+                self.__exit__(None, None, None)
+                raise RuntimeError(f"Xvfb did not start on {self.display}")
+            time.sleep(0.05)
+
+        self.previous_display = os.environ.get('DISPLAY')
+        os.environ['DISPLAY'] = self.display
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        if self.process:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+            self.process = None
+        if self.previous_display is None:
+            os.environ.pop('DISPLAY', None)
+        else:
+            os.environ['DISPLAY'] = self.previous_display
+
+def start_desktop(*extra_args):
+    process = subprocess.Popen([sys.executable, os.path.join(BENCHMARK_DIR, 'synthetic_desktop.py'), *extra_args])
+    # Give Tk time to map the window before the first capture.
+    time.sleep(1.0)
+    if process.poll() is not None:
+        raise RuntimeError("The synthetic desktop exited during startup")
+    return process
+
+def stop_process(process):
+    if process and process.poll() is None:
+        process.terminate()
+        try:
+            process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+def ffmpeg_version(ffmpeg_path='ffmpeg'):
+    try:
+        result = subprocess.run([ffmpeg_path, '-version'], capture_output=True, text=True)
+        return result.stdout.splitlines()[0] if result.stdout else None
+    except OSError:
+        return None
+
+def list_encoders(ffmpeg_path='ffmpeg'):
+    try:
+        result = subprocess.run([ffmpeg_path, '-hide_banner', '-encoders'], capture_output=True, text=True)
+    except OSError:
+        return set()
+    return parse_encoders(result.stdout)
+
+def describe_machine(ffmpeg_path='ffmpeg'):
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'ffmpeg': ffmpeg_version(ffmpeg_path),
+    }
+
+def summarize(values, prefix):
+    if not values:
+        return {}
+    return {
+        f"{prefix}_p50": round(percentile(values, 0.5), 2),
+        f"{prefix}_p95": round(percentile(values, 0.95), 2),
+    }
+
+def metric_direction(name):
+    if name.endswith(HIGHER_IS_BETTER):
+        return 1
+    if name.endswith(LOWER_IS_BETTER):
+        return -1
+    return 0
+
+def check_thresholds(metrics, thresholds):
+    failures = []
+    for name, limits in thresholds.items():
+        value = metrics.get(name)
+        if value is None:
+            continue
+        if 'max' in limits and value > limits['max']:
+            failures.append(f"{name} = {value} is above the limit of {limits['max']}")
+        if 'min' in limits and value < limits['min']:
+            failures.append(f"{name} = {value} is below the limit of {limits['min']}")
+    return failures
+
+def compare_with_baseline(metrics, baseline, tolerance):
+    failures = []
+    for name, value in metrics.items():
+        previous = baseline.get(name)
+        direction = metric_direction(name)
+        if previous is None or value is None or direction == 0 or not previous:
+            continue
+        change = (value - previous) / abs(previous)
+        if change * direction < -tolerance:
+            failures.append(f"{name} regressed from {previous} to {value} ({change:+.1%})")
+    return failures
+
+def load_json(path):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+def write_results(path, results):
+    output = json.dumps(results, indent=2, sort_keys=True)
+    if path in (None, '-'):
+        print(output)
+    else:
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(output + "\n")
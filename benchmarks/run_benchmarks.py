@@ -0,0 +1,287 @@
+import argparse
+import contextlib
+import datetime
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from harness import (BENCHMARK_DIR, Xvfb, start_desktop, stop_process, describe_machine, list_encoders, summarize,
+                     check_thresholds, compare_with_baseline, load_json, write_results)
+from common.ffmpeg_command import (build_video_codec_args, build_x11grab_args, build_concat_args, build_scale_filter,
+                                   write_concat_list, CODEC_ENCODERS, DEFAULT_PRESETS, SCALERS, VIDEO_CODECS)
+from common.process_stats import ProcessSampler
+from common.recording_session import RecordingSession
+from common.resource_sampler import percentile
+
+SUITES = ('capture', 'encode', 'scale', 'preview', 'concat')
+PRESET_CODECS = ('libx264', 'libx265', 'libx264-zerolatency')
+STATS_PERIOD = 0.05
+
+def parse_size(value):
+    width, height = value.lower().split('x')
+    return int(width), int(height)
+
+def parse_list(value):
+    return [item.strip() for item in value.split(',') if item.strip()]
+
+class Benchmarks:
+    def __init__(self, args):
+        self.args = args
+        self.ffmpeg = args.ffmpeg
+        self.workdir = args.workdir or tempfile.mkdtemp(prefix='msr-bench-')
+        self.metrics = {}
+        self.encoders = None
+
+    def available_codecs(self):
+        if self.encoders is None:
+            self.encoders = list_encoders(self.ffmpeg)
+            for codec in self.args.codecs:
+                if CODEC_ENCODERS.get(codec, codec) not in self.encoders:
+                    print(f"Skipping {codec}: not supported by {self.ffmpeg}", file=sys.stderr, flush=True)
+        return [codec for codec in self.args.codecs if CODEC_ENCODERS.get(codec, codec) in self.encoders]
+
+    def capture_args(self, path, width, height, codec, preset=None, video_filter=None):
+        # -stats_period makes ffmpeg report progress often enough to time the first frame.
+        return ([self.ffmpeg, "-y", "-stats_period", str(STATS_PERIOD)]
+                + build_x11grab_args(os.environ['DISPLAY'], self.args.fps, 0, 0, width, height)
+                + ["-threads", "0", "-pix_fmt", "yuv420p", "-loglevel", "info", "-hide_banner"]
+                + (["-filter:v", video_filter] if video_filter else [])
+                + build_video_codec_args(codec, self.args.bitrate, preset=preset)
+                + [path])
+
+    def wait_for_first_frame(self, session, timeout=10):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if (session.progress.snapshot().get('frame') or 0) >= 1:
+                return True
+            if session.process.poll() is not None:
+                return False
+            time.sleep(0.005)
+        return False
+
+    def run_capture(self):
+        width, height = parse_size(self.args.resolutions[0])
+        start_latencies = []
+        stop_latencies = []
+        for repeat in range(self.args.repeats):
+            session = RecordingSession('bench', include_audio=False)
+            session.video_path = os.path.join(self.workdir, f"capture_{repeat}.{self.args.format}")
+            started = time.perf_counter()
+            session.start(self.capture_args(session.video_path, width, height, self.args.codecs[0]))
+            if not self.wait_for_first_frame(session):
+                session.stop_part()
+                raise RuntimeError("ffmpeg did not produce a frame; check the capture arguments in the log")
+            start_latencies.append((time.perf_counter() - started) * 1000)
+
+            time.sleep(1)
+            stopped = time.perf_counter()
+            session.stop_part()
+            stop_latencies.append((time.perf_counter() - stopped) * 1000)
+
+        self.metrics.update(summarize(start_latencies, 'capture.start_to_first_frame_ms'))
+        self.metrics.update(summarize(stop_latencies, 'capture.stop_ms'))
+
+    def run_encode_case(self, codec, preset, width, height, name=None, video_filter=None):
+        name = name or f"encode.{codec}.{preset or DEFAULT_PRESETS.get(codec, 'default')}.{width}x{height}"
+        session = RecordingSession('bench', include_audio=False)
+        session.video_path = os.path.join(self.workdir, f"{name}.{self.args.format}")
+        session.start(self.capture_args(session.video_path, width, height, codec, preset, video_filter))
+        sampler = ProcessSampler(session.process.pid)
+        sampler.sample()
+
+        speeds = []
+        cpu = []
+        started = time.monotonic()
+        while time.monotonic() - started < self.args.duration and session.process.poll() is None:
+            time.sleep(0.5)
+            stats = sampler.sample() or {}
+            if time.monotonic() - started < self.args.warmup:
+                continue
+            progress = session.progress.snapshot()
+            if progress.get('speed') is not None:
+                speeds.append(progress['speed'])
+            if 'cpu_percent' in stats:
+                cpu.append(stats['cpu_percent'])
+
+        progress = session.progress.snapshot()
+        session.stop_part()
+        if not speeds:
+            raise RuntimeError(f"{name} produced no progress output")
+
+        self.metrics[f"{name}.speed_p50"] = round(percentile(speeds, 0.5), 3)
+        self.metrics[f"{name}.speed_min"] = round(min(speeds), 3)
+        self.metrics[f"{name}.fps"] = progress.get('fps')
+        self.metrics[f"{name}.drops"] = progress.get('drop') or 0
+        self.metrics[f"{name}.cpu_percent"] = round(sum(cpu) / len(cpu), 1) if cpu else None
+        self.metrics[f"{name}.bitrate_kbps"] = progress.get('bitrate_kbps')
+
+    def run_encode(self):
+        for codec in self.available_codecs():
+            presets = self.args.presets if codec in PRESET_CODECS else [None]
+            for preset in presets:
+                for resolution in self.args.resolutions:
+                    width, height = parse_size(resolution)
+                    self.run_encode_case(codec, preset, width, height)
+
+    def run_scale(self):
+        # Full-screen capture scaled down; the app reads these as "expected speed" calibration data.
+        width, height = parse_size(self.args.screen)
+        for codec in self.available_codecs():
+            for scaler in self.args.scalers:
+                for output in self.args.scale_outputs:
+                    output_width, output_height = parse_size(output)
+                    self.run_encode_case(codec, None, width, height,
+                                         f"scale.{codec}.{scaler}.{output_width}x{output_height}",
+                                         build_scale_filter(output_width, output_height, scaler))
+
+    def run_preview(self):
+        import cv2
+        import mss
+        import numpy as np
+        from PIL import Image
+
+        # Mirrors ScreenRecorderBase._update_preview_thread without the Tk widgets.
+        frame_times = []
+        sampler = ProcessSampler(os.getpid())
+        with mss.mss() as sct:
+            monitor = sct.monitors[1]
+            sampler.sample()
+            started = time.monotonic()
+            while time.monotonic() - started < self.args.duration:
+                frame_start = time.perf_counter()
+                screenshot = np.array(sct.grab(monitor))
+                screenshot = cv2.cvtColor(screenshot, cv2.COLOR_RGBA2RGB)
+                screenshot = cv2.cvtColor(screenshot, cv2.COLOR_BGR2RGB)
+                screenshot = cv2.resize(screenshot, (640, 360), interpolation=cv2.INTER_AREA)
+                Image.fromarray(screenshot)
+                frame_times.append((time.perf_counter() - frame_start) * 1000)
+                time.sleep(0.03)
+            elapsed = time.monotonic() - started
+            stats = sampler.sample() or {}
+
+        self.metrics['preview.fps'] = round(len(frame_times) / elapsed, 2)
+        self.metrics.update(summarize(frame_times, 'preview.frame_ms'))
+        self.metrics['preview.cpu_percent'] = round(stats['cpu_percent'], 1) if 'cpu_percent' in stats else None
+
+    def make_part(self, path, seconds, width, height):
+        command = ([self.ffmpeg, "-y", "-loglevel", "error", "-f", "lavfi",
+                    "-i", f"testsrc2=size={width}x{height}:rate={self.args.fps}", "-t", str(seconds),
+                    "-pix_fmt", "yuv420p"]
+                   + build_video_codec_args(self.args.codecs[0], self.args.bitrate)
+                   + [path])
+        subprocess.run(command, check=True, capture_output=True)
+
+    def run_concat(self):
+        width, height = parse_size(self.args.resolutions[0])
+        for seconds in self.args.part_seconds:
+            part = os.path.join(self.workdir, f"part_{seconds}s.{self.args.format}")
+            self.make_part(part, seconds, width, height)
+            for count in self.args.parts:
+                name = f"concat.{count}x{seconds}s"
+                concat_file = os.path.join(self.workdir, f"concat_list_{count}x{seconds}.txt")
+                output_file = os.path.join(self.workdir, f"concat_{count}x{seconds}.{self.args.format}")
+                write_concat_list(concat_file, [part] * count)
+
+                started = time.perf_counter()
+                subprocess.run(build_concat_args(self.ffmpeg, concat_file, output_file), check=True,
+                               capture_output=True)
+                elapsed = time.perf_counter() - started
+
+                total_bytes = os.path.getsize(part) * count
+                self.metrics[f"{name}.seconds"] = round(elapsed, 3)
+                self.metrics[f"{name}.total_mb"] = round(total_bytes / 1024 ** 2, 1)
+                self.metrics[f"{name}.mb_per_s"] = round(total_bytes / 1024 ** 2 / elapsed, 1)
+                os.remove(output_file)
+                os.remove(concat_file)
+
+    def run(self):
+        errors = {}
+        for suite in self.args.suites:
+            print(f"Running {suite} benchmarks...", file=sys.stderr, flush=True)
+            try:
+                getattr(self, f"run_{suite}")()
+            except Exception as e:
+                errors[suite] = str(e)
+                print(f"{suite} benchmarks failed: {e}", file=sys.stderr, flush=True)
+        return errors
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark capture, encode, preview and concat on a headless Xvfb desktop.")
+    parser.add_argument('--suites', type=parse_list, default=list(SUITES), help="Comma separated: " + ",".join(SUITES))
+    parser.add_argument('--display', help="Use an existing X display instead of starting Xvfb")
+    parser.add_argument('--screen', default='1920x1080', help="Xvfb screen size")
+    parser.add_argument('--ffmpeg', default='ffmpeg')
+    parser.add_argument('--codecs', type=parse_list, default=list(VIDEO_CODECS),
+                        help="Codecs the ffmpeg build does not support are skipped")
+    parser.add_argument('--presets', type=parse_list, default=['ultrafast', 'veryfast', 'medium'])
+    parser.add_argument('--resolutions', type=parse_list, default=['1280x720', '1920x1080'])
+    parser.add_argument('--scalers', type=parse_list, default=list(SCALERS))
+    parser.add_argument('--scale-outputs', type=parse_list, default=['1920x1080', '1280x720'],
+                        help="Output sizes for the scale suite (the capture is the full --screen)")
+    parser.add_argument('--fps', type=int, default=30)
+    parser.add_argument('--bitrate', default='4000k')
+    parser.add_argument('--format', default='mkv', choices=['mkv', 'mp4'])
+    parser.add_argument('--duration', type=float, default=10, help="Seconds per encode and preview run")
+    parser.add_argument('--warmup', type=float, default=2, help="Seconds ignored at the start of each encode run")
+    parser.add_argument('--repeats', type=int, default=5, help="Start/stop latency repetitions")
+    parser.add_argument('--parts', type=lambda v: [int(x) for x in parse_list(v)], default=[2, 8, 32])
+    parser.add_argument('--part-seconds', type=lambda v: [int(x) for x in parse_list(v)], default=[5, 30])
+    parser.add_argument('--workdir', help="Directory for temporary recordings (default: a new temp dir)")
+    parser.add_argument('--output', default='-', help="JSON results file, '-' for stdout")
+    parser.add_argument('--thresholds', default=os.path.join(BENCHMARK_DIR, 'thresholds.json'))
+    parser.add_argument('--baseline', help="Previous results file to compare against")
+    parser.add_argument('--tolerance', type=float, default=0.15, help="Allowed relative regression against the baseline")
+    args = parser.parse_args()
+
+    unknown = set(args.suites) - set(SUITES)
+    if unknown:
+        parser.error(f"unknown suites: {', '.join(sorted(unknown))}")
+
+    benchmarks = Benchmarks(args)
+    needs_display = any(suite in args.suites for suite in ('capture', 'encode', 'scale', 'preview'))
+    if args.display:
+        os.environ['DISPLAY'] = args.display
+        display = contextlib.nullcontext()
+    elif needs_display:
+        display = Xvfb(width=parse_size(args.screen)[0], height=parse_size(args.screen)[1])
+    else:
+        display = contextlib.nullcontext()
+
+    desktop = None
+    try:
+        with display:
+            if needs_display:
+                desktop = start_desktop()
+            try:
+                errors = benchmarks.run()
+            finally:
+                stop_process(desktop)
+    finally:
+        if not args.workdir:
+            shutil.rmtree(benchmarks.workdir, ignore_errors=True)
+
+    failures = []
+    if os.path.exists(args.thresholds):
+        failures.extend(check_thresholds(benchmarks.metrics, load_json(args.thresholds)))
+    if args.baseline:
+        failures.extend(compare_with_baseline(benchmarks.metrics, load_json(args.baseline)['metrics'], args.tolerance))
+
+    results = {
+        'timestamp': datetime.datetime.now().isoformat(timespec='seconds'),
+        'machine': describe_machine(args.ffmpeg),
+        'settings': {key: value for key, value in vars(args).items() if key not in ('output', 'baseline')},
+        'metrics': benchmarks.metrics,
+        'errors': errors,
+        'regressions': failures,
+    }
+    write_results(args.output, results)
+
+    for failure in failures:
+        print(f"REGRESSION: {failure}", file=sys.stderr, flush=True)
+    return 1 if failures or errors else 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
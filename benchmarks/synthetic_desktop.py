@@ -0,0 +1,86 @@
+import argparse
+import random
+import tkinter as tk
+
+WINDOW_COLORS = ['#3a6ea5', '#a53a3a', '#3aa55d', '#a5883a', '#6e3aa5']
+TICKER_TEXT = "MiniScreenRecorder benchmark desktop  ·  The quick brown fox jumps over the lazy dog  ·  0123456789  ·  "
+
+class SyntheticDesktop:
+    def __init__(self, root, frame_interval_ms=16, seed=1234):
+        self.root = root
+        self.frame_interval_ms = frame_interval_ms
+        self.random = random.Random(seed)
+        self.width = root.winfo_screenwidth()
+        self.height = root.winfo_screenheight()
+
+        root.overrideredirect(True)
+        root.geometry(f"{self.width}x{self.height}+0+0")
+        self.canvas = tk.Canvas(root, width=self.width, height=self.height, bg='#1e2730', highlightthickness=0)
+        self.canvas.pack()
+
+        self.windows = []
+        for index in range(len(WINDOW_COLORS)):
+            self.windows.append(self.create_window(index))
+
+        self.tiles = []
+        tile_size = max(8, self.width // 64)
+        for column in range(16):
+            for row in range(8):
+                x = self.width - (16 - column) * tile_size
+                y = self.height - (8 - row) * tile_size - 40
+                self.tiles.append(self.canvas.create_rectangle(x, y, x + tile_size, y + tile_size, width=0))
+
+        self.ticker = self.canvas.create_text(0, self.height - 16, text=TICKER_TEXT * 4, anchor='w',
+                                              fill='#e0e0e0', font=('TkFixedFont', 14))
+        self.ticker_offset = 0
+        self.frame = 0
+
+    def create_window(self, index):
+        width = self.width // 3
+        height = self.height // 3
+        x = self.random.randint(0, self.width - width)
+        y = self.random.randint(0, self.height - height - 60)
+        body = self.canvas.create_rectangle(x, y, x + width, y + height, fill='#f4f4f4', outline='#101010')
+        title = self.canvas.create_rectangle(x, y, x + width, y + 24, fill=WINDOW_COLORS[index], width=0)
+        lines = [self.canvas.create_text(x + 8, y + 36 + line * 18, anchor='nw', fill='#202020',
+                                         font=('TkDefaultFont', 10), text=f"Line {line} of window {index}")
+                 for line in range(max(1, (height - 48) // 18))]
+        velocity = (self.random.choice([-3, -2, 2, 3]), self.random.choice([-2, -1, 1, 2]))
+        return {'items': [body, title] + lines, 'body': body, 'velocity': velocity}
+
+    def step(self):
+        self.frame += 1
+
+        for window in self.windows:
+            x1, y1, x2, y2 = self.canvas.coords(window['body'])
+            dx, dy = window['velocity']
+            if x1 + dx < 0 or x2 + dx > self.width:
+                dx = -dx
+            if y1 + dy < 0 or y2 + dy > self.height - 40:
+                dy = -dy
+            window['velocity'] = (dx, dy)
+            for item in window['items']:
+                self.canvas.move(item, dx, dy)
+
+        # A block of noisy tiles keeps the encoder busy even when the windows overlap.
+        for tile in self.random.sample(self.tiles, len(self.tiles) // 4):
+            self.canvas.itemconfigure(tile, fill=f"#{self.random.randrange(0x1000000):06x}")
+
+        self.ticker_offset = (self.ticker_offset + 4) % (len(TICKER_TEXT) * 9)
+        self.canvas.coords(self.ticker, -self.ticker_offset, self.height - 16)
+
+        self.root.after(self.frame_interval_ms, self.step)
+
+def main():
+    parser = argparse.ArgumentParser(description="Animated desktop used as a reproducible capture source.")
+    parser.add_argument('--interval', type=int, default=16, help="Milliseconds between animation frames")
+    parser.add_argument('--seed', type=int, default=1234)
+    args = parser.parse_args()
+
+    root = tk.Tk()
+    desktop = SyntheticDesktop(root, args.interval, args.seed)
+    root.after(args.interval, desktop.step)
+    root.mainloop()
+
+if __name__ == "__main__":
+    main()
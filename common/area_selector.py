@@ -1,7 +1,11 @@
+import threading
 import tkinter as tk
 from tkinter import font
 from PIL import ImageGrab, ImageTk
 
+BACKGROUND_WAIT_MS = 150
+DRAG_REFRESH_MS = 16
+
 class AreaSelector:
     def __init__(self, root):
         self.root = root
@@ -9,53 +13,109 @@ class AreaSelector:
         self.rect = None
         self.guide_lines = []
         self.background_image = None
+        self.background = None
+        self.background_item = None
+        self.pending_position = None
+        self.drag_job = None
+        self.selection_id = 0
 
     def select_area(self, callback):
         self.callback = callback
         self.root.withdraw()
-        
-        screenshot = ImageGrab.grab()
-        
+
+        self.selection_id += 1
+        self.background = None
+        threading.Thread(target=self.grab_background, args=(self.selection_id,), daemon=True).start()
+
         self.selection_window = tk.Toplevel(self.root)
+        self.selection_window.withdraw()
         self.selection_window.attributes('-fullscreen', True)
         self.selection_window.attributes('-alpha', 0.3)
-        
+
         self.canvas = tk.Canvas(self.selection_window, cursor="cross")
         self.canvas.pack(fill=tk.BOTH, expand=True)
-        
-        self.background_image = ImageTk.PhotoImage(screenshot)
-        self.canvas.create_image(0, 0, image=self.background_image, anchor=tk.NW)
-        
+
+        self.background_item = self.canvas.create_image(0, 0, anchor=tk.NW)
+        self.rect = self.canvas.create_rectangle(0, 0, 0, 0, outline='red', width=4, state=tk.HIDDEN)
+        self.guide_lines = [
+            self.canvas.create_line(0, 0, 0, 0, fill='blue', width=4, dash=(4, 4), state=tk.HIDDEN),
+            self.canvas.create_line(0, 0, 0, 0, fill='blue', width=4, dash=(4, 4), state=tk.HIDDEN)
+        ]
+
+        self.canvas.bind('<Configure>', self.update_background)
         self.canvas.bind('<ButtonPress-1>', self.on_button_press)
         self.canvas.bind('<B1-Motion>', self.on_mouse_drag)
         self.canvas.bind('<ButtonRelease-1>', self.on_button_release)
         self.selection_window.bind('<Escape>', self.cancel_selection)
-        
+
         self.coord_font = font.Font(size=16)
         self.coord_label = tk.Label(self.selection_window, text="", bg='black', fg='white', font=self.coord_font)
         self.coord_label.place(x=10, y=10)
 
+        # Wait briefly for the screenshot so it does not capture the overlay itself, but never block on it.
+        self.selection_window.after(BACKGROUND_WAIT_MS, self.show_overlay)
+
+    def grab_background(self, selection_id):
+        try:
+            screenshot = ImageGrab.grab()
+        except Exception:
+            return
+        self.root.after(0, self.set_background, selection_id, screenshot)
+
+    def set_background(self, selection_id, screenshot):
+        if selection_id != self.selection_id or not self.selection_window.winfo_exists():
+            return
+        self.background = screenshot
+        self.show_overlay()
+        self.update_background()
+
+    def update_background(self, event=None):
+        if self.background is None:
+            return
+        # Only the part of the virtual desktop under the overlay is converted for Tk, not every monitor.
+        x, y = self.canvas.winfo_rootx(), self.canvas.winfo_rooty()
+        width, height = self.canvas.winfo_width(), self.canvas.winfo_height()
+        if width <= 1 or height <= 1:
+            return
+        region = self.background.crop((x, y, x + width, y + height))
+        self.background_image = ImageTk.PhotoImage(region)
+        self.canvas.itemconfigure(self.background_item, image=self.background_image)
+        self.canvas.tag_lower(self.background_item)
+
+    def show_overlay(self):
+        if self.selection_window.winfo_exists() and self.selection_window.state() == 'withdrawn':
+            self.selection_window.deiconify()
+            self.selection_window.focus_force()
+
     def on_button_press(self, event):
         self.start_x = event.x
         self.start_y = event.y
-        self.rect = None
+        self.pending_position = None
+        for item in [self.rect] + self.guide_lines:
+            self.canvas.itemconfigure(item, state=tk.HIDDEN)
 
     def on_mouse_drag(self, event):
-        if self.rect:
-            self.canvas.delete(self.rect)
-        for line in self.guide_lines:
-            self.canvas.delete(line)
-        
-        self.rect = self.canvas.create_rectangle(self.start_x, self.start_y, event.x, event.y, outline='red', width=4)
-        
-        self.guide_lines = [
-            self.canvas.create_line(event.x, 0, event.x, self.canvas.winfo_height(), fill='blue', width=4, dash=(4, 4)),
-            self.canvas.create_line(0, event.y, self.canvas.winfo_width(), event.y, fill='blue', width=4, dash=(4, 4))
-        ]
-        
-        width = abs(event.x - self.start_x)
-        height = abs(event.y - self.start_y)
-        self.coord_label.config(text=f"Size: {width}x{height} - Position: ({min(self.start_x, event.x)}, {min(self.start_y, event.y)})")
+        # Motion events arrive much faster than the screen refreshes; only draw the latest one.
+        self.pending_position = (event.x, event.y)
+        if self.drag_job is None:
+            self.drag_job = self.canvas.after(DRAG_REFRESH_MS, self.draw_selection)
+
+    def draw_selection(self):
+        self.drag_job = None
+        if self.pending_position is None:
+            return
+        x, y = self.pending_position
+        self.pending_position = None
+
+        self.canvas.coords(self.rect, self.start_x, self.start_y, x, y)
+        self.canvas.coords(self.guide_lines[0], x, 0, x, self.canvas.winfo_height())
+        self.canvas.coords(self.guide_lines[1], 0, y, self.canvas.winfo_width(), y)
+        for item in [self.rect] + self.guide_lines:
+            self.canvas.itemconfigure(item, state=tk.NORMAL)
+
+        width = abs(x - self.start_x)
+        height = abs(y - self.start_y)
+        self.coord_label.config(text=f"Size: {width}x{height} - Position: ({min(self.start_x, x)}, {min(self.start_y, y)})")
 
     def on_button_release(self, event):
         end_x, end_y = event.x, event.y
@@ -72,10 +132,12 @@ class AreaSelector:
         self.cleanup_and_close()
 
     def cleanup_and_close(self):
-        if self.rect:
-            self.canvas.delete(self.rect)
-        for line in self.guide_lines:
-            self.canvas.delete(line)
+        if self.drag_job is not None:
+            self.canvas.after_cancel(self.drag_job)
+            self.drag_job = None
+        self.selection_id += 1
+        self.background_image = None
+        self.background = None
         self.selection_window.destroy()
         self.root.deiconify()
-        self.callback(self.record_area)
\ No newline at end of file
+        self.callback(self.record_area)
@@ -0,0 +1,60 @@
+import math
+import threading
+
+import numpy as np
+
+METER_SAMPLE_RATE = 8000
+METER_BLOCK_SAMPLES = 400
+METER_FLOOR_DB = -60.0
+
+def to_db(value):
+    if value <= 0:
+        return METER_FLOOR_DB
+    return max(METER_FLOOR_DB, 20 * math.log10(value))
+
+def pcm_levels(data):
+    samples = np.frombuffer(data, dtype='<i2', count=len(data) // 2).astype(np.float32) / 32768.0
+    if not samples.size:
+        return METER_FLOOR_DB, METER_FLOOR_DB
+    rms = float(np.sqrt(np.mean(np.square(samples))))
+    peak = float(np.max(np.abs(samples)))
+    return to_db(rms), to_db(peak)
+
+class AudioLevelMeter:
+    # Reads the small mono PCM branch that ffmpeg writes to stdout next to the recording,
+    # so the level comes from the encoded audio and the device is not opened a second time.
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.thread = None
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.rms_db = METER_FLOOR_DB
+            self.peak_db = METER_FLOOR_DB
+
+    def start(self, stream):
+        self.reset()
+        self.thread = threading.Thread(target=self.run, args=(stream,), daemon=True)
+        self.thread.start()
+
+    def run(self, stream):
+        try:
+            while True:
+                data = stream.read(METER_BLOCK_SAMPLES * 2)
+                if not data:
+                    break
+                rms_db, peak_db = pcm_levels(data)
+                with self.lock:
+                    self.rms_db = rms_db
+                    self.peak_db = max(self.peak_db, peak_db)
+        except (OSError, ValueError):
+            pass
+        self.reset()
+
+    def levels(self):
+        # The peak is held until it has been read, so short peaks between two UI refreshes still show.
+        with self.lock:
+            levels = (self.rms_db, self.peak_db)
+            self.peak_db = self.rms_db
+        return levels
@@ -0,0 +1,48 @@
+import json
+import logging
+import os
+
+from common.ffmpeg_command import DEFAULT_PRESETS
+
+class Calibration:
+    def __init__(self, metrics=None):
+        self.metrics = metrics or {}
+        self.logger = logging.getLogger()
+
+    @classmethod
+    def load(cls, path):
+        if not path or not os.path.exists(path):
+            return cls()
+        try:
+            with open(path, encoding='utf-8') as f:
+                return cls(json.load(f).get('metrics', {}))
+        except (OSError, ValueError, AttributeError) as e:
+            logging.getLogger().error(f"Could not read calibration data from {path}: {e}")
+            return cls()
+
+    def encode_speeds(self, codec):
+        # Keys look like "encode.libx264.veryfast.1920x1080.speed_p50" (see benchmarks/run_benchmarks.py).
+        prefix = f"encode.{codec}.{DEFAULT_PRESETS.get(codec, 'default')}."
+        speeds = {}
+        for name, value in self.metrics.items():
+            if name.startswith(prefix) and name.endswith('.speed_p50') and value:
+                width, height = name[len(prefix):-len('.speed_p50')].split('x')
+                speeds[(int(width), int(height))] = value
+        return speeds
+
+    def expected_speed(self, codec, width, height, scaler=None):
+        if scaler:
+            speed = self.metrics.get(f"scale.{codec}.{scaler}.{width}x{height}.speed_p50")
+            if speed:
+                return speed, True
+
+        speeds = self.encode_speeds(codec)
+        if not speeds:
+            return None, False
+        if (width, height) in speeds:
+            return speeds[(width, height)], True
+
+        # Encoding cost grows roughly with the pixel count, so scale the closest measurement.
+        pixels = width * height
+        size, speed = min(speeds.items(), key=lambda item: abs(item[0][0] * item[0][1] - pixels))
+        return speed * size[0] * size[1] / pixels, False
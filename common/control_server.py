@@ -0,0 +1,137 @@
+import hmac
+import json
+import logging
+import secrets
+import threading
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+DEFAULT_CONTROL_HOST = '127.0.0.1'
+DEFAULT_CONTROL_PORT = 47831
+
+CONTROL_COMMANDS = ('status', 'start', 'stop', 'pause', 'resume', 'mark')
+CONTROL_TOKEN_HEADER = 'X-Control-Token'
+LOCAL_HOSTNAMES = ('127.0.0.1', 'localhost')
+
+def new_control_token():
+    return secrets.token_urlsafe(32)
+
+def is_local_host(value):
+    # Host is "name[:port]", Origin is "scheme://name[:port]"; a page on another site can reach
+    # 127.0.0.1 through DNS rebinding, but its Host and Origin still name that site.
+    hostname = urlparse(value if '://' in value else f'//{value}').hostname
+    return hostname in LOCAL_HOSTNAMES
+
+class ControlRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # Responses are tiny, so Nagle + delayed ACK would dominate the latency.
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        self.handle_command()
+
+    def check_request(self):
+        # Only scripts on this machine that can read config.ini get through: browsers cannot
+        # send a custom header or a JSON content type cross-site without a preflight we never answer.
+        if not is_local_host(self.headers.get('Host', '')):
+            return 403, 'host not allowed'
+        origin = self.headers.get('Origin')
+        if origin is not None and not is_local_host(origin):
+            return 403, 'origin not allowed'
+        token = self.headers.get(CONTROL_TOKEN_HEADER, '')
+        if not self.server.token or not hmac.compare_digest(token.encode('utf-8'), self.server.token.encode('utf-8')):
+            return 401, 'missing or invalid control token'
+        content_type = self.headers.get('Content-Type', '').split(';')[0].strip().lower()
+        if content_type != 'application/json':
+            return 415, 'Content-Type must be application/json'
+        return None
+
+    def handle_command(self):
+        try:
+            length = int(self.headers.get('Content-Length', 0) or 0)
+        except ValueError:
+            length = -1
+        if length < 0:
+            # Without a usable length the body can't be skipped, so the connection can't be reused.
+            self.close_connection = True
+        body = self.rfile.read(length) if length > 0 else b''
+
+        error = self.check_request()
+        if error:
+            self.send_json(error[0], {'ok': False, 'error': error[1]})
+            return
+
+        url = urlparse(self.path)
+        command = url.path.strip('/')
+        params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        try:
+            if length < 0:
+                raise ValueError(f"invalid Content-Length: {self.headers.get('Content-Length')}")
+            if body:
+                body = json.loads(body.decode('utf-8'))
+                if isinstance(body, dict):
+                    params.update(body)
+        except (ValueError, UnicodeDecodeError):
+            self.send_json(400, {'ok': False, 'error': 'invalid request'})
+            return
+
+        if command not in CONTROL_COMMANDS:
+            self.send_json(404, {'ok': False, 'error': f'unknown command: {command}'})
+            return
+
+        try:
+            result = self.server.dispatcher(command, params)
+        except Exception as e:
+            logging.getLogger().error(f"Control command '{command}' failed: {e}")
+            self.send_json(500, {'ok': False, 'error': str(e)})
+            return
+
+        self.send_json(200 if result.get('ok', True) else 409, result)
+
+    def send_json(self, status, payload):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logging.getLogger().debug(f"Control API: {format % args}")
+
+class ControlServer:
+    def __init__(self, dispatcher, token, host=DEFAULT_CONTROL_HOST, port=DEFAULT_CONTROL_PORT):
+        self.dispatcher = dispatcher
+        self.token = token
+        self.host = host
+        self.port = port
+        self.httpd = None
+        self.thread = None
+
+    def start(self):
+        self.httpd = ThreadingHTTPServer((self.host, self.port), ControlRequestHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.dispatcher = self.dispatcher
+        self.httpd.token = self.token
+        self.port = self.httpd.server_address[1]
+        self.thread = threading.Thread(target=self.httpd.serve_forever, kwargs={'poll_interval': 0.5}, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        if self.httpd:
+            self.httpd.shutdown()
+            self.httpd.server_close()
+            self.httpd = None
+
+def send_control_command(command, params=None, token='', host=DEFAULT_CONTROL_HOST, port=DEFAULT_CONTROL_PORT,
+                         timeout=30):
+    data = json.dumps(params or {}).encode('utf-8')
+    request = urllib.request.Request(f"http://{host}:{port}/{command}", data=data, method='POST',
+                                     headers={'Content-Type': 'application/json', CONTROL_TOKEN_HEADER: token})
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            return json.loads(response.read().decode('utf-8'))
+    except urllib.error.HTTPError as e:
+        return json.loads(e.read().decode('utf-8'))
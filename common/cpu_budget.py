@@ -0,0 +1,31 @@
+import os
+
+class CpuBudget:
+    def __init__(self, total_threads=0):
+        self.auto = total_threads <= 0
+        self.total_threads = total_threads if total_threads > 0 else (os.cpu_count() or 1)
+
+    def allocate(self, weights):
+        if not weights:
+            return {}
+
+        # A lone session with an automatic budget keeps ffmpeg's own thread heuristics.
+        if self.auto and len(weights) == 1:
+            return {name: 0 for name in weights}
+
+        if len(weights) >= self.total_threads:
+            return {name: 1 for name in weights}
+
+        total_weight = sum(weights.values())
+        allocation = {name: 1 for name in weights}
+        remaining = self.total_threads - len(weights)
+
+        shares = {name: remaining * weight / total_weight for name, weight in weights.items()}
+        for name, share in shares.items():
+            allocation[name] += int(share)
+        remaining -= sum(int(share) for share in shares.values())
+
+        for name in sorted(shares, key=lambda n: shares[n] - int(shares[n]), reverse=True)[:remaining]:
+            allocation[name] += 1
+
+        return allocation
@@ -0,0 +1,99 @@
+import threading
+
+FOLLOW_INTERVAL_MS = 33
+FOLLOW_FILTER = "crop@follow"
+# ffmpeg reads at most one interactive command per stats period (0.5 s by default in ffmpeg 7), so
+# followed sessions lower it and the writer stays just below that rate; anything faster only queues
+# stale positions in ffmpeg's stdin, in front of the "q" that ends the part.
+FOLLOW_STATS_PERIOD = 0.1
+COMMAND_INTERVAL = 0.12
+
+def parse_viewport_size(value):
+    width, height = (int(part) for part in str(value).lower().split('x'))
+    if width < 2 or height < 2:
+        raise ValueError(f"invalid viewport size: {value}")
+    return width, height
+
+class CursorFollower:
+    def __init__(self, root, session, smoothing=0.2):
+        self.root = root
+        self.session = session
+        self.smoothing = min(1.0, max(0.01, smoothing))
+        self.position = None
+        self.job = None
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def place(self, width, height):
+        _, _, capture_width, capture_height = self.session.geometry
+        width = min(width, capture_width)
+        height = min(height, capture_height)
+        width -= width % 2
+        height -= height % 2
+        self.session.viewport = (width, height, 0, 0)
+        self.position = self.target()
+        x, y = round(self.position[0]), round(self.position[1])
+        self.session.viewport = (width, height, x, y)
+        return self.session.viewport
+
+    def target(self):
+        pointer_x, pointer_y = self.root.winfo_pointerxy()
+        capture_x, capture_y, capture_width, capture_height = self.session.geometry
+        width, height = self.session.viewport[:2]
+        x = min(max(pointer_x - capture_x - width / 2, 0), capture_width - width)
+        y = min(max(pointer_y - capture_y - height / 2, 0), capture_height - height)
+        return x, y
+
+    def start(self):
+        if self.job is None:
+            self.job = self.root.after(FOLLOW_INTERVAL_MS, self.tick)
+        if self.thread is None:
+            self.stop_event.clear()
+            self.thread = threading.Thread(target=self.run, daemon=True)
+            self.thread.start()
+
+    def tick(self):
+        self.job = None
+        try:
+            target_x, target_y = self.target()
+        except Exception:
+            return
+        # Ease towards the pointer instead of jumping, so the viewport pans smoothly.
+        x = self.position[0] + (target_x - self.position[0]) * self.smoothing
+        y = self.position[1] + (target_y - self.position[1]) * self.smoothing
+        self.position = (x, y)
+
+        # Only the latest position is kept; the writer thread picks it up at ffmpeg's pace.
+        width, height = self.session.viewport[:2]
+        self.session.viewport = (width, height, round(x), round(y))
+
+        self.job = self.root.after(FOLLOW_INTERVAL_MS, self.tick)
+
+    def run(self):
+        process = None
+        sent = {}
+        while not self.stop_event.wait(COMMAND_INTERVAL):
+            if self.session.process is not process:
+                # A new part starts its crop at the viewport it was spawned with, which we cannot
+                # tell apart from a later move, so send both axes once.
+                process = self.session.process
+                sent = {}
+            if process is None:
+                continue
+            _, _, x, y = self.session.viewport
+            pending = [(axis, value) for axis, value in (('x', x), ('y', y)) if sent.get(axis) != value]
+            if not pending:
+                continue
+            # One command per slot: when both axes moved, catch up the one that is further behind.
+            axis, value = max(pending, key=lambda item: abs(item[1] - sent.get(item[0], float('-inf'))))
+            if self.session.send_filter_command(FOLLOW_FILTER, axis, value):
+                sent[axis] = value
+
+    def stop(self):
+        if self.job is not None:
+            self.root.after_cancel(self.job)
+            self.job = None
+        self.stop_event.set()
+        if self.thread:
+            self.thread.join(timeout=COMMAND_INTERVAL + 1)
+            self.thread = None
@@ -0,0 +1,233 @@
+import json
+import logging
+import os
+import platform
+import shutil
+import threading
+import time
+
+NETWORK_FILESYSTEMS = {
+    'nfs', 'nfs4', 'cifs', 'smb3', 'smbfs', 'fuse.sshfs', 'sshfs', '9p', 'afs',
+    'ceph', 'glusterfs', 'fuse.glusterfs', 'davfs', 'fuse.rclone', 'fuse.s3fs'
+}
+
+# Rough fallback for the audio track when estimating how fast the output grows.
+AUDIO_BYTES_PER_SECOND = 192000 // 8
+
+RESERVE_FILE_NAME = ".miniscreenrecorder.reserve"
+
+# Write speeds measured per folder, so the 32 MB test is not repeated on every start.
+DISK_PROFILE_CACHE = "disk_profiles.json"
+DISK_PROFILE_MAX_AGE = 7 * 24 * 3600
+_cache_lock = threading.Lock()
+
+def get_filesystem_type(path):
+    path = os.path.realpath(path)
+    if platform.system() == 'Windows':
+        import ctypes
+        DRIVE_REMOTE = 4
+        drive = os.path.splitdrive(path)[0] + "\\"
+        if path.startswith("\\\\") or ctypes.windll.kernel32.GetDriveTypeW(drive) == DRIVE_REMOTE:
+            return 'remote'
+        return 'local'
+
+    best_match, fs_type = '', 'unknown'
+    try:
+        with open('/proc/mounts') as f:
+            for line in f:
+                fields = line.split()
+                if len(fields) < 3:
+                    continue
+                mount_point = fields[1].replace('\\040', ' ')
+                if (path == mount_point or path.startswith(mount_point.rstrip('/') + '/')) and len(mount_point) > len(best_match):
+                    best_match, fs_type = mount_point, fields[2]
+    except OSError:
+        pass
+    return fs_type
+
+def measure_write_throughput(folder, size_mb=32, chunk_mb=1):
+    test_file = os.path.join(folder, ".miniscreenrecorder.writetest")
+    chunk = os.urandom(chunk_mb * 1024 * 1024)
+    start = time.perf_counter()
+    try:
+        with open(test_file, 'wb', buffering=0) as f:
+            for _ in range(max(1, size_mb // chunk_mb)):
+                f.write(chunk)
+            os.fsync(f.fileno())
+        elapsed = time.perf_counter() - start
+    finally:
+        try:
+            os.remove(test_file)
+        except OSError:
+            pass
+    return size_mb / elapsed if elapsed > 0 else None
+
+class OutputDiskProfile:
+    SLOW_WRITE_MBPS = 30
+
+    def __init__(self, folder, fs_type, write_mbps):
+        self.folder = folder
+        self.fs_type = fs_type
+        self.write_mbps = write_mbps
+
+    @classmethod
+    def measure(cls, folder, size_mb=32):
+        fs_type = get_filesystem_type(folder)
+        write_mbps = measure_write_throughput(folder, size_mb)
+        return cls(folder, fs_type, write_mbps)
+
+    @classmethod
+    def load_or_measure(cls, folder, cache_path=DISK_PROFILE_CACHE):
+        key = os.path.realpath(folder)
+        fs_type = get_filesystem_type(folder)
+        with _cache_lock:
+            cache = load_disk_profiles(cache_path)
+            cached = cache.get(key)
+            if cached and cached.get('fs_type') == fs_type and \
+                    time.time() - cached.get('measured_at', 0) < DISK_PROFILE_MAX_AGE:
+                return cls(folder, fs_type, cached.get('write_mbps'))
+
+            profile = cls(folder, fs_type, measure_write_throughput(folder))
+            cache[key] = {'fs_type': fs_type, 'write_mbps': profile.write_mbps, 'measured_at': time.time()}
+            try:
+                with open(cache_path, 'w', encoding='utf-8') as f:
+                    json.dump(cache, f, indent=2)
+            except OSError as e:
+                logging.getLogger().warning(f"Could not save {cache_path}: {e}")
+            return profile
+
+    @property
+    def is_network(self):
+        return self.fs_type in NETWORK_FILESYSTEMS or self.fs_type == 'remote'
+
+    @property
+    def is_slow(self):
+        return self.is_network or (self.write_mbps is not None and self.write_mbps < self.SLOW_WRITE_MBPS)
+
+    def muxer_args(self, output_format, tee=False):
+        if not self.is_slow:
+            return []
+        # Let the muxer batch writes into larger blocks and absorb stalls instead of flushing every packet.
+        args = ["-max_muxing_queue_size", "4096", "-flush_packets", "0"]
+        if not tee:
+            # The tee muxer does not know the file muxer's private options; they go into its slave spec instead.
+            for key, value in self.muxer_options(output_format).items():
+                args.extend([f"-{key}", value])
+        return args
+
+    def muxer_options(self, output_format):
+        if not self.is_slow or output_format != "mkv":
+            return {}
+        return {"cluster_size_limit": "4194304", "cluster_time_limit": "5000"}
+
+    def describe(self):
+        speed = f"{self.write_mbps:.1f} MB/s" if self.write_mbps else "unknown speed"
+        return f"{self.folder} ({self.fs_type}, {speed}{', slow medium' if self.is_slow else ''})"
+
+def load_disk_profiles(path):
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, encoding='utf-8') as f:
+            profiles = json.load(f)
+        return profiles if isinstance(profiles, dict) else {}
+    except (OSError, ValueError) as e:
+        logging.getLogger().warning(f"Could not read {path}: {e}")
+        return {}
+
+def create_space_reserve(folder, size_mb):
+    if size_mb <= 0:
+        return None
+    path = os.path.join(folder, RESERVE_FILE_NAME)
+    try:
+        with open(path, 'wb') as f:
+            if hasattr(os, 'posix_fallocate'):
+                os.posix_fallocate(f.fileno(), 0, size_mb * 1024 * 1024)
+            else:
+                f.truncate(size_mb * 1024 * 1024)
+        return path
+    except OSError as e:
+        logging.getLogger().warning(f"Could not preallocate {size_mb} MB in {folder}: {e}")
+        release_space_reserve(path)
+        return None
+
+def release_space_reserve(path):
+    if path and os.path.exists(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+class DiskSpaceMonitor:
+    def __init__(self, folder, get_bytes_per_second, on_warning, on_critical,
+                 warn_seconds=600, critical_seconds=60, interval=2.0, reserve_mb=0):
+        self.folder = folder
+        self.reserve_mb = reserve_mb
+        self.reserve = None
+        self.reserve_lock = threading.Lock()
+        self.get_bytes_per_second = get_bytes_per_second
+        self.on_warning = on_warning
+        self.on_critical = on_critical
+        self.warn_seconds = warn_seconds
+        self.critical_seconds = critical_seconds
+        self.interval = interval
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.warned = False
+        self.critical = False
+        self.logger = logging.getLogger()
+
+    def seconds_left(self):
+        bytes_per_second = self.get_bytes_per_second()
+        if not bytes_per_second:
+            return None
+        return shutil.disk_usage(self.folder).free / bytes_per_second
+
+    def start(self):
+        self.stop_event.clear()
+        self.warned = False
+        self.critical = False
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread:
+            self.thread.join(timeout=self.interval + 1)
+            self.thread = None
+        self.release_reserve()
+
+    def release_reserve(self):
+        with self.reserve_lock:
+            release_space_reserve(self.reserve)
+            self.reserve = None
+
+    def run(self):
+        # Preallocating can take a while on slow or network disks, so it is done here, off the UI thread.
+        reserve = create_space_reserve(self.folder, self.reserve_mb)
+        with self.reserve_lock:
+            if self.stop_event.is_set():
+                release_space_reserve(reserve)
+            else:
+                self.reserve = reserve
+
+        while not self.stop_event.wait(self.interval):
+            try:
+                seconds_left = self.seconds_left()
+            except OSError as e:
+                self.logger.error(f"Error checking free space in {self.folder}: {e}")
+                continue
+            if seconds_left is None:
+                continue
+
+            if seconds_left < self.critical_seconds and not self.critical:
+                self.critical = True
+                self.logger.error(f"Output disk almost full: {seconds_left:.0f}s of recording left")
+                self.on_critical(seconds_left)
+            elif seconds_left < self.warn_seconds and not self.warned:
+                self.warned = True
+                self.logger.warning(f"Low disk space: {seconds_left:.0f}s of recording left")
+                self.on_warning(seconds_left)
+            elif seconds_left >= self.warn_seconds:
+                self.warned = False
+                self.critical = False
@@ -0,0 +1,67 @@
+import logging
+import threading
+import time
+
+STARTUP_GRACE_SECONDS = 10.0
+RESTART_BACKOFF_SECONDS = (0, 1, 2, 5, 10)
+HEALTHY_SECONDS = 30.0
+
+class EncoderWatchdog:
+    def __init__(self, get_sessions, on_failure, stall_seconds=1.5, interval=0.25):
+        self.get_sessions = get_sessions
+        self.on_failure = on_failure
+        self.stall_seconds = stall_seconds
+        self.interval = interval
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.reported = {}
+        self.logger = logging.getLogger()
+
+    def start(self):
+        self.stop_event.clear()
+        self.reported = {}
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread:
+            self.thread.join(timeout=self.interval + 1)
+            self.thread = None
+
+    def run(self):
+        while not self.stop_event.wait(self.interval):
+            try:
+                self.check()
+            except Exception as e:
+                self.logger.error(f"Error checking encoder progress: {e}")
+
+    def check(self):
+        now = time.monotonic()
+        for session in self.get_sessions():
+            process = session.process
+            if process is None or session.started_at is None:
+                continue
+            advanced_at, out_time = session.progress.last_advance()
+            if advanced_at is not None:
+                session.close_gap(advanced_at - (out_time or 0))
+            if self.reported.get(session.name) is process:
+                continue
+
+            reason = self.failure_reason(process, session.started_at, advanced_at, now)
+            if reason:
+                # Reported once per process; the handler runs on the UI thread and checks the
+                # process is still current, so a normal stop racing with this is ignored there.
+                self.reported[session.name] = process
+                self.on_failure(session, process, reason, advanced_at or session.started_at)
+
+    def failure_reason(self, process, started_at, advanced_at, now):
+        returncode = process.poll()
+        if returncode is not None:
+            return f"FFmpeg exited unexpectedly with code {returncode}"
+        if advanced_at is None:
+            if now - started_at > max(self.stall_seconds, STARTUP_GRACE_SECONDS):
+                return f"no progress {now - started_at:.1f}s after start"
+        elif now - advanced_at > self.stall_seconds:
+            return f"no progress for {now - advanced_at:.1f}s"
+        return None
@@ -0,0 +1,256 @@
+import os
+import re
+
+SCALERS = ("fast_bilinear", "bilinear", "bicubic", "lanczos")
+VIDEO_CODECS = ("libx264", "libx265", "libx264-zerolatency", "libsvtav1", "libvpx-vp9", "ffv1")
+VIDEO_BITRATES = ("1000k", "2000k", "4000k", "6000k", "8000k", "10000k", "15000k", "20000k")
+FRAME_RATES = ("30", "60")
+OUTPUT_FORMATS = ("mkv", "mp4")
+# For libsvtav1 the preset is its speed level and for libvpx-vp9 it is passed as -cpu-used.
+DEFAULT_PRESETS = {"libx264": "veryfast", "libx265": "ultrafast", "libx264-zerolatency": "veryfast",
+                   "libsvtav1": "10", "libvpx-vp9": "8"}
+CODEC_ENCODERS = {"libx264-zerolatency": "libx264"}
+AUDIO_TRACK_MODES = ("mix", "separate")
+AUDIO_CODECS = ("aac", "libopus", "flac", "pcm_s16le")
+AUDIO_BITRATES = ("64k", "96k", "128k", "160k", "192k", "256k", "320k")
+LOSSLESS_AUDIO_CODECS = ("flac", "pcm_s16le")
+# Containers for audio-only recordings. Lossless audio goes to Matroska, which has no size limit
+# (unlike wav) and keeps the duration right when parts are merged (unlike raw flac).
+AUDIO_ONLY_FORMATS = {"aac": "m4a", "libopus": "opus", "flac": "mka", "pcm_s16le": "mka"}
+OPUS_SAMPLE_RATES = (48000, 24000, 16000, 12000, 8000)
+MKV_ONLY_CODECS = ("ffv1", "pcm_s16le")
+FFV1_SLICES = (4, 6, 9, 12, 16, 24, 30)
+TEE_MUXERS = {"mkv": "matroska", "mka": "matroska", "m4a": "ipod"}
+LIVE_FORMATS = {"srt": "mpegts", "udp": "mpegts", "tcp": "mpegts", "rtp": "rtp_mpegts", "rtmp": "flv", "rtmps": "flv"}
+# The network output may fail or fall behind without stopping the file: it runs behind a fifo that drops
+# packets instead of blocking and keeps reconnecting. fifo_options is nested one level deeper in the tee
+# spec, so its separators are escaped twice.
+LIVE_SLAVE_OPTIONS = r"onfail=ignore:use_fifo=1:fifo_options=drop_pkts_on_overflow=1\\\:attempt_recovery=1"
+
+def parse_encoders(output):
+    # Lines of "ffmpeg -encoders" look like " V....D libx264              libx264 H.264 / AVC ..."
+    return {line.split()[1] for line in output.splitlines()
+            if len(line.split()) > 1 and len(line.split()[0]) == 6 and line.split()[0][0] in 'VAS'}
+
+def available_codecs(codecs, encoders):
+    # An empty encoder list means ffmpeg could not be asked; keep everything rather than nothing.
+    if not encoders:
+        return list(codecs)
+    return [codec for codec in codecs if CODEC_ENCODERS.get(codec, codec) in encoders]
+
+def parse_bitrate(bitrate):
+    return int(str(bitrate).rstrip('kK'))
+
+def build_video_codec_args(codec, bitrate, threads=0, slices=0, preset=None):
+    kbps = parse_bitrate(bitrate)
+
+    if codec in ("libx264", "libx264-zerolatency"):
+        x264_params = f"bitrate={kbps}:vbv-maxrate={kbps}:vbv-bufsize={int(kbps/2)}:nal-hrd=cbr"
+        if threads:
+            x264_params += f":threads={threads}"
+        if slices:
+            x264_params += f":slices={slices}"
+        args = [
+            "-c:v", "libx264",
+            "-preset", preset or DEFAULT_PRESETS[codec],
+        ]
+        if codec == "libx264-zerolatency":
+            # No lookahead or B-frames, slice-based threading instead of frame threading (no added
+            # frames of delay) and a rolling intra refresh instead of large periodic keyframes.
+            args.extend(["-tune", "zerolatency"])
+            x264_params += ":sliced-threads=1:intra-refresh=1"
+        return args + ["-x264-params", x264_params]
+    elif codec == "libx265":
+        x265_params = f"bitrate={kbps}:vbv-maxrate={kbps}:vbv-bufsize={int(kbps/2)}:rc-lookahead=20:cbqpoffs=0:crqpoffs=0:crf=23"
+        if threads:
+            x265_params += f":pools={threads}"
+        if slices:
+            x265_params += f":slices={slices}"
+        return [
+            "-c:v", "libx265",
+            "-preset", preset or DEFAULT_PRESETS["libx265"],
+            "-x265-params", x265_params,
+        ]
+    elif codec == "libsvtav1":
+        # Tile columns are log2; they let SVT-AV1 spread a frame over more cores.
+        tile_columns = max(1, slices.bit_length() - 1) if slices else 1
+        return [
+            "-c:v", "libsvtav1",
+            "-preset", str(preset or DEFAULT_PRESETS["libsvtav1"]),
+            "-b:v", f"{kbps}k",
+            "-svtav1-params", f"tile-columns={tile_columns}",
+        ]
+    elif codec == "libvpx-vp9":
+        tile_columns = max(1, slices.bit_length() - 1) if slices else 2
+        return [
+            "-c:v", "libvpx-vp9",
+            "-b:v", f"{kbps}k",
+            "-deadline", "realtime",
+            "-cpu-used", str(preset or DEFAULT_PRESETS["libvpx-vp9"]),
+            "-row-mt", "1",
+            "-tile-columns", str(tile_columns),
+            "-lag-in-frames", "0",
+        ]
+    elif codec == "ffv1":
+        # Lossless, so the bitrate is ignored. Every frame is a keyframe and the slice count sets how many
+        # threads can work on a frame; level 3 only accepts some slice counts.
+        wanted = slices or threads
+        slice_count = next((count for count in FFV1_SLICES if count >= wanted), FFV1_SLICES[-1]) if wanted else 16
+        return [
+            "-c:v", "ffv1",
+            "-level", "3",
+            "-g", "1",
+            "-slices", str(slice_count),
+            "-slicecrc", "1",
+        ]
+    else:
+        return [
+            "-c:v", codec,
+            "-b:v", bitrate,
+        ]
+
+def build_input_options(thread_queue_size=0, wallclock_timestamps=False):
+    # Input options must precede the "-i" of every input they apply to.
+    options = []
+    if thread_queue_size:
+        options.extend(["-thread_queue_size", str(thread_queue_size)])
+    if wallclock_timestamps:
+        options.extend(["-use_wallclock_as_timestamps", "1"])
+    return options
+
+def build_audio_filter(volume, async_samples=0):
+    filters = []
+    if async_samples:
+        # Stretch/squeeze audio to follow its timestamps instead of drifting away from the video.
+        filters.append(f"aresample=async={async_samples}")
+    if volume != 1:
+        filters.append(f"volume={volume:g}")
+    return ",".join(filters)
+
+def parse_audio_sources(value):
+    # "device[@volume]; device[@volume]" with the volume in percent.
+    sources = []
+    for item in value.split(';'):
+        item = item.strip()
+        if not item:
+            continue
+        device, _, volume = item.rpartition('@')
+        if device and volume.strip().isdigit():
+            sources.append((device.strip(), int(volume)))
+        else:
+            sources.append((item, 100))
+    return sources
+
+def build_audio_graph(inputs, mode="mix", branches=()):
+    # inputs are (input index, filter chain) pairs; returns the graph and the pads to map.
+    # Each branch is an extra copy of the first track, e.g. "aproxy" for the proxy output.
+    graph = []
+    labels = []
+    for number, (index, chain) in enumerate(inputs):
+        graph.append(f"[{index}:a]{chain or 'anull'}[a{number}]")
+        labels.append(f"[a{number}]")
+    if mode == "mix" and len(labels) > 1:
+        graph.append(f"{''.join(labels)}amix=inputs={len(labels)}:duration=longest:dropout_transition=0:normalize=0[amix]")
+        labels = ["[amix]"]
+    if branches:
+        pads = "".join(f"[{branch}]" for branch in branches)
+        graph.append(f"{labels[0]}asplit={len(branches) + 1}[amain]{pads}")
+        labels = ["[amain]"] + labels[1:]
+    return graph, labels
+
+def build_meter_output_args(label, sample_rate):
+    # Tiny mono PCM copy on stdout for the level meter; flushed per packet so the meter does not lag.
+    return ["-map", label, "-c:a", "pcm_s16le", "-ar", str(sample_rate), "-ac", "1",
+            "-flush_packets", "1", "-f", "s16le", "pipe:1"]
+
+def build_audio_codec_args(codec, bitrate=None, sample_rate=0, channels=0):
+    args = ["-c:a", codec]
+    if bitrate and codec not in LOSSLESS_AUDIO_CODECS:
+        args.extend(["-b:a", bitrate])
+    if codec == "libopus" and sample_rate and sample_rate not in OPUS_SAMPLE_RATES:
+        sample_rate = 48000
+    if sample_rate:
+        args.extend(["-ar", str(sample_rate)])
+    if channels:
+        args.extend(["-ac", str(channels)])
+    return args
+
+def build_x11grab_args(display, fps, x, y, width, height):
+    return [
+        "-f", "x11grab",
+        "-framerate", str(fps),
+        "-video_size", f"{width}x{height}",
+        "-i", f"{display}+{x},{y}",
+    ]
+
+def build_x11grab_window_args(display, window_id, fps, width, height):
+    # With -window_id x11grab follows the window, so the frame size stays fixed while it moves.
+    return [
+        "-f", "x11grab",
+        "-window_id", str(window_id),
+        "-framerate", str(fps),
+        "-video_size", f"{width}x{height}",
+        "-i", display,
+    ]
+
+def build_crop_filter(name, width, height, x, y):
+    # x/y stay adjustable at runtime through filter commands sent to the named instance.
+    return f"{name}=w={width}:h={height}:x={x}:y={y}:exact=1"
+
+def compute_output_size(width, height, output_scale):
+    # Accepts "native", "50%", "1080p" or "1920x1080"; keeps the aspect ratio and never upscales.
+    value = str(output_scale or "native").strip().lower()
+    if value in ("", "native"):
+        return None
+    if value.endswith('%'):
+        factor = float(value[:-1]) / 100
+    elif value.endswith('p'):
+        factor = int(value[:-1]) / height
+    else:
+        box_width, box_height = (int(part) for part in value.split('x'))
+        factor = min(box_width / width, box_height / height)
+    if factor <= 0:
+        raise ValueError(f"invalid output size: {output_scale}")
+    if factor >= 1:
+        return None
+    scaled_width = max(2, int(width * factor) // 2 * 2)
+    scaled_height = max(2, int(height * factor) // 2 * 2)
+    return scaled_width, scaled_height
+
+def build_scale_filter(width, height, scaler="bicubic"):
+    return f"scale=w={width}:h={height}:flags={scaler}"
+
+def escape_concat_path(path):
+    return os.path.abspath(path).replace("'", "'\\''")
+
+def write_concat_list(concat_file, videos):
+    with open(concat_file, 'w', encoding='utf-8') as f:
+        for video in videos:
+            f.write(f"file '{escape_concat_path(video)}'\n")
+
+def build_concat_args(ffmpeg_path, concat_file, output_file):
+    return [
+        ffmpeg_path,
+        "-f", "concat",
+        "-safe", "0",
+        "-i", concat_file,
+        "-c", "copy",
+        "-movflags", "+faststart",
+        output_file
+    ]
+
+def escape_tee_path(path):
+    return re.sub(r"([\\|'\[\]])", r"\\\1", path)
+
+def live_format_for(url, live_format=""):
+    if live_format:
+        return live_format
+    return LIVE_FORMATS.get(url.split("://", 1)[0].lower(), "mpegts")
+
+def build_tee_output(path, output_format, live_url, live_format="", file_options=None):
+    file_spec = ":".join([f"f={TEE_MUXERS.get(output_format, output_format)}"] +
+                         [f"{key}={value}" for key, value in (file_options or {}).items()])
+    return "|".join([
+        f"[{file_spec}]{escape_tee_path(path)}",
+        f"[f={live_format_for(live_url, live_format)}:{LIVE_SLAVE_OPTIONS}]{escape_tee_path(live_url)}",
+    ])
@@ -0,0 +1,135 @@
+import re
+import threading
+import time
+
+PROGRESS_FIELD_RE = re.compile(r'(\w+)=\s*(\S+)')
+# Emitted by -benchmark_all: "bench: <real> user <user> sys <sys> real <label>", times in microseconds.
+BENCHMARK_RE = re.compile(r'^bench:\s*(\d+) user\s+(\d+) sys\s+(\d+) real (.*?)\s*$')
+BENCHMARK_STREAM_RE = re.compile(r'(\w+) (\d+)\.(\d+)$')
+LOG_CONTEXT_RE = re.compile(r'^\[([^\]@]+?) @ (?:0x)?[0-9a-fA-F]+\]')
+AUDIO_LOG_CONTEXTS = ('pulse', 'dshow', 'alsa')
+INPUT_HEADER_RE = re.compile(r"^Input #(\d+), ")
+INPUT_START_RE = re.compile(r'^Duration: .*?, start: (-?[\d.]+)')
+
+SIZE_UNITS = {
+    'b': 1,
+    'kb': 1000,
+    'kib': 1024,
+    'mb': 1000 ** 2,
+    'mib': 1024 ** 2,
+    'gb': 1000 ** 3,
+    'gib': 1024 ** 3,
+}
+
+def is_progress_line(line):
+    return "frame=" in line or "fps=" in line or "size=" in line
+
+def parse_time(value):
+    try:
+        hours, minutes, seconds = value.split(':')
+        return int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+    except (ValueError, AttributeError):
+        return None
+
+def parse_size(value):
+    match = re.match(r'([\d.]+)\s*([a-zA-Z]*)', value)
+    if not match:
+        return None
+    unit = match.group(2).lower() or 'b'
+    return int(float(match.group(1)) * SIZE_UNITS.get(unit, 1))
+
+def _to_number(value, cast=float, suffix=''):
+    if suffix and value.endswith(suffix):
+        value = value[:-len(suffix)]
+    try:
+        return cast(value)
+    except (ValueError, TypeError):
+        return None
+
+def parse_progress_line(line):
+    fields = dict(PROGRESS_FIELD_RE.findall(line))
+    if not fields:
+        return None
+
+    progress = {}
+    if 'frame' in fields:
+        progress['frame'] = _to_number(fields['frame'], int)
+    if 'fps' in fields:
+        progress['fps'] = _to_number(fields['fps'])
+    if 'q' in fields:
+        progress['q'] = _to_number(fields['q'])
+    for key in ('size', 'Lsize'):
+        if key in fields:
+            progress['size_bytes'] = parse_size(fields[key])
+    if 'time' in fields:
+        progress['out_time'] = parse_time(fields['time'])
+    if 'bitrate' in fields:
+        progress['bitrate_kbps'] = _to_number(fields['bitrate'], suffix='kbits/s')
+    if 'dup' in fields:
+        progress['dup'] = _to_number(fields['dup'], int)
+    if 'drop' in fields:
+        progress['drop'] = _to_number(fields['drop'], int)
+    if 'speed' in fields:
+        progress['speed'] = _to_number(fields['speed'], suffix='x')
+
+    return progress or None
+
+def parse_benchmark_line(line):
+    match = BENCHMARK_RE.match(line)
+    if not match:
+        return None
+    stream = BENCHMARK_STREAM_RE.search(match.group(4))
+    return {
+        'label': match.group(4),
+        'stage': stream.group(1) if stream else match.group(4),
+        'file': int(stream.group(2)) if stream else None,
+        'real': int(match.group(3)) / 1e6,
+        'cpu': (int(match.group(1)) + int(match.group(2))) / 1e6,
+    }
+
+def parse_audio_input_event(line):
+    # ffmpeg's stats only count dropped video frames; lost audio shows up as messages from the audio
+    # input instead (pulse/dshow buffers overflowing, packets dropped for bad timestamps, a full input queue).
+    context = LOG_CONTEXT_RE.match(line)
+    if not context or not any(name in context.group(1) for name in AUDIO_LOG_CONTEXTS):
+        return None
+    lower = line.lower()
+    if 'queue blocking' in lower:
+        return 'queue_blocked'
+    if 'dropping' in lower or 'dropped' in lower:
+        return 'dropped'
+    return None
+
+class ProgressTracker:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.progress = {}
+            self.updated_at = None
+            self.advanced_at = None
+
+    def update(self, line):
+        progress = parse_progress_line(line)
+        if progress:
+            with self.lock:
+                now = time.monotonic()
+                # ffmpeg keeps printing stats while an input is blocked; only a growing time means progress.
+                if (progress.get('out_time') or 0) > (self.progress.get('out_time') or 0):
+                    self.advanced_at = now
+                self.progress.update(progress)
+                self.updated_at = now
+        return progress
+
+    def last_advance(self):
+        with self.lock:
+            return self.advanced_at, self.progress.get('out_time')
+
+    def snapshot(self):
+        with self.lock:
+            snapshot = dict(self.progress)
+            if self.updated_at is not None:
+                snapshot['age'] = round(time.monotonic() - self.updated_at, 3)
+        return snapshot
@@ -1,17 +1,50 @@
+import atexit
 import logging
-from logging.handlers import RotatingFileHandler
+import queue
+from logging.handlers import RotatingFileHandler, QueueHandler, QueueListener
+
+LOG_QUEUE_SIZE = 10000
+
+_listener = None
+_queue_handler = None
+
+class DroppingQueueHandler(QueueHandler):
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record):
+        # Never block the caller (e.g. the ffmpeg stderr reader) on a slow disk.
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+class BoundedQueueListener(QueueListener):
+    def enqueue_sentinel(self):
+        try:
+            self.queue.put(self._sentinel, timeout=5)
+        except queue.Full:
+            pass
 
 def setup_logging():
+    global _listener, _queue_handler
+
     logger = logging.getLogger()
-    
+
     for handler in logger.handlers[:]:
         logger.removeHandler(handler)
-    
+
+    if _listener:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+
     logger.setLevel(logging.DEBUG)
-    
+
     file_handler = RotatingFileHandler('app.log', maxBytes=10*1024*1024, backupCount=5)
-    file_handler.setLevel(logging.DEBUG) 
-    
+    file_handler.setLevel(logging.DEBUG)
+
     formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
     file_handler.setFormatter(formatter)
 
@@ -19,7 +52,24 @@ def setup_logging():
     console_handler.setLevel(logging.WARNING)
     console_handler.setFormatter(formatter)
 
-    logger.addHandler(file_handler)
-    logger.addHandler(console_handler)
-    
+    log_queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+    _queue_handler = DroppingQueueHandler(log_queue)
+    _listener = BoundedQueueListener(log_queue, file_handler, console_handler, respect_handler_level=True)
+    _listener.start()
+
+    logger.addHandler(_queue_handler)
+
     return logger
+
+def get_dropped_log_records():
+    return _queue_handler.dropped if _queue_handler else 0
+
+def shutdown_logging():
+    global _listener
+    if _listener:
+        if _queue_handler and _queue_handler.dropped:
+            logging.getLogger().warning(f"{_queue_handler.dropped} log records were dropped because the log queue was full")
+        _listener.stop()
+        _listener = None
+
+atexit.register(shutdown_logging)
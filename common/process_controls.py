@@ -0,0 +1,291 @@
+import ctypes
+import logging
+import os
+import platform
+import shutil
+import subprocess
+
+IOPRIO_CLASS_RT = 1
+IOPRIO_CLASS_BE = 2
+IOPRIO_CLASS_IDLE = 3
+IOPRIO_CLASS_SHIFT = 13
+IOPRIO_WHO_PROCESS = 1
+
+IOPRIO_SYSCALLS = {
+    'x86_64': (251, 252),
+    'amd64': (251, 252),
+    'i386': (289, 290),
+    'i686': (289, 290),
+    'aarch64': (30, 31),
+    'arm64': (30, 31),
+    'armv7l': (314, 315),
+}
+
+IOPRIO_CLASS_NAMES = {
+    'realtime': IOPRIO_CLASS_RT,
+    'best-effort': IOPRIO_CLASS_BE,
+    'idle': IOPRIO_CLASS_IDLE,
+}
+
+CGROUP_ROOT = '/sys/fs/cgroup'
+CPU_MAX_PERIOD = 100000
+
+ENCODER_PROFILES = {
+    'default': {},
+    'balanced': {'nice': 5, 'ionice': 'best-effort:4'},
+    'background': {'nice': 10, 'ionice': 'best-effort:7'},
+}
+
+def parse_cpu_list(value):
+    if not value:
+        return None
+    cpus = set()
+    for part in str(value).split(','):
+        part = part.strip()
+        if not part:
+            continue
+        if '-' in part:
+            first, last = part.split('-', 1)
+            cpus.update(range(int(first), int(last) + 1))
+        else:
+            cpus.add(int(part))
+    return cpus or None
+
+def format_cpu_list(cpus):
+    return ','.join(str(cpu) for cpu in sorted(cpus))
+
+def parse_ionice(value):
+    if not value:
+        return None
+    name, _, level = str(value).partition(':')
+    io_class = IOPRIO_CLASS_NAMES.get(name.strip().lower())
+    if io_class is None:
+        raise ValueError(f"invalid ionice class: {value}")
+    level = int(level) if level else 4
+    if not 0 <= level <= 7:
+        raise ValueError(f"invalid ionice level: {value}")
+    return io_class, level
+
+def parse_cpu_max(value):
+    if not value:
+        return None
+    value = str(value).strip()
+    if value.endswith('%'):
+        quota = int(float(value[:-1]) * CPU_MAX_PERIOD / 100)
+        return f"{max(1000, quota)} {CPU_MAX_PERIOD}"
+    parts = value.split()
+    quota = parts[0] if parts[0] == 'max' else str(int(parts[0]))
+    period = int(parts[1]) if len(parts) > 1 else CPU_MAX_PERIOD
+    return f"{quota} {period}"
+
+def parse_count(value):
+    return int(value or 0)
+
+PROFILE_PARSERS = {
+    'nice': parse_count,
+    'ionice': parse_ionice,
+    'affinity': parse_cpu_list,
+    'threads': parse_count,
+    'slices': parse_count,
+    'cpu_max': parse_cpu_max,
+}
+
+def _ioprio_syscalls():
+    return IOPRIO_SYSCALLS.get(platform.machine().lower())
+
+def set_ioprio(pid, io_class, level):
+    syscalls = _ioprio_syscalls()
+    if not syscalls:
+        raise OSError("ioprio_set is not supported on this architecture")
+    libc = ctypes.CDLL(None, use_errno=True)
+    value = (io_class << IOPRIO_CLASS_SHIFT) | (level if io_class != IOPRIO_CLASS_IDLE else 0)
+    if libc.syscall(syscalls[0], IOPRIO_WHO_PROCESS, pid, value) != 0:
+        raise OSError(ctypes.get_errno(), os.strerror(ctypes.get_errno()))
+
+def get_ioprio(pid):
+    syscalls = _ioprio_syscalls()
+    if not syscalls:
+        return None
+    libc = ctypes.CDLL(None, use_errno=True)
+    value = libc.syscall(syscalls[1], IOPRIO_WHO_PROCESS, pid)
+    if value < 0:
+        return None
+    io_class = value >> IOPRIO_CLASS_SHIFT
+    names = {v: k for k, v in IOPRIO_CLASS_NAMES.items()}
+    return f"{names.get(io_class, 'none')}:{value & 0x7}"
+
+class EncoderProcessControls:
+    def __init__(self, name='default', nice=0, ionice=None, affinity=None, threads=0, slices=0, cpu_max=None):
+        self.name = name
+        self.nice = parse_count(nice)
+        self.ionice = parse_ionice(ionice)
+        self.affinity = parse_cpu_list(affinity)
+        self.threads = parse_count(threads)
+        self.slices = parse_count(slices)
+        self.cpu_max = parse_cpu_max(cpu_max)
+        self.cgroups = []
+        self.logger = logging.getLogger()
+
+    @classmethod
+    def from_config(cls, config, profile_name):
+        values = dict(ENCODER_PROFILES.get(profile_name, {}))
+        section = f"EncoderProfile:{profile_name}"
+        if config.has_section(section):
+            for key, value in config.items(section, raw=True):
+                if key not in PROFILE_PARSERS:
+                    continue
+                try:
+                    PROFILE_PARSERS[key](value)
+                except ValueError:
+                    logging.getLogger().warning(f"Invalid {key} '{value}' in [{section}], "
+                                                f"using '{values.get(key, '')}'")
+                    continue
+                values[key] = value
+        elif profile_name not in ENCODER_PROFILES:
+            logging.getLogger().warning(f"Unknown encoder profile '{profile_name}', using defaults")
+        return cls(profile_name, **values)
+
+    def available_cpus(self):
+        if self.affinity:
+            return len(self.affinity)
+        return None
+
+    def update_popen_kwargs(self, popen_kwargs):
+        if platform.system() == 'Windows':
+            if self.nice >= 15:
+                priority = subprocess.IDLE_PRIORITY_CLASS
+            elif self.nice > 0:
+                priority = subprocess.BELOW_NORMAL_PRIORITY_CLASS
+            elif self.nice < 0:
+                priority = subprocess.ABOVE_NORMAL_PRIORITY_CLASS
+            else:
+                priority = 0
+            popen_kwargs['creationflags'] = popen_kwargs.get('creationflags', 0) | priority
+        return popen_kwargs
+
+    def wrap_command(self, args):
+        # nice/ionice/taskset set the limits and exec ffmpeg under the same pid, so every encoder
+        # thread inherits them. A preexec_fn would do the same from a forked copy of this
+        # multithreaded process, which can deadlock on a lock held by another thread.
+        if platform.system() == 'Windows':
+            return args
+        if shutil.which(args[0]) is None:
+            raise FileNotFoundError(f"{args[0]} not found")
+        prefix = []
+        if self.nice and shutil.which('nice'):
+            prefix += ['nice', '-n', str(self.nice)]
+        if self.ionice and shutil.which('ionice'):
+            io_class, level = self.ionice
+            prefix += ['ionice', '-t', '-c', str(io_class)]
+            if io_class != IOPRIO_CLASS_IDLE:
+                prefix += ['-n', str(level)]
+        if self.affinity and shutil.which('taskset'):
+            prefix += ['taskset', '-c', format_cpu_list(self.affinity)]
+        return prefix + args
+
+    def apply_after_spawn(self, pid, session_name):
+        if platform.system() == 'Windows':
+            if self.affinity:
+                self._set_windows_affinity(pid)
+            return
+        self._apply_to_threads(pid)
+        if self.cpu_max:
+            self._join_cgroup(pid, session_name)
+
+    def _apply_to_threads(self, pid):
+        # Fallback for whatever wrap_command could not prefix: set it on every thread ffmpeg has so far;
+        # threads it starts later inherit it from the thread that creates them.
+        nice = self.nice and not shutil.which('nice')
+        ionice = self.ionice and not shutil.which('ionice')
+        affinity = self.affinity and not shutil.which('taskset')
+        if not (nice or ionice or affinity):
+            return
+        try:
+            tids = [int(tid) for tid in os.listdir(f'/proc/{pid}/task')]
+        except OSError:
+            tids = [pid]
+        for tid in tids:
+            try:
+                if nice:
+                    os.setpriority(os.PRIO_PROCESS, tid, os.getpriority(os.PRIO_PROCESS, tid) + self.nice)
+                if ionice:
+                    set_ioprio(tid, *self.ionice)
+                if affinity:
+                    os.sched_setaffinity(tid, self.affinity)
+            except OSError as e:
+                self.logger.warning(f"Could not apply encoder limits to thread {tid}: {e}")
+
+    def _set_windows_affinity(self, pid):
+        PROCESS_SET_INFORMATION = 0x0200
+        PROCESS_QUERY_INFORMATION = 0x0400
+        kernel32 = ctypes.windll.kernel32
+        handle = kernel32.OpenProcess(PROCESS_SET_INFORMATION | PROCESS_QUERY_INFORMATION, False, pid)
+        if not handle:
+            self.logger.warning(f"Could not open encoder process {pid} to set CPU affinity")
+            return
+        try:
+            mask = sum(1 << cpu for cpu in self.affinity)
+            if not kernel32.SetProcessAffinityMask(handle, ctypes.c_size_t(mask)):
+                self.logger.warning(f"Could not set CPU affinity {format_cpu_list(self.affinity)} for encoder")
+        finally:
+            kernel32.CloseHandle(handle)
+
+    def _join_cgroup(self, pid, session_name):
+        try:
+            with open('/proc/self/cgroup') as f:
+                own_cgroup = next(line.split('::', 1)[1].strip() for line in f if line.startswith('0::'))
+        except (OSError, StopIteration):
+            self.logger.warning("cgroup v2 is not available, ignoring cpu_max")
+            return
+
+        # Processes can't live in a cgroup that delegates controllers, so use a sibling of our own cgroup.
+        parent = os.path.dirname(os.path.join(CGROUP_ROOT, own_cgroup.lstrip('/')))
+        cgroup = os.path.join(parent, f"miniscreenrecorder-{os.getpid()}-{session_name}")
+        try:
+            os.makedirs(cgroup, exist_ok=True)
+            with open(os.path.join(cgroup, 'cpu.max'), 'w') as f:
+                f.write(self.cpu_max)
+            with open(os.path.join(cgroup, 'cgroup.procs'), 'w') as f:
+                f.write(str(pid))
+            if cgroup not in self.cgroups:
+                self.cgroups.append(cgroup)
+        except OSError as e:
+            self.logger.warning(f"Could not apply cgroup cpu.max '{self.cpu_max}' to encoder: {e}")
+
+    def describe_effective(self, pid, threads):
+        effective = [f"profile={self.name}", f"threads={threads or 'auto'}"]
+        if self.slices:
+            effective.append(f"slices={self.slices}")
+        if platform.system() == 'Windows':
+            effective.append(f"nice={self.nice}")
+            if self.affinity:
+                effective.append(f"affinity={format_cpu_list(self.affinity)}")
+            return ', '.join(effective)
+
+        try:
+            effective.append(f"nice={os.getpriority(os.PRIO_PROCESS, pid)}")
+        except OSError:
+            pass
+        ioprio = get_ioprio(pid)
+        if ioprio:
+            effective.append(f"ionice={ioprio}")
+        try:
+            effective.append(f"affinity={format_cpu_list(os.sched_getaffinity(pid))}")
+        except (OSError, AttributeError):
+            pass
+        try:
+            with open(f'/proc/{pid}/cgroup') as f:
+                cgroup = next(line.split('::', 1)[1].strip() for line in f if line.startswith('0::'))
+            with open(os.path.join(CGROUP_ROOT, cgroup.lstrip('/'), 'cpu.max')) as f:
+                effective.append(f"cpu.max={f.read().strip()}")
+        except (OSError, StopIteration):
+            pass
+        return ', '.join(effective)
+
+    def cleanup(self):
+        for cgroup in self.cgroups:
+            try:
+                os.rmdir(cgroup)
+            except OSError:
+                pass
+        self.cgroups = []
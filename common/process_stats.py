@@ -0,0 +1,128 @@
+import os
+import platform
+import time
+
+CLOCK_TICKS = os.sysconf('SC_CLK_TCK') if hasattr(os, 'sysconf') else 100
+PAGE_SIZE = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+
+def read_proc_stat(pid):
+    with open(f'/proc/{pid}/stat') as f:
+        data = f.read()
+    # The command name may contain spaces, so split after its closing parenthesis.
+    fields = data[data.rindex(')') + 2:].split()
+    return {
+        'cpu_seconds': (int(fields[11]) + int(fields[12])) / CLOCK_TICKS,
+        'threads': int(fields[17]),
+        'rss_bytes': int(fields[21]) * PAGE_SIZE,
+    }
+
+def read_proc_status(pid):
+    status = {}
+    with open(f'/proc/{pid}/status') as f:
+        for line in f:
+            key, _, value = line.partition(':')
+            if key in ('VmRSS', 'VmHWM'):
+                status[key] = int(value.split()[0]) * 1024
+            elif key in ('voluntary_ctxt_switches', 'nonvoluntary_ctxt_switches'):
+                status[key] = int(value.strip())
+    return status
+
+def read_proc_io(pid):
+    io = {}
+    try:
+        with open(f'/proc/{pid}/io') as f:
+            for line in f:
+                key, _, value = line.partition(':')
+                io[key] = int(value.strip())
+    except (OSError, ValueError):
+        pass
+    return io
+
+def read_windows_process(pid):
+    import ctypes
+    from ctypes import wintypes
+
+    PROCESS_QUERY_LIMITED_INFORMATION = 0x1000
+    PROCESS_VM_READ = 0x0010
+
+    class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+        _fields_ = [('cb', wintypes.DWORD), ('PageFaultCount', wintypes.DWORD),
+                    ('PeakWorkingSetSize', ctypes.c_size_t), ('WorkingSetSize', ctypes.c_size_t),
+                    ('QuotaPeakPagedPoolUsage', ctypes.c_size_t), ('QuotaPagedPoolUsage', ctypes.c_size_t),
+                    ('QuotaPeakNonPagedPoolUsage', ctypes.c_size_t), ('QuotaNonPagedPoolUsage', ctypes.c_size_t),
+                    ('PagefileUsage', ctypes.c_size_t), ('PeakPagefileUsage', ctypes.c_size_t)]
+
+    class IO_COUNTERS(ctypes.Structure):
+        _fields_ = [('ReadOperationCount', ctypes.c_ulonglong), ('WriteOperationCount', ctypes.c_ulonglong),
+                    ('OtherOperationCount', ctypes.c_ulonglong), ('ReadTransferCount', ctypes.c_ulonglong),
+                    ('WriteTransferCount', ctypes.c_ulonglong), ('OtherTransferCount', ctypes.c_ulonglong)]
+
+    kernel32 = ctypes.windll.kernel32
+    handle = kernel32.OpenProcess(PROCESS_QUERY_LIMITED_INFORMATION | PROCESS_VM_READ, False, pid)
+    if not handle:
+        raise OSError(f"cannot open process {pid}")
+    try:
+        creation, exit_time, kernel, user = (wintypes.FILETIME() for _ in range(4))
+        kernel32.GetProcessTimes(handle, ctypes.byref(creation), ctypes.byref(exit_time),
+                                 ctypes.byref(kernel), ctypes.byref(user))
+        to_seconds = lambda ft: ((ft.dwHighDateTime << 32) | ft.dwLowDateTime) / 1e7
+
+        counters = PROCESS_MEMORY_COUNTERS()
+        counters.cb = ctypes.sizeof(counters)
+        ctypes.windll.psapi.GetProcessMemoryInfo(handle, ctypes.byref(counters), counters.cb)
+
+        io_counters = IO_COUNTERS()
+        kernel32.GetProcessIoCounters(handle, ctypes.byref(io_counters))
+
+        return {
+            'cpu_seconds': to_seconds(kernel) + to_seconds(user),
+            'rss_bytes': counters.WorkingSetSize,
+            'peak_rss_bytes': counters.PeakWorkingSetSize,
+            'read_bytes': io_counters.ReadTransferCount,
+            'write_bytes': io_counters.WriteTransferCount,
+        }
+    finally:
+        kernel32.CloseHandle(handle)
+
+def read_process(pid):
+    if platform.system() == 'Windows':
+        return read_windows_process(pid)
+
+    sample = read_proc_stat(pid)
+    status = read_proc_status(pid)
+    if 'VmRSS' in status:
+        sample['rss_bytes'] = status['VmRSS']
+    if 'VmHWM' in status:
+        sample['peak_rss_bytes'] = status['VmHWM']
+    for key in ('voluntary_ctxt_switches', 'nonvoluntary_ctxt_switches'):
+        if key in status:
+            sample[key] = status[key]
+    io = read_proc_io(pid)
+    if 'read_bytes' in io:
+        sample['read_bytes'] = io['read_bytes']
+    if 'write_bytes' in io:
+        sample['write_bytes'] = io['write_bytes']
+    return sample
+
+class ProcessSampler:
+    def __init__(self, pid):
+        self.pid = pid
+        self.last_sample = None
+        self.last_time = None
+
+    def sample(self):
+        now = time.monotonic()
+        try:
+            current = read_process(self.pid)
+        except (OSError, ValueError, IndexError):
+            return None
+
+        if self.last_sample is not None and now > self.last_time:
+            elapsed = now - self.last_time
+            current['cpu_percent'] = 100.0 * (current['cpu_seconds'] - self.last_sample['cpu_seconds']) / elapsed
+            if 'write_bytes' in current and 'write_bytes' in self.last_sample:
+                current['write_rate'] = (current['write_bytes'] - self.last_sample['write_bytes']) / elapsed
+
+        self.last_sample = current
+        self.last_time = now
+        return current
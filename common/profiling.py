@@ -0,0 +1,164 @@
+import atexit
+import contextlib
+import functools
+import io
+import logging
+import os
+import random
+import threading
+import time
+
+PROFILE_ENV_VAR = 'MSR_PROFILE'
+REPORT_FILE = 'profile_report.txt'
+# Durations kept per span for percentiles; spans such as the timer tick fire for the whole session.
+RESERVOIR_SIZE = 1024
+
+_enabled = False
+_spans = {}
+_lock = threading.Lock()
+_profiler = None
+_tracemalloc_started = False
+_report_registered = False
+_null_span = contextlib.nullcontext()
+
+class SpanStats:
+    # Running aggregates plus a uniform sample of the durations (reservoir sampling), so memory stays
+    # fixed however long the app runs.
+    def __init__(self, reservoir_size=RESERVOIR_SIZE):
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+        self.reservoir = []
+        self.reservoir_size = reservoir_size
+        self.random = random.Random()
+
+    def add(self, duration):
+        self.count += 1
+        self.total += duration
+        self.min = duration if self.min is None else min(self.min, duration)
+        self.max = duration if self.max is None else max(self.max, duration)
+        if len(self.reservoir) < self.reservoir_size:
+            self.reservoir.append(duration)
+        else:
+            index = self.random.randrange(self.count)
+            if index < self.reservoir_size:
+                self.reservoir[index] = duration
+
+    def statistics(self):
+        ordered = sorted(self.reservoir)
+        return {
+            'count': self.count,
+            'total_ms': self.total * 1000,
+            'mean_ms': self.total / self.count * 1000,
+            'min_ms': self.min * 1000,
+            'p95_ms': ordered[min(len(ordered) - 1, int(0.95 * (len(ordered) - 1) + 0.5))] * 1000,
+            'max_ms': self.max * 1000,
+        }
+
+def parse_modes(value):
+    value = (value or '').strip().lower()
+    if value in ('', '0', 'off', 'false', 'no'):
+        return set()
+    modes = {mode.strip() for mode in value.split(',') if mode.strip()}
+    if 'all' in modes:
+        modes.update({'cprofile', 'tracemalloc'})
+    return (modes & {'cprofile', 'tracemalloc'}) | {'spans'}
+
+def configure(config_value=None):
+    global _enabled, _profiler, _tracemalloc_started, _report_registered
+
+    modes = parse_modes(os.environ.get(PROFILE_ENV_VAR) or config_value)
+    if not modes or _enabled:
+        return _enabled
+
+    _enabled = True
+    if 'cprofile' in modes:
+        import cProfile
+        _profiler = cProfile.Profile()
+        _profiler.enable()
+    if 'tracemalloc' in modes:
+        import tracemalloc
+        tracemalloc.start(10)
+        _tracemalloc_started = True
+    if not _report_registered:
+        atexit.register(write_report)
+        _report_registered = True
+    logging.getLogger().info(f"Profiling enabled: {', '.join(sorted(modes))}")
+    return True
+
+def is_enabled():
+    return _enabled
+
+def record(name, duration):
+    with _lock:
+        stats = _spans.get(name)
+        if stats is None:
+            stats = _spans[name] = SpanStats()
+        stats.add(duration)
+
+@contextlib.contextmanager
+def _span(name):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, time.perf_counter() - start)
+
+def span(name):
+    if not _enabled:
+        return _null_span
+    return _span(name)
+
+def timed(name):
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                record(name, time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+def span_statistics():
+    with _lock:
+        return {name: stats.statistics() for name, stats in _spans.items()}
+
+def format_report():
+    lines = ["Timing spans", "=" * 12,
+             f"{'span':<28}{'count':>8}{'total ms':>12}{'mean ms':>10}{'min ms':>10}{'p95 ms':>10}{'max ms':>10}"]
+    for name, stats in sorted(span_statistics().items(), key=lambda item: -item[1]['total_ms']):
+        lines.append(f"{name:<28}{stats['count']:>8}{stats['total_ms']:>12.1f}{stats['mean_ms']:>10.2f}"
+                     f"{stats['min_ms']:>10.2f}{stats['p95_ms']:>10.2f}{stats['max_ms']:>10.2f}")
+
+    if _profiler:
+        import pstats
+        _profiler.disable()
+        output = io.StringIO()
+        pstats.Stats(_profiler, stream=output).sort_stats('cumulative').print_stats(40)
+        lines.extend(["", "cProfile (main thread, cumulative)", "=" * 34, output.getvalue()])
+
+    if _tracemalloc_started:
+        import tracemalloc
+        snapshot = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        lines.extend(["", "tracemalloc", "=" * 11, f"current {current / 1024 ** 2:.1f} MB, peak {peak / 1024 ** 2:.1f} MB"])
+        for stat in snapshot.statistics('lineno')[:20]:
+            lines.append(str(stat))
+
+    return "\n".join(lines) + "\n"
+
+def write_report(path=REPORT_FILE):
+    if not _enabled:
+        return
+    try:
+        report = format_report()
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(report)
+        logging.getLogger().info(f"Profiling report written to {os.path.abspath(path)}")
+    except Exception as e:
+        logging.getLogger().error(f"Error writing profiling report: {e}")
@@ -0,0 +1,308 @@
+import logging
+import os
+import subprocess
+import threading
+import time
+
+from common.ffmpeg_progress import (ProgressTracker, is_progress_line, parse_audio_input_event, parse_benchmark_line,
+                                    INPUT_HEADER_RE, INPUT_START_RE)
+from common import profiling
+
+PROGRESS_LOG_INTERVAL = 1.0
+SLOW_SPEED_THRESHOLD = 0.9
+
+class RecordingSession:
+    def __init__(self, name, monitor_index=0, record_area=None, include_audio=True, include_video=True):
+        self.name = name
+        self.monitor_index = monitor_index
+        self.record_area = record_area
+        self.window = None
+        self.follow_cursor = False
+        self.viewport = None
+        self.output_size = None
+        self.follower = None
+        self.include_audio = include_audio
+        self.include_video = include_video
+        self.settings = {}
+        self.geometry = None
+        self.threads = 0
+        self.process = None
+        self.stdin_lock = threading.Lock()
+        self.video_path = None
+        self.video_parts = []
+        self.proxy_path = None
+        self.proxy_parts = []
+        self.proxy_size = None
+        self.output_costs = {}
+        self.audio_drops = 0
+        self.audio_queue_blocked = 0
+        self.audio_inputs = {}
+        self.input_starts = {}
+        self.audio_start_offsets = {}
+        self.started_at = None
+        self.restart_attempts = 0
+        self.restarts = 0
+        self.gap_started_at = None
+        self.gap_reason = None
+        self.gaps = []
+        self.current_video_part = 0
+        self.completed_duration = 0.0
+        self.completed_size = 0
+        self.progress = ProgressTracker()
+        self.reader_thread = None
+        self.sampler = None
+        self.meter = None
+        self.suppressed_lines = 0
+        self.logger = logging.getLogger()
+
+    @property
+    def is_active(self):
+        return self.process is not None
+
+    @property
+    def weight(self):
+        if self.output_size:
+            return max(1, self.output_size[0] * self.output_size[1])
+        if self.viewport:
+            return max(1, self.viewport[0] * self.viewport[1])
+        if not self.geometry:
+            return 1
+        return max(1, self.geometry[2] * self.geometry[3])
+
+    @profiling.timed("ffmpeg_spawn")
+    def start(self, ffmpeg_args, popen_kwargs=None):
+        self.progress.reset()
+        self.input_starts = {}
+        self.started_at = time.monotonic()
+        self.process = subprocess.Popen(
+            ffmpeg_args,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            universal_newlines=True,
+            **(popen_kwargs or {})
+        )
+        self.reader_thread = threading.Thread(target=self.read_output, args=(self.process,), daemon=True)
+        self.reader_thread.start()
+        if self.meter:
+            self.meter.start(self.process.stdout.buffer)
+
+    def send_filter_command(self, target, command, argument):
+        # Same as typing "c" in an interactive ffmpeg: "<target> <time> <command> <argument>", -1 = now.
+        # Called from the follower's writer thread; the lock keeps it from interleaving with "q".
+        process = self.process
+        if not process:
+            return False
+        try:
+            with self.stdin_lock:
+                process.stdin.write(f"c{target} -1 {command} {argument}\n")
+                process.stdin.flush()
+            return True
+        except (BrokenPipeError, OSError, ValueError):
+            return False
+
+    @profiling.timed("stop_part")
+    def stop_part(self, timeout=5, kill_timeout=2):
+        if not self.process:
+            return
+        process = self.process
+        try:
+            with self.stdin_lock:
+                process.stdin.write('q')
+                process.stdin.flush()
+        except (BrokenPipeError, OSError, ValueError):
+            pass
+
+        try:
+            process.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            process.terminate()
+            try:
+                process.wait(timeout=kill_timeout)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+        for pipe in [process.stdin, process.stdout, process.stderr]:
+            try:
+                pipe.close()
+            except:
+                pass
+
+        if self.video_path and os.path.exists(self.video_path) and os.path.getsize(self.video_path) > 0:
+            self.video_parts.append(self.video_path)
+            progress = self.progress.snapshot()
+            self.completed_duration += progress.get('out_time') or 0.0
+            self.completed_size += os.path.getsize(self.video_path)
+        if self.proxy_path and os.path.exists(self.proxy_path) and os.path.getsize(self.proxy_path) > 0:
+            self.proxy_parts.append(self.proxy_path)
+        if self.output_costs:
+            self.logger.info(f"Session '{self.name}' encode cost per output: {self.format_output_costs()}")
+        self.current_video_part += 1
+        self.process = None
+
+    def open_gap(self, started_at, reason):
+        self.gap_started_at = started_at
+        self.gap_reason = reason
+
+    def close_gap(self, resumed_at):
+        if self.gap_started_at is None:
+            return
+        gap = max(0.0, resumed_at - self.gap_started_at)
+        self.gaps.append({'part': self.current_video_part + 1, 'seconds': round(gap, 1), 'reason': self.gap_reason})
+        self.gap_started_at = None
+        self.logger.warning(f"Session '{self.name}' resumed in part {self.current_video_part + 1} "
+                            f"after a gap of {gap:.1f}s ({self.gap_reason})")
+
+    def record_benchmark(self, line):
+        bench = parse_benchmark_line(line)
+        if not bench or bench['file'] is None or not bench['stage'].startswith('encode'):
+            return
+        cost = self.output_costs.setdefault(bench['file'], {'encode_seconds': 0.0, 'cpu_seconds': 0.0, 'frames': 0})
+        cost['encode_seconds'] += bench['real']
+        cost['cpu_seconds'] += bench['cpu']
+        if bench['stage'] == 'encode_video':
+            cost['frames'] += 1
+
+    def record_audio_event(self, event, line, prefix):
+        if event == 'dropped':
+            self.audio_drops += 1
+            first = self.audio_drops == 1
+        else:
+            self.audio_queue_blocked += 1
+            first = self.audio_queue_blocked == 1
+        # These can repeat for every packet under load; log the first one and count the rest.
+        if first:
+            self.logger.warning(f"{prefix}FFmpeg audio input: {line} "
+                                f"(further messages are counted; try a larger audio_thread_queue_size)")
+
+    def record_input_start(self, index, start, prefix):
+        self.input_starts[index] = start
+        audio_indexes = sorted(self.audio_inputs)
+        if len(audio_indexes) < 2 or not all(i in self.input_starts for i in audio_indexes):
+            return
+        # With wallclock timestamps the start time is when each device delivered its first packet,
+        # so the difference is how far the sources are apart in the recording.
+        reference = self.input_starts[audio_indexes[0]]
+        self.audio_start_offsets = {self.audio_inputs[i]: round((self.input_starts[i] - reference) * 1000)
+                                    for i in audio_indexes[1:]}
+        offsets = ", ".join(f"{device}: {offset:+d} ms" for device, offset in self.audio_start_offsets.items())
+        self.logger.info(f"{prefix}Audio source offsets relative to {self.audio_inputs[audio_indexes[0]]}: {offsets}")
+
+    def format_output_costs(self):
+        names = {0: "master", 1: "proxy"}
+        return "; ".join(f"{names.get(index, f'output {index}')}: {cost['encode_seconds']:.1f} s encoding, "
+                         f"{cost['cpu_seconds']:.1f} s CPU, {cost['frames']} frames"
+                         for index, cost in sorted(self.output_costs.items()))
+
+    def recorded_duration(self):
+        if not self.is_active:
+            return self.completed_duration
+        progress = self.progress.snapshot()
+        out_time = progress.get('out_time') or 0.0
+        # ffmpeg reports progress about twice a second; extrapolate between reports.
+        if out_time and progress.get('age', 0) < 2:
+            out_time += progress['age'] * (progress.get('speed') or 1.0)
+        return self.completed_duration + out_time
+
+    def recorded_size(self):
+        size = self.progress.snapshot().get('size_bytes') if self.is_active else None
+        return self.completed_size + (size or 0)
+
+    def is_progress_anomaly(self, progress, previous):
+        if (progress.get('drop') or 0) > (previous.get('drop') or 0):
+            return "frames dropped"
+        speed = progress.get('speed')
+        if speed is not None and speed < SLOW_SPEED_THRESHOLD and (progress.get('out_time') or 0) > 2:
+            return "encoder slower than realtime"
+        return None
+
+    def read_output(self, process):
+        buffer = []
+        prefix = "" if self.name == "main" else f"[{self.name}] "
+        last_logged = 0.0
+        previous = {}
+        suppressed = 0
+        current_input = None
+        try:
+            for stdout_line in iter(process.stderr.readline, ""):
+                line = stdout_line.strip()
+
+                audio_event = parse_audio_input_event(line)
+
+                header = INPUT_HEADER_RE.match(line)
+                if header:
+                    current_input = int(header.group(1))
+                elif current_input is not None:
+                    start = INPUT_START_RE.match(line)
+                    if start:
+                        self.record_input_start(current_input, float(start.group(1)), prefix)
+                        current_input = None
+
+                if line.startswith("bench:"):
+                    self.record_benchmark(line)
+
+                elif audio_event:
+                    self.record_audio_event(audio_event, line, prefix)
+
+                elif "error" in line.lower() or "fatal" in line.lower():
+                    self.logger.error(f"{prefix}FFmpeg Error: {line}")
+
+                elif "warning" in line.lower():
+                    self.logger.warning(f"{prefix}FFmpeg Warning: {line}")
+
+                elif is_progress_line(line):
+                    progress = self.progress.update(line) or {}
+                    anomaly = self.is_progress_anomaly(progress, previous)
+                    previous = progress
+                    now = time.monotonic()
+                    if anomaly:
+                        self.logger.info(f"{prefix}FFmpeg Progress ({anomaly}): {line}")
+                    elif now - last_logged >= PROGRESS_LOG_INTERVAL:
+                        self.logger.debug(f"{prefix}FFmpeg Progress: {line}")
+                        last_logged = now
+                    else:
+                        suppressed += 1
+                        self.suppressed_lines += 1
+
+                elif "configuration:" not in line and "libav" not in line:
+                    buffer.append(line)
+                    if len(buffer) >= 10:
+                        self.logger.info(f"{prefix}FFmpeg Output: {' | '.join(buffer)}")
+                        buffer = []
+
+        except (BrokenPipeError, ValueError):
+            self.logger.warning("FFMPEG PROCESS HAS BEEN CLOSED")
+        except Exception as e:
+            self.logger.error(f"ERROR READING FFMPEG OUTPUT: {e}")
+        finally:
+            if buffer:
+                self.logger.info(f"{prefix}FFmpeg Output: {' | '.join(buffer)}")
+            if suppressed:
+                self.logger.debug(f"{prefix}{suppressed} FFmpeg progress lines were not logged (sampled)")
+
+    def get_status(self):
+        return {
+            'name': self.name,
+            'active': self.is_active,
+            'video': self.include_video,
+            'audio': self.include_audio,
+            'monitor': self.monitor_index,
+            'area': list(self.record_area) if self.record_area else None,
+            'window': self.window['id'] if self.window else None,
+            'viewport': list(self.viewport) if self.viewport else None,
+            'output_size': list(self.output_size) if self.output_size else None,
+            'threads': self.threads,
+            'suppressed_log_lines': self.suppressed_lines,
+            'video_path': self.video_path if self.is_active else None,
+            'video_parts': len(self.video_parts),
+            'proxy_parts': len(self.proxy_parts),
+            'audio_drops': self.audio_drops,
+            'audio_queue_blocked': self.audio_queue_blocked,
+            'audio_start_offsets': dict(self.audio_start_offsets),
+            'restarts': self.restarts,
+            'gaps': list(self.gaps),
+            'output_costs': {str(index): dict(cost) for index, cost in self.output_costs.items()},
+            'recorded_duration': round(self.recorded_duration(), 3),
+            'recorded_size': self.recorded_size(),
+            'progress': self.progress.snapshot() if self.is_active else {}
+        }
@@ -0,0 +1,125 @@
+import json
+import logging
+import os
+import threading
+import time
+
+from common.process_stats import ProcessSampler
+
+def percentile(values, fraction):
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(fraction * (len(ordered) - 1)))))
+    return ordered[index]
+
+class ResourceSampler:
+    def __init__(self, session, path, interval=1.0):
+        self.session = session
+        self.path = path
+        self.interval = interval
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.file = None
+        self.started_at = None
+        self.logger = logging.getLogger()
+
+        self.child_sampler = None
+        self.app_sampler = ProcessSampler(os.getpid())
+        self.part_drops = 0
+        self.last_drop = 0
+        self.samples = 0
+        self.speeds = []
+        self.write_rates = []
+        self.peak_rss = 0
+
+    def start(self):
+        self.file = open(self.path, 'w', encoding='utf-8')
+        self.started_at = time.monotonic()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def run(self):
+        while not self.stop_event.wait(self.interval):
+            try:
+                self.take_sample()
+            except Exception as e:
+                self.logger.error(f"Error sampling resources for session '{self.session.name}': {e}")
+
+    def take_sample(self):
+        process = self.session.process
+        if process is None:
+            return
+
+        if self.child_sampler is None or self.child_sampler.pid != process.pid:
+            # A new part restarts ffmpeg's counters, so bank the drops of the previous one.
+            self.part_drops += self.last_drop
+            self.last_drop = 0
+            self.child_sampler = ProcessSampler(process.pid)
+
+        child = self.child_sampler.sample() or {}
+        app = self.app_sampler.sample() or {}
+        progress = self.session.progress.snapshot()
+
+        record = {
+            't': round(time.monotonic() - self.started_at, 3),
+            'part': self.session.current_video_part,
+            'out_time': progress.get('out_time'),
+            'fps': progress.get('fps'),
+            'speed': progress.get('speed'),
+            'drop': progress.get('drop'),
+            'dup': progress.get('dup'),
+            'audio_drops': self.session.audio_drops,
+            'size': progress.get('size_bytes'),
+            'bitrate': progress.get('bitrate_kbps'),
+            'cpu': round(child['cpu_percent'], 1) if 'cpu_percent' in child else None,
+            'rss': child.get('rss_bytes'),
+            'threads': child.get('threads'),
+            'read_bytes': child.get('read_bytes'),
+            'write_bytes': child.get('write_bytes'),
+            'write_rate': round(child['write_rate']) if 'write_rate' in child else None,
+            'app_cpu': round(app['cpu_percent'], 1) if 'cpu_percent' in app else None,
+            'app_rss': app.get('rss_bytes'),
+        }
+        self.file.write(json.dumps(record, separators=(',', ':')) + '\n')
+        self.file.flush()
+
+        self.samples += 1
+        if progress.get('speed') is not None:
+            self.speeds.append(progress['speed'])
+        if progress.get('drop') is not None:
+            self.last_drop = progress['drop']
+        if 'write_rate' in child:
+            self.write_rates.append(child['write_rate'])
+        self.peak_rss = max(self.peak_rss, child.get('peak_rss_bytes') or 0, child.get('rss_bytes') or 0)
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread:
+            self.thread.join(timeout=self.interval + 1)
+            self.thread = None
+        if self.file:
+            self.file.close()
+            self.file = None
+        return self.summary()
+
+    def summary(self):
+        average_write = sum(self.write_rates) / len(self.write_rates) if self.write_rates else None
+        return {
+            'samples': self.samples,
+            'speed_p50': percentile(self.speeds, 0.5),
+            'speed_p95': percentile(self.speeds, 0.95),
+            'total_drops': self.part_drops + self.last_drop,
+            'audio_drops': self.session.audio_drops,
+            'peak_rss_mb': round(self.peak_rss / 1024 ** 2, 1),
+            'avg_write_mbps': round(average_write / 1024 ** 2, 2) if average_write is not None else None,
+        }
+
+    def format_summary(self):
+        summary = self.summary()
+        speed_p50 = f"{summary['speed_p50']:.2f}x" if summary['speed_p50'] is not None else "n/a"
+        speed_p95 = f"{summary['speed_p95']:.2f}x" if summary['speed_p95'] is not None else "n/a"
+        write = f"{summary['avg_write_mbps']:.2f} MB/s" if summary['avg_write_mbps'] is not None else "n/a"
+        return (f"speed p50 {speed_p50}, p95 {speed_p95}, total drops {summary['total_drops']}, "
+                f"audio drops {summary['audio_drops']}, "
+                f"peak RSS {summary['peak_rss_mb']} MB, avg write {write}, {summary['samples']} samples")
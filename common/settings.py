@@ -0,0 +1,200 @@
+import logging
+import os
+import tempfile
+import threading
+from configparser import ConfigParser
+
+from common.control_server import DEFAULT_CONTROL_PORT
+from common.ffmpeg_command import (AUDIO_BITRATES, AUDIO_CODECS, AUDIO_TRACK_MODES, FRAME_RATES, OUTPUT_FORMATS,
+                                   SCALERS, VIDEO_BITRATES, VIDEO_CODECS)
+
+SETTINGS_VERSION = 2
+SAVE_DELAY = 0.5
+PROXY_MODES = ("off", "video", "audio")
+RECORD_MODES = ("both", "video", "audio")
+LOW_SPACE_ACTIONS = ("pause", "warn")
+
+# name: (type, default, allowed values or None)
+SETTINGS = {
+    'version': (int, SETTINGS_VERSION, None),
+    'language': (str, 'en-US', None),
+    'theme': (str, 'dark', None),
+    'monitor': (str, '', None),
+    'fps': (str, '60', FRAME_RATES),
+    'bitrate': (str, '1000k', VIDEO_BITRATES),
+    'codec': (str, 'libx264', VIDEO_CODECS),
+    'format': (str, 'mkv', OUTPUT_FORMATS),
+    'audio_device': (str, '', None),
+    'output_folder': (str, '', None),
+    'control_api': (bool, False, None),
+    'control_port': (int, DEFAULT_CONTROL_PORT, None),
+    'control_token': (str, '', None),
+    'cpu_threads': (int, 0, None),
+    'encoder_profile': (str, 'default', None),
+    'disk_warn_minutes': (int, 10, None),
+    'watchdog_stall_seconds': (float, 1.5, None),
+    'disk_reserve_mb': (int, 256, None),
+    'low_space_action': (str, 'pause', LOW_SPACE_ACTIONS),
+    'staging_folder': (str, '', None),
+    'sampler_interval': (float, 1.0, None),
+    'thread_queue_size': (int, 0, None),
+    'wallclock_timestamps': (bool, False, None),
+    'audio_async': (int, 0, None),
+    'audio_meter': (bool, True, None),
+    'audio_thread_queue_size': (int, 1024, None),
+    'audio_codec': (str, 'aac', AUDIO_CODECS),
+    'audio_bitrate': (str, '128k', AUDIO_BITRATES),
+    'audio_sample_rate': (int, 48000, None),
+    'audio_channels': (int, 2, None),
+    'extra_audio_sources': (str, '', None),
+    'audio_tracks': (str, 'mix', AUDIO_TRACK_MODES),
+    'follow_cursor': (bool, False, None),
+    'follow_cursor_size': (str, '1280x720', None),
+    'follow_cursor_smoothing': (float, 0.2, None),
+    'output_scale': (str, 'native', None),
+    'scaler': (str, 'bicubic', SCALERS),
+    'calibration_file': (str, 'calibration.json', None),
+    'proxy_mode': (str, 'off', PROXY_MODES),
+    'proxy_size': (str, '640x360', None),
+    'proxy_bitrate': (str, '800k', None),
+    'live_output': (str, '', None),
+    'live_format': (str, '', None),
+    'record_mode': (str, 'both', RECORD_MODES),
+    'profiling': (str, 'off', None),
+}
+
+# Version 1 stored the position in the combobox instead of the value.
+LEGACY_INDEXES = {
+    'fps': FRAME_RATES,
+    'bitrate': VIDEO_BITRATES,
+    'codec': VIDEO_CODECS,
+    'format': OUTPUT_FORMATS,
+}
+
+# Values that were renamed after they had been written to config.ini.
+RENAMED_VALUES = {
+    'low_space_action': {'split': 'pause'},
+}
+
+def new_config_parser():
+    # Values such as "50%" are plain text, not interpolation.
+    return ConfigParser(interpolation=None)
+
+class Settings:
+    def __init__(self, values=None):
+        self.values = {name: default for name, (_, default, _) in SETTINGS.items()}
+        self.values.update(values or {})
+        self.legacy_audio_index = None
+        self.logger = logging.getLogger()
+
+    @classmethod
+    def from_config(cls, config, section='Settings'):
+        settings = cls()
+        if not config.has_section(section):
+            return settings
+        values = config[section]
+        legacy = 'version' not in values
+        for name, (kind, default, choices) in SETTINGS.items():
+            if name not in values or name == 'version':
+                continue
+            raw = values.get(name).strip()
+            if legacy and name in LEGACY_INDEXES and raw.isdigit() and int(raw) < len(LEGACY_INDEXES[name]):
+                raw = LEGACY_INDEXES[name][int(raw)]
+            raw = RENAMED_VALUES.get(name, {}).get(raw, raw)
+            settings.set_raw(name, raw)
+        if legacy and values.get('audio', '').strip().isdigit():
+            settings.legacy_audio_index = int(values.get('audio'))
+        return settings
+
+    def set_raw(self, name, raw):
+        kind, default, choices = SETTINGS[name]
+        try:
+            if kind is bool:
+                value = ConfigParser.BOOLEAN_STATES[raw.lower()]
+            else:
+                value = kind(raw)
+        except (KeyError, ValueError):
+            self.logger.warning(f"Invalid {name} '{raw}' in config, using '{default}'")
+            return
+        if choices is not None and value not in choices:
+            self.logger.warning(f"Unknown {name} '{raw}' in config, using '{default}'")
+            return
+        self.values[name] = value
+
+    def __getitem__(self, name):
+        return self.values[name]
+
+    def update(self, values):
+        for name, value in values.items():
+            if name not in SETTINGS:
+                raise KeyError(name)
+            self.values[name] = value
+
+    def choose(self, name, available):
+        # Checks a stored value against what this machine offers right now (devices, encoders).
+        value = self.values[name]
+        if value in available or not available:
+            return value
+        default = SETTINGS[name][1]
+        fallback = default if default in available else available[0]
+        if value:
+            self.logger.warning(f"Saved {name} '{value}' is not available, using '{fallback}'")
+        return fallback
+
+    def to_section(self):
+        values = dict(self.values, version=SETTINGS_VERSION)
+        return {name: str(value) for name, value in values.items()}
+
+def write_config_file(path, sections):
+    config = new_config_parser()
+    config.read_dict(sections)
+    folder = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(prefix='.config-', suffix='.tmp', dir=folder)
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            config.write(f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+class ConfigWriter:
+    # Coalesces bursts of changes into one write, done off the UI thread. The file is replaced
+    # atomically, so a crash leaves either the old or the new config.ini, never half of one.
+    def __init__(self, path, delay=SAVE_DELAY):
+        self.path = path
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.write_lock = threading.Lock()
+        self.pending = None
+        self.timer = None
+        self.logger = logging.getLogger()
+
+    def save(self, config):
+        sections = {section: dict(config[section]) for section in config.sections()}
+        with self.lock:
+            self.pending = sections
+            if self.timer:
+                self.timer.cancel()
+            self.timer = threading.Timer(self.delay, self.flush)
+            self.timer.daemon = True
+            self.timer.start()
+
+    def flush(self):
+        with self.write_lock:
+            with self.lock:
+                sections, self.pending = self.pending, None
+                if self.timer is not None and self.timer is not threading.current_thread():
+                    self.timer.cancel()
+                self.timer = None
+            if sections is None:
+                return
+            try:
+                write_config_file(self.path, sections)
+            except OSError as e:
+                self.logger.error(f"Could not save {self.path}: {e}")
@@ -0,0 +1,151 @@
+import hashlib
+import heapq
+import json
+import logging
+import os
+import queue
+import threading
+import time
+
+COPY_CHUNK_SIZE = 4 * 1024 * 1024
+MANIFEST_NAME = "pending_moves.json"
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(COPY_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+class StagingMover:
+    def __init__(self, staging_folder, retry_delays=(2, 10, 30, 120)):
+        self.staging_folder = staging_folder
+        self.retry_delays = retry_delays
+        self.manifest_path = os.path.join(staging_folder, MANIFEST_NAME)
+        self.queue = queue.Queue()
+        self.lock = threading.Lock()
+        self.pending = {}
+        # Files given up on this run stay in the manifest, so the next start tries them again.
+        self.failed = {}
+        self.stop_event = threading.Event()
+        self.logger = logging.getLogger()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+
+    def start(self):
+        self.load_manifest()
+        self.thread.start()
+
+    def load_manifest(self):
+        if not os.path.exists(self.manifest_path):
+            return
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                pending = json.load(f)
+        except (OSError, ValueError) as e:
+            self.logger.error(f"Error reading staging manifest: {e}")
+            return
+        for source, destination_folder in pending.items():
+            if os.path.exists(source):
+                self.logger.info(f"Resuming pending move of {source}")
+                self.enqueue(source, destination_folder)
+        self.save_manifest()
+
+    def save_manifest(self):
+        with self.lock:
+            pending = dict(self.failed)
+            pending.update(self.pending)
+        temp_path = self.manifest_path + ".tmp"
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(pending, f, indent=2)
+            os.replace(temp_path, self.manifest_path)
+        except OSError as e:
+            self.logger.error(f"Error writing staging manifest: {e}")
+
+    def enqueue(self, source, destination_folder):
+        with self.lock:
+            self.failed.pop(source, None)
+            self.pending[source] = destination_folder
+        self.save_manifest()
+        self.queue.put(source)
+
+    def pending_count(self):
+        with self.lock:
+            return len(self.pending)
+
+    def destination_for(self, source, destination_folder):
+        return os.path.join(destination_folder, os.path.basename(source))
+
+    def run(self):
+        # Failed moves wait in a heap of (due time, source, attempt) so other parts are not held up behind them.
+        retries = []
+        while not self.stop_event.is_set():
+            if retries and retries[0][0] <= time.monotonic():
+                _, source, attempt = heapq.heappop(retries)
+            else:
+                timeout = 0.5
+                if retries:
+                    timeout = min(timeout, retries[0][0] - time.monotonic())
+                try:
+                    source = self.queue.get(timeout=timeout)
+                except queue.Empty:
+                    continue
+                attempt = 0
+            with self.lock:
+                destination_folder = self.pending.get(source)
+            if destination_folder is None:
+                continue
+
+            try:
+                self.move(source, destination_folder)
+            except (OSError, ValueError) as e:
+                self.logger.warning(f"Moving {source} failed (attempt {attempt + 1}): {e}")
+                if attempt < len(self.retry_delays):
+                    heapq.heappush(retries, (time.monotonic() + self.retry_delays[attempt], source, attempt + 1))
+                    continue
+                self.logger.error(f"Giving up moving {source}; it was kept in {self.staging_folder}")
+                with self.lock:
+                    self.failed[source] = destination_folder
+            with self.lock:
+                self.pending.pop(source, None)
+            self.save_manifest()
+
+    def move(self, source, destination_folder):
+        start = time.perf_counter()
+        os.makedirs(destination_folder, exist_ok=True)
+        destination = self.destination_for(source, destination_folder)
+        temp_destination = destination + ".partial"
+
+        source_digest = hashlib.sha256()
+        try:
+            with open(source, 'rb') as src, open(temp_destination, 'wb') as dst:
+                for chunk in iter(lambda: src.read(COPY_CHUNK_SIZE), b''):
+                    source_digest.update(chunk)
+                    dst.write(chunk)
+                dst.flush()
+                os.fsync(dst.fileno())
+
+            if file_sha256(temp_destination) != source_digest.hexdigest():
+                raise ValueError("checksum mismatch after copy")
+
+            os.replace(temp_destination, destination)
+        except BaseException:
+            try:
+                os.remove(temp_destination)
+            except OSError:
+                pass
+            raise
+        os.remove(source)
+        elapsed = time.perf_counter() - start
+        size_mb = os.path.getsize(destination) / (1024 * 1024)
+        self.logger.info(f"Moved {os.path.basename(source)} to {destination_folder} "
+                         f"({size_mb:.1f} MB in {elapsed:.1f}s, checksum verified)")
+
+    def wait(self, timeout):
+        deadline = time.monotonic() + timeout
+        while self.pending_count() and time.monotonic() < deadline:
+            time.sleep(0.1)
+        return self.pending_count() == 0
+
+    def stop(self):
+        self.stop_event.set()
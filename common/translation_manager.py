@@ -1,11 +1,46 @@
 from configparser import ConfigParser
+import logging
 import os
+import threading
+
+TRANSLATIONS_FOLDER = 'translations'
+FALLBACK_LANGUAGE = 'en-US'
+
+_catalogs = {}
+_catalogs_lock = threading.Lock()
+
+def get_translation_file(language):
+    return os.path.join(TRANSLATIONS_FOLDER, f'{language}.ini')
+
+def compile_catalog(translation_file):
+    parser = ConfigParser(interpolation=None)
+    with open(translation_file, 'r', encoding='utf-8') as file:
+        parser.read_file(file)
+    # Keys are case-insensitive in the .ini files; ConfigParser stores them lowercased.
+    return {key: value.replace('\\n', '\n') for key, value in parser['Settings'].items()}
+
+def load_catalog(language):
+    # Compiled once per language and reused until the .ini file changes on disk.
+    translation_file = get_translation_file(language)
+    if not os.path.exists(translation_file):
+        raise FileNotFoundError(f"Translation file {translation_file} not found.")
+    mtime = os.path.getmtime(translation_file)
+    with _catalogs_lock:
+        cached = _catalogs.get(language)
+        if cached and cached[0] == mtime:
+            return cached[1]
+    catalog = compile_catalog(translation_file)
+    with _catalogs_lock:
+        _catalogs[language] = (mtime, catalog)
+    return catalog
 
 class TranslationManager:
     def __init__(self, language='en'):
         self.language = language
         self.is_rtl = self.check_rtl_language(language)
-        self.translation = ConfigParser()
+        self.catalog = {}
+        self.missing = set()
+        self.logger = logging.getLogger()
         self.load_translation()
 
     def check_rtl_language(self, language):
@@ -13,21 +48,29 @@ class TranslationManager:
         return language in rtl_languages
 
     def load_translation(self):
-        translations_folder = 'translations'
-        translation_file = os.path.join(translations_folder, f'{self.language}.ini')
-        self.translation = ConfigParser()
-        if os.path.exists(translation_file):
-            with open(translation_file, 'r', encoding='utf-8') as file:
-                self.translation.read_file(file)
-            for key in self.translation['Settings']:
-                self.translation['Settings'][key] = self.translation['Settings'][key].replace('\\n', '\n')
-        else:
-            raise FileNotFoundError(f"Translation file {translation_file} not found.")
+        catalog = load_catalog(self.language)
+        if self.language != FALLBACK_LANGUAGE:
+            fallback = load_catalog(FALLBACK_LANGUAGE)
+            untranslated = fallback.keys() - catalog.keys()
+            if untranslated:
+                self.logger.warning(f"{len(untranslated)} texts are not translated to {self.language}, "
+                                    f"using {FALLBACK_LANGUAGE}: {', '.join(sorted(untranslated))}")
+                catalog = {**fallback, **catalog}
+        self.catalog = catalog
+        self.missing = set()
 
     def t(self, key):
-        return self.translation.get('Settings', key, fallback=key)
+        value = self.catalog.get(key)
+        if value is None:
+            value = self.catalog.get(key.lower())
+            if value is None:
+                if key not in self.missing:
+                    self.missing.add(key)
+                    self.logger.warning(f"Missing translation for '{key}'")
+                return key
+        return value
 
     def change_language(self, new_language):
         self.language = new_language
+        self.is_rtl = self.check_rtl_language(new_language)
         self.load_translation()
-
@@ -0,0 +1,135 @@
+import platform
+import re
+import subprocess
+import time
+
+PICK_TIMEOUT = 30
+
+def parse_xwininfo(output):
+    window = {}
+    match = re.search(r'Window id: (0x[0-9a-fA-F]+) (?:"(.*)"|\(has no name\))', output)
+    if not match:
+        return None
+    window['id'] = match.group(1)
+    window['title'] = match.group(2) or ""
+    fields = {
+        'x': r'Absolute upper-left X:\s+(-?\d+)',
+        'y': r'Absolute upper-left Y:\s+(-?\d+)',
+        'width': r'Width:\s+(\d+)',
+        'height': r'Height:\s+(\d+)',
+    }
+    for key, pattern in fields.items():
+        field = re.search(pattern, output)
+        if not field:
+            return None
+        window[key] = int(field.group(1))
+    window['viewable'] = 'IsViewable' in output
+    return window
+
+def read_x11_window(window_id):
+    result = subprocess.run(['xwininfo', '-id', window_id], capture_output=True, text=True,
+                            encoding='utf-8', errors='replace')
+    return parse_xwininfo(result.stdout) if result.returncode == 0 else None
+
+def list_x11_windows():
+    result = subprocess.run(['xprop', '-root', '_NET_CLIENT_LIST'], capture_output=True, text=True)
+    windows = []
+    for window_id in re.findall(r'0x[0-9a-fA-F]+', result.stdout):
+        window = read_x11_window(window_id)
+        if window and window['viewable'] and window['width'] > 1 and window['height'] > 1:
+            windows.append(window)
+    return windows
+
+def pick_x11_window():
+    result = subprocess.run(['xwininfo'], capture_output=True, text=True, encoding='utf-8', errors='replace',
+                            timeout=PICK_TIMEOUT)
+    picked = parse_xwininfo(result.stdout)
+    if not picked or picked['title']:
+        return picked
+
+    # With a reparenting window manager the click lands on the unnamed decoration frame;
+    # record the application window inside it instead.
+    inside = [window for window in list_x11_windows()
+              if picked['x'] <= window['x'] and picked['y'] <= window['y']
+              and window['x'] + window['width'] <= picked['x'] + picked['width']
+              and window['y'] + window['height'] <= picked['y'] + picked['height']]
+    return max(inside, key=lambda window: window['width'] * window['height'], default=picked)
+
+def _win32():
+    import ctypes
+    from ctypes import wintypes
+    return ctypes, wintypes, ctypes.windll.user32
+
+def read_win32_window(hwnd):
+    ctypes, wintypes, user32 = _win32()
+    if isinstance(hwnd, str):
+        hwnd = int(hwnd, 0)
+    if not user32.IsWindow(hwnd):
+        return None
+    length = user32.GetWindowTextLengthW(hwnd)
+    buffer = ctypes.create_unicode_buffer(length + 1)
+    user32.GetWindowTextW(hwnd, buffer, length + 1)
+
+    # gdigrab captures the client area, so report that rather than the outer frame.
+    rect = wintypes.RECT()
+    user32.GetClientRect(hwnd, ctypes.byref(rect))
+    origin = wintypes.POINT(0, 0)
+    user32.ClientToScreen(hwnd, ctypes.byref(origin))
+    return {
+        'id': hwnd,
+        'title': buffer.value,
+        'x': origin.x,
+        'y': origin.y,
+        'width': rect.right - rect.left,
+        'height': rect.bottom - rect.top,
+        'viewable': bool(user32.IsWindowVisible(hwnd)),
+    }
+
+def list_win32_windows():
+    ctypes, wintypes, user32 = _win32()
+    windows = []
+
+    @ctypes.WINFUNCTYPE(wintypes.BOOL, wintypes.HWND, wintypes.LPARAM)
+    def collect(hwnd, lparam):
+        if user32.IsWindowVisible(hwnd) and user32.GetWindowTextLengthW(hwnd) > 0:
+            window = read_win32_window(hwnd)
+            if window and window['width'] > 1 and window['height'] > 1:
+                windows.append(window)
+        return True
+
+    user32.EnumWindows(collect, 0)
+    return windows
+
+def pick_win32_window():
+    ctypes, wintypes, user32 = _win32()
+    VK_LBUTTON = 0x01
+    GA_ROOT = 2
+
+    deadline = time.monotonic() + PICK_TIMEOUT
+    # Take the window under the cursor once the click is released.
+    while not user32.GetAsyncKeyState(VK_LBUTTON) & 0x8000:
+        if time.monotonic() > deadline:
+            return None
+        time.sleep(0.02)
+    while user32.GetAsyncKeyState(VK_LBUTTON) & 0x8000:
+        time.sleep(0.02)
+
+    point = wintypes.POINT()
+    user32.GetCursorPos(ctypes.byref(point))
+    hwnd = user32.GetAncestor(user32.WindowFromPoint(point), GA_ROOT)
+    return read_win32_window(hwnd) if hwnd else None
+
+def list_windows():
+    if platform.system() == 'Windows':
+        return list_win32_windows()
+    return list_x11_windows()
+
+def pick_window():
+    if platform.system() == 'Windows':
+        return pick_win32_window()
+    return pick_x11_window()
+
+def read_window(window_id):
+    if platform.system() == 'Windows':
+        return read_win32_window(window_id)
+    return read_x11_window(window_id)
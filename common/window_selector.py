@@ -0,0 +1,74 @@
+import threading
+import tkinter as tk
+from tkinter import ttk
+
+class WindowSelector:
+    def __init__(self, root, translate):
+        self.root = root
+        self.t = translate
+        self.dialog = None
+        self.windows = []
+
+    def select_window(self, windows, pick_window, callback):
+        self.callback = callback
+        self.pick_window = pick_window
+        self.windows = windows
+
+        self.dialog = tk.Toplevel(self.root)
+        self.dialog.title(self.t("select_window"))
+        self.dialog.geometry("520x360")
+        self.dialog.transient(self.root)
+        self.dialog.protocol("WM_DELETE_WINDOW", self.cancel)
+        self.dialog.bind('<Escape>', lambda event: self.cancel())
+
+        list_frame = ttk.Frame(self.dialog)
+        list_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        self.listbox = tk.Listbox(list_frame, activestyle='none')
+        scrollbar = ttk.Scrollbar(list_frame, orient=tk.VERTICAL, command=self.listbox.yview)
+        self.listbox.config(yscrollcommand=scrollbar.set)
+        self.listbox.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        for window in windows:
+            self.listbox.insert(tk.END, f"{window['title']}  ({window['width']}x{window['height']})")
+        self.listbox.bind('<Double-Button-1>', lambda event: self.use_selected())
+
+        buttons_frame = ttk.Frame(self.dialog)
+        buttons_frame.pack(fill=tk.X, padx=10, pady=(0, 10))
+        self.pick_btn = ttk.Button(buttons_frame, text=self.t("pick_window"), command=self.start_pick)
+        self.pick_btn.pack(side=tk.LEFT)
+        self.use_btn = ttk.Button(buttons_frame, text=self.t("use_window"), command=self.use_selected,
+                                  style="Accent.TButton")
+        self.use_btn.pack(side=tk.RIGHT)
+
+    def use_selected(self):
+        selection = self.listbox.curselection()
+        if selection:
+            self.close(self.windows[selection[0]])
+
+    def start_pick(self):
+        self.dialog.withdraw()
+        self.root.withdraw()
+        threading.Thread(target=self.run_pick, daemon=True).start()
+
+    def run_pick(self):
+        try:
+            window = self.pick_window()
+        except Exception:
+            window = None
+        self.root.after(0, self.finish_pick, window)
+
+    def finish_pick(self, window):
+        self.root.deiconify()
+        if window:
+            self.close(window)
+        else:
+            self.dialog.deiconify()
+
+    def cancel(self):
+        self.close(None)
+
+    def close(self, window):
+        if self.dialog and self.dialog.winfo_exists():
+            self.dialog.destroy()
+        self.dialog = None
+        self.callback(window)